@@ -4,6 +4,7 @@ import keyword
 import os
 import re
 
+from Qt.QtCore import QEvent, QPoint, QTimer
 from Qt.QtGui import QColor, QSyntaxHighlighter, QTextCharFormat
 
 from .. import resourcePath, utils
@@ -13,6 +14,8 @@ class CodeHighlighter(QSyntaxHighlighter):
     def __init__(self, widget, language):
         super(CodeHighlighter, self).__init__(widget)
         self._consoleMode = False
+        # In console mode, only blocks starting with one of these are highlighted
+        self._consolePrefixes = ('>>>',)
 
         self.initHighlightVariables()
         self.setLanguage(language)
@@ -22,29 +25,28 @@ class CodeHighlighter(QSyntaxHighlighter):
     def initHighlightVariables(self):
         """Initialize the variables which will be used in code highlighting"""
 
-        # For each call of highlightBlock, keep track of the spans of each highlight, so
-        # we can prevent overlapping spans (ie if a string is found, but it's within a
-        # comment, do not highlight it).
-        self.spans = []
-
         self._enabled = True
 
         # Language specific lists
         self._comments = []
         self._keywords = []
+        self._multilineStrings = []
         self._strings = []
 
         # Patterns
-        self._commentPattern = None
-        self._keywordPattern = None
+        self._keywordSet = frozenset()
         self._resultPattern = None
-        self._stringsPattern = None
+        # A single regex matching every type of token, see defineTokenPattern
+        self._tokenPattern = None
+        # Maps the group names of _tokenPattern to the type of token they match
+        self._tokenKinds = {}
 
         # Formats
         self._commentFormat = None
         self._keywordFormat = None
         self._resultFormat = None
         self._stringFormat = None
+        self._tokenFormats = {}
 
         # Colors. These may be overriden by parent colors, which themselves my be
         # overridden by stylesheets (ie Bright.css)
@@ -68,6 +70,10 @@ class CodeHighlighter(QSyntaxHighlighter):
 
             self._comments = data.get('comments', [])
             self._strings = data.get('strings', [])
+            # Delimiters of strings that may span multiple lines. The block
+            # state of each block is set to the index of the delimiter + 1 if
+            # the block ends inside one of these strings.
+            self._multilineStrings = data.get('multiline_strings', [])
 
             # If using python, we can get keywords dynamically, otherwise get them from
             # the language json data.
@@ -87,12 +93,17 @@ class CodeHighlighter(QSyntaxHighlighter):
         self.defineKeywordFormat()
         self.defineResultFormat()
         self.defineStringFormat()
+        self._tokenFormats = {
+            'comment': self._commentFormat,
+            'keyword': self._keywordFormat,
+            'result': self._resultFormat,
+            'string': self._stringFormat,
+        }
 
         # Define highlight regex patterns
-        self.defineCommentPattern()
         self.defineKeywordPattern()
         self.defineResultPattern()
-        self.defineStringPattern()
+        self.defineTokenPattern()
 
     def highlightBlock(self, text):
         """Highlights the inputed text block based on the rules of this code
@@ -101,72 +112,71 @@ class CodeHighlighter(QSyntaxHighlighter):
         if not self.enabled():
             return
 
-        # Reset the highlight spans for this text block
-        self.spans = []
-
-        if not self.isConsoleMode() or str(text).startswith('>>>'):
-
-            # We only have a result pattern if the parent has an attr "outputPrompt", so
-            # only proceed if we have been able to define self._resultPattern.
-            if self._resultPattern:
-                self.highlightText(
-                    text,
-                    self._resultPattern,
-                    self._resultFormat,
-                )
-
-            # Format the strings
-            self.highlightText(
-                text,
-                self._stringPattern,
-                self._stringFormat,
-            )
-
-            # format the comments
-            self.highlightText(
-                text,
-                self._commentPattern,
-                self._commentFormat,
-            )
-
-            # Format the keywords
-            self.highlightText(
-                text,
-                self._keywordPattern,
-                self._keywordFormat,
-            )
-
-    def highlightText(self, text, expr, format):
-        """Highlights a text group with an expression and format
+        # Not inside a multi-line string at the end of this block. Qt only
+        # re-highlights the next block if this state changes.
+        self.setCurrentBlockState(0)
 
-        Args:
-            text (str): text to highlight
-            expr (re.compile): search parameter
-            format (QTextCharFormat): formatting rule
-        """
-        if expr is None or not text:
+        if self.isConsoleMode() and not str(text).startswith(self._consolePrefixes):
             return
 
-        # highlight all the given matches to the expression in the text
-        for match in expr.finditer(text):
-            match_span = match.span()
-            start, end = match_span
-            length = end - start
+        tokens, state = self.tokenize(text, self.previousBlockState())
+        for start, length, kind in tokens:
+            self.setFormat(start, length, self._tokenFormats[kind])
+        self.setCurrentBlockState(state)
 
-            # Determine if the current highlight is within an already determined
-            # highlight, if so, let's block it.
-            blocked = False
-            for span in self.spans:
-                if start > span[0] and start < span[-1]:
-                    blocked = True
-                    break
+    def tokenize(self, text, state=0):
+        """Splits text into the spans that should be highlighted.
 
-            if not blocked:
-                self.setFormat(start, length, format)
+        Text is processed left to right in a single pass so the spans never
+        overlap, ie a quote inside of a comment doesn't start a string.
 
-                # Append the current span to self.spans, so we can later block
-                # new highlights which should be blocked
-                self.spans.append(match_span)
+        Args:
+            text (str): A single line of text to process.
+            state (int, optional): The block state of the previous line. If
+                positive, text starts inside of that multi-line string.
+
+        Returns:
+            list: A tuple of the start, length and kind of each span. The kind
+                is one of "comment", "keyword", "result" or "string".
+            int: The block state at the end of text. This is the index + 1 of
+                the multi-line string delimiter that is not closed, or zero.
+        """
+        tokens = []
+        offset = 0
+        if 0 < state <= len(self._multilineStrings):
+            # The previous line ended inside of a multi-line string
+            delimiter = self._multilineStrings[state - 1]
+            end = text.find(delimiter)
+            if end == -1:
+                # The whole line is inside of the string
+                if text:
+                    tokens.append((0, len(text), 'string'))
+                return tokens, state
+            offset = end + len(delimiter)
+            tokens.append((0, offset, 'string'))
+
+        state = 0
+        if self._tokenPattern is None:
+            return tokens, state
+
+        for match in self._tokenPattern.finditer(text, offset):
+            name = match.lastgroup
+            start, end = match.span()
+            if name == 'word':
+                if match.group() in self._keywordSet:
+                    tokens.append((start, end - start, 'keyword'))
+                continue
+
+            kind = self._tokenKinds.get(name)
+            if kind is None or start == end:
+                continue
+            if kind == 'multiline':
+                # The string isn't closed on this line so it continues on the
+                # next line. It always extends to the end of the line.
+                state = int(name[len('multiline') :]) + 1
+                kind = 'string'
+            tokens.append((start, end - start, kind))
+        return tokens, state
 
     def isConsoleMode(self):
         """checks to see if this highlighter is in console mode"""
@@ -178,6 +188,13 @@ class CodeHighlighter(QSyntaxHighlighter):
         """
         self._consoleMode = state
 
+    def consolePrefixes(self):
+        """The text a block must start with to be highlighted in console mode."""
+        return self._consolePrefixes
+
+    def setConsolePrefixes(self, prefixes):
+        self._consolePrefixes = tuple(prefixes)
+
     def commentColor(self):
         # Pull the color from the parent if possible because this doesn't support
         # stylesheets
@@ -263,27 +280,198 @@ class CodeHighlighter(QSyntaxHighlighter):
         self._stringFormat = QTextCharFormat()
         self._stringFormat.setForeground(self.stringColor())
 
-    def defineCommentPattern(self):
-        """Define the regex pattern to use for comment"""
-        pattern = "|".join(self._comments)
-        self._commentPattern = re.compile(pattern)
-
     def defineKeywordPattern(self):
-        """Define the regex pattern to use for keyword"""
-        keywords = [r"\b{}\b".format(word) for word in self._keywords]
-        pattern = "|".join(keywords)
-        self._keywordPattern = re.compile(pattern)
+        """Define the set of keywords to highlight"""
+        self._keywordSet = frozenset(self._keywords)
 
     def defineResultPattern(self):
         """Define the regex pattern to use for results"""
         parent = self.parent()
         if parent and hasattr(parent, 'outputPrompt'):
             prompt = parent.outputPrompt()
-            pattern = '{}[^\n]*'.format(prompt)
-            self._resultPattern = re.compile(pattern)
-
-    def defineStringPattern(self):
-        """Define the regex pattern to use for strings."""
-        lst = ["""{0}[^{0}\n]*{0}""".format(st) for st in self._strings]
-        pattern = "|".join(lst)
-        self._stringPattern = re.compile(pattern)
+            self._resultPattern = '{}[^\n]*'.format(re.escape(prompt))
+
+    def defineTokenPattern(self):
+        """Define a single regex pattern that matches every type of token.
+
+        Each type of token is a named group of the pattern. When several groups
+        match at the same position the first group wins, so the order of the
+        groups defines their priority. Words are matched so keywords can be
+        looked up in a set, and so keywords are never found inside other words.
+        """
+        groups = []
+        self._tokenKinds = {}
+
+        def add(name, kind, patterns):
+            if patterns:
+                groups.append('(?P<{}>{})'.format(name, '|'.join(patterns)))
+                self._tokenKinds[name] = kind
+
+        if self._resultPattern:
+            add('result', 'result', [self._resultPattern])
+
+        # Multi-line strings must be checked before regular strings so the
+        # first two quotes of `"""` are not matched as a empty string.
+        closed = []
+        for delimiter in self._multilineStrings:
+            # A multi-line string that is closed on the same line
+            closed.append("{0}.*?{0}".format(re.escape(delimiter)))
+        add('closed', 'string', closed)
+        for index, delimiter in enumerate(self._multilineStrings):
+            # A multi-line string that is closed on a later line
+            add('multiline{}'.format(index), 'multiline', [re.escape(delimiter) + '.*'])
+
+        strings = []
+        for delimiter in self._strings:
+            strings.append("{0}[^{0}\n]*{0}".format(re.escape(delimiter)))
+        add('string', 'string', strings)
+
+        add('comment', 'comment', self._comments)
+        add('word', 'word', [r'\w+'])
+
+        self._tokenPattern = re.compile('|'.join(groups))
+
+
+class ConsoleCodeHighlighter(CodeHighlighter):
+    """A CodeHighlighter optimized for consoles showing a lot of output.
+
+    Like CodeHighlighter every block is highlighted unless console mode is
+    enabled, in which case only blocks starting with one of `consolePrefixes`
+    are highlighted. This is checked with a single `str.startswith` call before
+    any other work is done.
+
+    Blocks that are not visible in the console's viewport when they are added
+    or changed are not highlighted. Their block state is set to
+    `DEFERRED_STATE` and they are highlighted when they are scrolled into view,
+    the console is resized or shown. The state is stored on the block so it
+    stays correct when text is inserted or removed above it. This prevents
+    paying for highlighting when writing large amounts of output the user never
+    looks at.
+
+    Args:
+        widget (QTextEdit): The console to highlight.
+        language (str): The language to highlight.
+    """
+
+    DEFERRED_STATE = -2
+    """The block state of blocks that were not highlighted because they were
+    not visible. Multi-line string states are positive so this is never carried
+    to the next block."""
+
+    def __init__(self, widget, language):
+        super(ConsoleCodeHighlighter, self).__init__(widget, language)
+        # The range of block numbers that are visible in the viewport
+        self._visibleRange = (0, -1)
+        # The deferred block being highlighted by `_highlightDeferred`
+        self._forceBlock = None
+
+        if hasattr(widget, 'prompt'):
+            self.setConsolePrefixes([widget.prompt().strip()])
+
+        # The console's layout is not updated until after it's shown or resized
+        # so wait to update the visible blocks. This also prevents updating the
+        # visible blocks for every line written while scrolled to the bottom.
+        self._updateTimer = QTimer(self)
+        self._updateTimer.setSingleShot(True)
+        self._updateTimer.setInterval(0)
+        self._updateTimer.timeout.connect(self.updateVisibleBlocks)
+
+        self._editor = widget
+        widget.verticalScrollBar().valueChanged.connect(self.scheduleUpdate)
+        widget.viewport().installEventFilter(self)
+
+    def deferredBlocks(self, first=0, last=None):
+        """Returns the blocks waiting to be highlighted.
+
+        Args:
+            first (int, optional): The number of the first block to check.
+            last (int, optional): The number of the last block to check. If
+                None, blocks are checked to the end of the document.
+        """
+        blocks = []
+        block = self.document().findBlockByNumber(first)
+        while block.isValid() and (last is None or block.blockNumber() <= last):
+            if block.userState() == self.DEFERRED_STATE:
+                blocks.append(block)
+            block = block.next()
+        return blocks
+
+    def deferredCount(self):
+        """The number of blocks waiting to be highlighted."""
+        return len(self.deferredBlocks())
+
+    def eventFilter(self, obj, event):
+        if event.type() in (QEvent.Type.Resize, QEvent.Type.Show):
+            self.scheduleUpdate()
+        return super(ConsoleCodeHighlighter, self).eventFilter(obj, event)
+
+    def highlightBlock(self, text):
+        """Highlights the inputed text block based on the rules of this code
+        highlighter"""
+        if not self.enabled():
+            return
+
+        # Cheap check to skip blocks that are never highlighted
+        if self._consoleMode and not text.startswith(self._consolePrefixes):
+            self.setCurrentBlockState(0)
+            return
+
+        block = self.currentBlock()
+        if block != self._forceBlock and not self.isBlockVisible(block.blockNumber()):
+            # Qt highlights the next block if the state of a block changes. When
+            # highlighting a deferred block, the next block is only deferred if
+            # it already was so its existing highlighting isn't removed.
+            deferred = self.currentBlockState() == self.DEFERRED_STATE
+            if self._forceBlock is None or deferred:
+                self.setCurrentBlockState(self.DEFERRED_STATE)
+                # Text is normally added to the end of the console. Once the
+                # event loop runs, any deferred blocks that are visible are
+                # highlighted. This way only the blocks visible at the end of a
+                # large write are highlighted.
+                if self._editor.isVisible():
+                    self.scheduleUpdate()
+                return
+
+        super(ConsoleCodeHighlighter, self).highlightBlock(text)
+
+    def highlightDeferredBlocks(self):
+        """Highlight all blocks that are waiting to be highlighted."""
+        self._highlightDeferred(self.deferredBlocks())
+
+    def _highlightDeferred(self, blocks):
+        try:
+            for block in blocks:
+                self._forceBlock = block
+                self.rehighlightBlock(block)
+        finally:
+            self._forceBlock = None
+
+    def isBlockVisible(self, number):
+        """Returns True if the block was visible the last time the visible blocks
+        were updated."""
+        first, last = self._visibleRange
+        return first <= number <= last
+
+    def scheduleUpdate(self, *args):
+        """Call `updateVisibleBlocks` the next time the event loop runs.
+
+        Calling this multiple times before then only updates once.
+        """
+        self._updateTimer.start()
+
+    def updateVisibleBlocks(self):
+        """Update the range of visible blocks and highlight any deferred blocks
+        that are now visible."""
+        editor = self._editor
+        if not editor.isVisible():
+            self._visibleRange = (0, -1)
+            return
+
+        viewport = editor.viewport()
+        first = editor.cursorForPosition(QPoint(0, 0)).blockNumber()
+        last = editor.cursorForPosition(
+            QPoint(viewport.width(), viewport.height())
+        ).blockNumber()
+        self._visibleRange = (first, last)
+
+        self._highlightDeferred(self.deferredBlocks(first, last))
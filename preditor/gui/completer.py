@@ -1,15 +1,21 @@
 from __future__ import absolute_import
 
+import html
 import inspect
 import re
 import sys
+import weakref
+from collections import OrderedDict
 from enum import Enum
 
 import Qt as Qt_py
-from Qt.QtCore import QRegExp, QSortFilterProxyModel, QStringListModel, Qt
+from Qt.QtCore import QRegExp, QSortFilterProxyModel, QStringListModel, Qt, QTimer
 from Qt.QtGui import QCursor, QTextCursor
 from Qt.QtWidgets import QCompleter, QToolTip
 
+from ..utils.fuzzy_match import FuzzyMatcher
+from ..utils.static_resolve import StaticResolver, static_dict, static_dir
+
 
 class CompleterMode(Enum):
     """
@@ -23,6 +29,10 @@ class CompleterMode(Enum):
     FULL_FUZZY - Matches completions which contain the characters of the typed input,
                     in order, regardless of other characters intermixed
                     regex = ".*S.*a.*m.*p.*l.*e.*I.*n.*p.*u.*t.*"
+    RANKED_FUZZY - Matches the same completions as FULL_FUZZY, but sorts them so
+                    the best matches are shown first. Prefixes, word boundaries,
+                    camelCase/snake_case humps and consecutive characters are
+                    ranked higher. See `preditor.utils.fuzzy_match`.
 
     Matches respect case-sensitivity, which is set separately
     """
@@ -30,6 +40,7 @@ class CompleterMode(Enum):
     STARTS_WITH = 0
     OUTER_FUZZY = 1
     FULL_FUZZY = 2
+    RANKED_FUZZY = 3
 
     def displayName(self):
         return self.name.replace('_', ' ').title()
@@ -39,10 +50,175 @@ class CompleterMode(Enum):
             'STARTS_WITH': "'all' matches 'allowtabs', does not match 'findallnames'",
             'OUTER_FUZZY': "'all' matches 'getallobjs', does not match 'anylonglist'",
             'FULL_FUZZY': "'all' matches 'getallobjs', also matches 'anylonglist'",
+            'RANKED_FUZZY': "'gao' lists 'getAllObjects' before 'getallobjs'",
         }
         return toolTipMap.get(self.name, "")
 
 
+class ObjectCache(object):
+    """A LRU cache of information about python objects.
+
+    Entries are keyed by the id and type of the object. A weak reference to the
+    object is stored if possible so a new object re-using the id of a deleted
+    object doesn't get its information. Subclasses implement `compute` and may
+    implement `version` to invalidate entries when the object changes.
+
+    Args:
+        maxsize (int, optional): The maximum number of objects to cache. The least
+            recently used object is removed when this is exceeded.
+    """
+
+    def __init__(self, maxsize=32):
+        self._maxsize = maxsize
+        self._cache = OrderedDict()
+
+    def __len__(self):
+        return len(self._cache)
+
+    def clear(self):
+        self._cache.clear()
+
+    def compute(self, obj):
+        """Returns the information to cache for obj."""
+        raise NotImplementedError()
+
+    def get(self, obj):
+        """Returns the cached information for obj, computing it if required."""
+        key = (id(obj), type(obj))
+        version = self.version(obj)
+        entry = self._cache.get(key)
+        if entry is not None:
+            ref, cached_version, value = entry
+            # The id of a deleted object may be re-used by a new object
+            target = ref() if isinstance(ref, weakref.ref) else ref
+            if target is obj and cached_version == version:
+                self._cache.move_to_end(key)
+                return value
+
+        value = self.compute(obj)
+        try:
+            ref = weakref.ref(obj)
+        except TypeError:
+            # Objects that don't support weakref are kept alive until removed
+            # from the cache.
+            ref = obj
+        self._cache[key] = (ref, version, value)
+        self._cache.move_to_end(key)
+        self._trim()
+        return value
+
+    def maxsize(self):
+        return self._maxsize
+
+    def setMaxsize(self, maxsize):
+        self._maxsize = maxsize
+        self._trim()
+
+    def _trim(self):
+        while len(self._cache) > self._maxsize:
+            self._cache.popitem(last=False)
+
+    @classmethod
+    def version(cls, obj):
+        """Returns a value that changes when obj changes. If it changes, the
+        cached information is re-computed."""
+        return None
+
+
+class AttributeCache(ObjectCache):
+    """A LRU cache of the sorted attribute names of objects used for completion.
+
+    Calling `dir` and sorting the result on every key press is slow for objects
+    with a lot of attributes like large modules. Entries are discarded if the
+    number of items in the object's `__dict__` changes, which happens when a
+    attribute is added or removed from a module or instance.
+    """
+
+    def compute(self, obj):
+        try:
+            names = sorted(dir(obj))
+        except AttributeError:
+            names = []
+        return (
+            [name for name in names if not name.startswith('_')],
+            [name for name in names if name.startswith('_')],
+        )
+
+    def keys(self, obj, hidden=False):
+        """Returns the sorted attribute names of obj.
+
+        The same list object is returned until the cache entry for obj is
+        invalidated, so callers can use an identity check to see if the names
+        have changed. The returned list should not be modified.
+
+        Args:
+            obj: The object to return the attribute names of.
+            hidden (bool, optional): If True only names starting with a
+                underscore are returned, otherwise only names that don't.
+        """
+        return self.get(obj)[hidden]
+
+    @classmethod
+    def version(cls, obj):
+        """Returns a value that changes when attributes are added to or removed
+        from obj. Returns None if obj doesn't have a `__dict__`."""
+        try:
+            return len(vars(obj))
+        except TypeError:
+            return None
+
+
+class StaticAttributeCache(AttributeCache):
+    """A `AttributeCache` that finds attribute names without running code.
+
+    Used when the completer resolves objects statically. `dir` can call a
+    `__dir__` method defined by the object, so names are read from the
+    dictionaries of the object and its classes with `static_dir` instead.
+    """
+
+    def compute(self, obj):
+        names = static_dir(obj)
+        return (
+            [name for name in names if not name.startswith('_')],
+            [name for name in names if name.startswith('_')],
+        )
+
+    @classmethod
+    def version(cls, obj):
+        return len(static_dict(obj))
+
+
+class DocumentationCache(ObjectCache):
+    """A LRU cache of the signature and docstring of objects.
+
+    Getting the docstring of objects from some wrappers can be slow so this
+    prevents re-calculating it every time documentation is shown.
+    """
+
+    def compute(self, obj):
+        """Returns the signature and docstring of obj.
+
+        Returns:
+            tuple: The signature string and docstring. Either may be None if
+                obj doesn't have one. For example builtin functions often don't
+                provide a signature and instances are not callable.
+        """
+        signature = None
+        if callable(obj):
+            try:
+                signature = str(inspect.signature(obj))
+            except Exception:
+                # Most objects raise TypeError or ValueError, but wrappers
+                # may raise anything.
+                pass
+
+        try:
+            docs = inspect.getdoc(obj)
+        except Exception:
+            docs = None
+        return signature, docs
+
+
 class PythonCompleter(QCompleter):
     def __init__(self, widget):
         super(PythonCompleter, self).__init__(widget)
@@ -50,6 +226,21 @@ class PythonCompleter(QCompleter):
         # use the python model for information
 
         self._enabled = True
+        self._attributeCache = AttributeCache()
+        self._staticResolve = False
+        self._staticAttributeCache = StaticAttributeCache()
+        # The StaticResolver for the current workbox and the workbox and
+        # revision its source was taken from.
+        self._staticResolver = None
+        self._staticResolverKey = None
+
+        # Documentation is computed after a delay so it doesn't slow down typing
+        self._documentationCache = DocumentationCache()
+        self._documentationRequest = None
+        self._documentationTimer = QTimer(self)
+        self._documentationTimer.setSingleShot(True)
+        self._documentationTimer.setInterval(300)
+        self._documentationTimer.timeout.connect(self._showPendingDocumentation)
 
         # update this completer
         self.setWidget(widget)
@@ -62,6 +253,9 @@ class PythonCompleter(QCompleter):
         self.wasCompletingCounter = 0
         self.wasCompletingCounterMax = 1
 
+        # The maximum number of completions shown by CompleterMode.RANKED_FUZZY
+        self.rankedLimit = 200
+
     def setCaseSensitive(self, caseSensitive=True):
         """Set case sensitivity for completions"""
         self._sensitivity = (
@@ -84,18 +278,80 @@ class PythonCompleter(QCompleter):
         """Return current completer mode"""
         return self._completerMode
 
+    def setStaticResolve(self, state=True):
+        """Set if the object being completed is resolved statically.
+
+        By default the text before the cursor is evaluated to find the object to
+        complete. This can run properties, descriptors or `__getattr__` methods.
+        If enabled, names are resolved by walking dictionaries with
+        `inspect.getattr_static` so no code is run, falling back to inferring
+        assignments in the current workbox. See `StaticResolver`. Attribute
+        names are listed without calling `dir` and documentation is not shown
+        as finding it can run code.
+        """
+        self._staticResolve = state
+
+    def staticResolve(self):
+        """Return True if objects are resolved without evaluating code."""
+        return self._staticResolve
+
+    def staticSource(self):
+        """Returns the code used to infer names not defined in the scope when
+        resolving statically. This is the text of the current workbox."""
+        controller = getattr(self.widget(), "controller", None)
+        if not controller:
+            return None
+        workbox = controller.current_workbox()
+        if workbox is None:
+            return None
+        return workbox.__text__()
+
+    def staticResolver(self, scope=None):
+        """Returns the `StaticResolver` used to resolve objects statically.
+
+        The resolver is re-used until the current workbox or its text changes,
+        so the workbox is not parsed again on every key press.
+        """
+        key = None
+        controller = getattr(self.widget(), "controller", None)
+        workbox = controller.current_workbox() if controller else None
+        if workbox is not None:
+            key = (id(workbox), workbox.__revision__())
+        if self._staticResolver is None or key != self._staticResolverKey:
+            self._staticResolver = StaticResolver(scope, source=self.staticSource())
+            self._staticResolverKey = key
+        self._staticResolver.scope = scope if scope is not None else {}
+        return self._staticResolver
+
     def buildCompleter(self):
         """
         Build the completer to allow for wildcards and set
         case sensitivity to use
         """
         model = QStringListModel()
+        # The list of names currently shown in model
+        self._modelKeys = None
         self.filterModel = QSortFilterProxyModel(self.parent())
         self.filterModel.setSourceModel(model)
         self.filterModel.setFilterCaseSensitivity(self._sensitivity)
         self.setModel(self.filterModel)
         self.setCompletionMode(QCompleter.CompletionMode.UnfilteredPopupCompletion)
 
+    def currentPrefix(self):
+        """Returns the part of the word under the cursor that is being completed.
+
+        This is the same as the prefix returned by `currentObject` without the
+        cost of evaluating the object.
+        """
+        if self._enabled:
+            word = self.textUnderCursor()
+            if word.endswith('('):
+                return ''
+            split = word.split('.')
+            if len(split) > 1:
+                return split[-1]
+        return ''
+
     def currentObject(self, scope=None, docMode=False):
         if self._enabled:
             word = self.textUnderCursor()
@@ -116,12 +372,16 @@ class PythonCompleter(QCompleter):
                     symbol = word
                     prefix = ''
 
-                # try to evaluate the object to pull out the keys
                 object = None
-                try:
-                    object = eval(symbol, scope)
-                except Exception:
-                    pass
+                if self._staticResolve:
+                    # Find the object without running any code
+                    object = self.staticResolver(scope).resolve(symbol)
+                else:
+                    # try to evaluate the object to pull out the keys
+                    try:
+                        object = eval(symbol, scope)
+                    except Exception:
+                        pass
 
                 if object is None:
                     if symbol in sys.modules:
@@ -133,24 +393,26 @@ class PythonCompleter(QCompleter):
     def enabled(self):
         return self._enabled
 
-    def hideDocumentation(self):
-        QToolTip.hideText()
-
     def refreshList(self, scope=None):
         """refreshes the string list based on the cursor word"""
         object, prefix = self.currentObject(scope)
 
         # Only show hidden method/variable names if the hidden character '_' is typed
         # in.
-        try:
-            if prefix.startswith('_'):
-                keys = [key for key in dir(object) if key.startswith('_')]
-            else:
-                keys = [key for key in dir(object) if not key.startswith('_')]
-        except AttributeError:
-            keys = []
-        keys.sort()
-        self.model().sourceModel().setStringList(keys)
+        cache = self._attributeCache
+        if self._staticResolve:
+            cache = self._staticAttributeCache
+        keys = cache.keys(object, hidden=prefix.startswith('_'))
+        if self._completerMode == CompleterMode.RANKED_FUZZY:
+            # The model only contains the ranked matches so it's not filtered.
+            matcher = FuzzyMatcher(prefix, case_sensitive=self.caseSensitive())
+            ranked = [key for _, key in matcher.rank(keys, limit=self.rankedLimit)]
+            self._modelKeys = None
+            self.model().sourceModel().setStringList(ranked)
+        # Only rebuild the model if the names changed, not on every key press
+        elif keys is not self._modelKeys:
+            self._modelKeys = keys
+            self.model().sourceModel().setStringList(keys)
 
         regExStr = ""
         if self._completerMode == CompleterMode.STARTS_WITH:
@@ -159,6 +421,8 @@ class PythonCompleter(QCompleter):
             regExStr = ".*{}.*".format(prefix)
         if self._completerMode == CompleterMode.FULL_FUZZY:
             regExStr = ".*".join(prefix)
+        if self._completerMode == CompleterMode.RANKED_FUZZY:
+            regExStr = ""
 
         if Qt_py.IsPyQt6 or Qt_py.IsPySide6:
             regexp = QRegExp(regExStr)
@@ -176,9 +440,60 @@ class PythonCompleter(QCompleter):
         self.wasCompletingCounter = 0
         self.wasCompleting = False
 
+    def documentationCacheSize(self):
+        """The number of objects the documentation is cached for."""
+        return self._documentationCache.maxsize()
+
+    def setDocumentationCacheSize(self, size):
+        self._documentationCache.setMaxsize(size)
+
+    def documentationDelay(self):
+        """The number of milliseconds to wait before showing documentation."""
+        return self._documentationTimer.interval()
+
+    def setDocumentationDelay(self, delay):
+        self._documentationTimer.setInterval(delay)
+
+    def documentationHtml(self, object, name=''):
+        """Returns the rich text documentation shown for object or a empty string.
+
+        Args:
+            object: The object to show the signature and docstring of.
+            name (str, optional): Shown before the signature.
+        """
+        signature, docs = self._documentationCache.get(object)
+        parts = []
+        if signature is not None:
+            parts.append(
+                '<p><code><b>{}</b>{}</code></p>'.format(
+                    html.escape(name), html.escape(signature)
+                )
+            )
+        if docs:
+            parts.append(
+                '<p style="white-space:pre-wrap">{}</p>'.format(html.escape(docs))
+            )
+        if not parts:
+            return ''
+        return '<qt>{}</qt>'.format('<hr/>'.join(parts))
+
+    def hideDocumentation(self):
+        self._documentationTimer.stop()
+        self._documentationRequest = None
+        QToolTip.hideText()
+
     def showDocumentation(self, pos=None, scope=None):
+        """Show the signature and docstring of the object under the cursor.
+
+        The documentation is shown in a tooltip after `documentationDelay`, so
+        computing the documentation doesn't slow down typing. Nothing is shown
+        when resolving statically, getting the signature and docstring of a
+        object can run code.
+        """
         # hide the existing popup widget
         self.popup().hide()
+        if self._staticResolve:
+            return
 
         # create the default position
         if pos is None:
@@ -190,12 +505,26 @@ class PythonCompleter(QCompleter):
         # not all objects allow `if object`, so catch any errors
         # Specifically, numpy arrays fail with ValueError here
         try:
-            if object:
-                docs = inspect.getdoc(object)
-                if docs:
-                    QToolTip.showText(pos, docs)
+            if not object:
+                return
+        except Exception:
+            return
+
+        name = self.textUnderCursor().rstrip('(').split('.')[-1]
+        self._documentationRequest = (object, name, pos)
+        self._documentationTimer.start()
+
+    def _showPendingDocumentation(self):
+        if self._documentationRequest is None:
+            return
+        object, name, pos = self._documentationRequest
+        self._documentationRequest = None
+        try:
+            docs = self.documentationHtml(object, name)
         except Exception:
-            pass
+            return
+        if docs:
+            QToolTip.showText(pos, docs, self.widget())
 
     def setEnabled(self, state):
         self._enabled = state
@@ -1,5 +1,7 @@
 from __future__ import absolute_import
 
+import ast
+import inspect
 import re
 import string
 import sys
@@ -16,7 +18,9 @@ from Qt.QtWidgets import QAbstractItemView, QAction, QApplication, QWidget
 from .. import settings
 from ..constants import StreamType
 from ..utils import Truncate
+from ..utils.async_runner import AsyncRunner
 from ..utils.cute import QtPropertyInit
+from .codehighlighter import ConsoleCodeHighlighter
 from .completer import PythonCompleter
 from .console_base import ConsoleBase
 from .loggerwindow import LoggerWindow
@@ -28,6 +32,9 @@ class ConsolePrEdit(ConsoleBase):
 
     _consolePrompt = '>>> '
 
+    # Only highlight the lines that are visible
+    _codeHighlighterClass = ConsoleCodeHighlighter
+
     # Note: Changing _outputPrompt may require updating resource\lang\python.xml
     # If still using a #
     _outputPrompt = '#Result: '
@@ -45,6 +52,9 @@ class ConsolePrEdit(ConsoleBase):
         # When executing code, that takes longer than this seconds, flash the window
         self.flash_window = None
 
+        # Runs the coroutine created when executing code using top-level await
+        self.async_runner = AsyncRunner(process_events=QApplication.processEvents)
+
         # Store previous commands to retrieve easily
         self._prevCommands = []
         self._prevCommandIndex = 0
@@ -186,6 +196,16 @@ class ConsolePrEdit(ConsoleBase):
         # workboxes are, and py3 doesn't include in the traceback
         self.consoleLine = consoleLine or ""
 
+        if self.async_runner.is_running():
+            # This was called while a top-level await is processing Qt events.
+            # Running it now would need to re-enter the busy event loop.
+            self.write(
+                "Unable to execute code while a previous top-level await is "
+                "still running.\n",
+                stream_type=StreamType.CONSOLE | StreamType.STDERR,
+            )
+            return None, False
+
         if self.clearExecutionTime is not None:
             self.clearExecutionTime()
         cursor = self.textCursor()
@@ -205,16 +225,22 @@ class ConsolePrEdit(ConsoleBase):
         wasEval = False
         startTime = time.time()
 
+        # Allow using `await` outside of a async function. When used, calling
+        # eval on the compiled code returns a coroutine that needs to be awaited.
+        flags = getattr(ast, "PyCF_ALLOW_TOP_LEVEL_AWAIT", 0)
         try:
-            compiled = compile(commandText, filename, 'eval')
+            compiled = compile(commandText, filename, 'eval', flags=flags)
             wasEval = True
         except Exception:
-            compiled = compile(commandText, filename, 'exec')
+            compiled = compile(commandText, filename, 'exec', flags=flags)
 
         # We wrap in try / finally so that elapsed time gets updated, even when an
         # exception is raised.
         try:
-            if wasEval:
+            if compiled.co_flags & inspect.CO_COROUTINE:
+                coroutine = eval(compiled, __main__.__dict__, __main__.__dict__)
+                cmdresult = self.async_runner.run(coroutine)
+            elif wasEval:
                 cmdresult = eval(compiled, __main__.__dict__, __main__.__dict__)
             else:
                 exec(compiled, __main__.__dict__, __main__.__dict__)
@@ -378,7 +404,7 @@ class ConsolePrEdit(ConsoleBase):
         # completions and highlight it. We must manually add the currently typed
         # character, or remove it if backspace or delete has just been pressed.
         key = event.text()
-        _, prefix = completer.currentObject(scope=__main__.__dict__)
+        prefix = completer.currentPrefix()
         isBackspaceOrDel = event.key() in (Qt.Key.Key_Backspace, Qt.Key.Key_Delete)
         if key.isalnum() or key in ("-", "_"):
             prefix += str(key)
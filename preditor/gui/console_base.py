@@ -37,6 +37,9 @@ class ConsoleBase(QTextEdit):
     logging_formatter = FormatterDescriptor(default=_default_format)
     """Used to format logging messages if logging_handlers doesn't define it."""
 
+    _codeHighlighterClass = CodeHighlighter
+    """The CodeHighlighter subclass used to highlight code in this console."""
+
     def __init__(self, parent: QWidget, controller: Optional[LoggerWindow] = None):
         super().__init__(parent)
         self._controller = None
@@ -57,13 +60,15 @@ class ConsoleBase(QTextEdit):
         """
 
         # Create the highlighter
-        highlight = CodeHighlighter(self, 'Python')
+        highlight = self._codeHighlighterClass(self, 'Python')
         self.setCodeHighlighter(highlight)
 
         self.addSepNewline = False
         self.consoleLine = None
         self.mousePressPos = None
         self.logging_info = {}
+        # Callables called instead of errorHyperlink when their href is clicked.
+        self._anchor_callbacks = {}
 
         self.init_actions()
 
@@ -119,6 +124,20 @@ class ConsoleBase(QTextEdit):
         pattern = r'File "(?P<filename>.*)", line (?P<lineNum>\d{1,10})(, in|\r\n|\n|$)'
         cls.traceback_pattern = re.compile(pattern)
 
+    def addAnchorCallback(self, href, callback):
+        """Call callback when a hyperlink using href is clicked instead of
+        treating it as a error hyperlink.
+
+        Args:
+            href (str): The anchor href of the hyperlink.
+            callback (callable): Called with no arguments when clicked.
+        """
+        self._anchor_callbacks[href] = callback
+
+    def removeAnchorCallback(self, href):
+        """Remove the callback added for href by `addAnchorCallback`."""
+        self._anchor_callbacks.pop(href, None)
+
     def add_separator(self):
         """Add a marker line for visual separation of console output."""
         # Ensure the input is written to the end of the document on a new line
@@ -204,6 +223,7 @@ class ConsoleBase(QTextEdit):
             return
 
         # info is a comma separated string, in the form: "filename, workboxIdx, lineNum"
+        # optionally followed by ", backupFile"
         info = anchor.split(', ')
         modulePath = info[0]
         workboxName = info[1]
@@ -271,6 +291,9 @@ class ConsoleBase(QTextEdit):
             # using preditor.launch on the assumption that some widget has already
             # initialized it to store in self.controller.
             self.controller.launch(focus=False)
+            if len(info) > 3:
+                # Links from searching workbox history open a specific version
+                self.controller.change_to_workbox_backup_file(workbox, info[3])
             workbox.__goto_line__(lineNum)
             workbox.setFocus()
 
@@ -462,7 +485,11 @@ class ConsoleBase(QTextEdit):
         anchor = self.anchorAt(event.pos())
 
         if samePos and left and anchor:
-            self.errorHyperlink(anchor)
+            callback = self._anchor_callbacks.get(anchor)
+            if callback:
+                callback()
+            else:
+                self.errorHyperlink(anchor)
         self.mousePressPos = None
 
         QApplication.restoreOverrideCursor()
@@ -797,7 +824,11 @@ class ConsoleBase(QTextEdit):
                 msg = "\n" + msg
             self.addSepNewline = False
 
-        preditorCalls = ("cmdresult = e", "exec(compiled,")
+        preditorCalls = (
+            "cmdresult = e",
+            "exec(compiled,",
+            "cmdresult = self.async_runner.run(",
+        )
         if msg.strip().startswith(preditorCalls):
             self.addSepNewline = True
 
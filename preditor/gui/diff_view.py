@@ -0,0 +1,423 @@
+from __future__ import absolute_import
+
+from functools import partial
+from pathlib import Path
+
+from Qt.QtCore import QObject, QRunnable, Qt, QThreadPool, QTimer, Signal, Slot
+from Qt.QtGui import QColor, QTextCursor, QTextFormat
+from Qt.QtWidgets import (
+    QCheckBox,
+    QComboBox,
+    QHBoxLayout,
+    QLabel,
+    QPlainTextEdit,
+    QPushButton,
+    QSplitter,
+    QStackedWidget,
+    QTextEdit,
+    QVBoxLayout,
+    QWidget,
+)
+
+from ..utils.text_diff import (
+    DIFF_MAX_LINES,
+    compute_diff,
+    revert_edit,
+    side_by_side_rows,
+    unified_rows,
+)
+from .workbox_mixin import WorkboxMixin
+
+# The background color of each kind of row
+ROW_COLORS = {
+    "delete": QColor(255, 80, 80, 60),
+    "insert": QColor(80, 200, 80, 60),
+    "replace": QColor(240, 180, 40, 60),
+}
+
+
+class DiffSignals(QObject):
+    """Signals emitted by `DiffTask`. This lives in the gui thread so the
+    signals are delivered to it using a queued connection."""
+
+    # diff_id, DiffResult
+    finished = Signal(int, object)
+
+
+class DiffTask(QRunnable):
+    """Compares a snapshot of a workbox's text to another text in a
+    `QThreadPool`.
+
+    Args:
+        signals (DiffSignals): Used to send the result to the gui thread.
+        diff_id (int): Identifies the comparison. This lets the results of
+            outdated comparisons be ignored.
+        new_text (str): A snapshot of the workbox's text.
+        old_text (str, optional): The text to compare against.
+        old_path (str, optional): Compare against the contents of this file
+            instead of old_text. The file is read in the thread.
+        max_lines (int, optional): Passed to `compute_diff`.
+    """
+
+    def __init__(
+        self,
+        signals,
+        diff_id,
+        new_text,
+        old_text="",
+        old_path=None,
+        max_lines=DIFF_MAX_LINES,
+    ):
+        super(DiffTask, self).__init__()
+        self.signals = signals
+        self.diff_id = diff_id
+        self.new_text = new_text
+        self.old_text = old_text
+        self.old_path = old_path
+        self.max_lines = max_lines
+
+    def run(self):
+        old_text = self.old_text
+        if self.old_path is not None:
+            try:
+                _encoding, old_text = WorkboxMixin.__open_file__(
+                    self.old_path, strict=False
+                )
+            except OSError:
+                old_text = ""
+        result = compute_diff(old_text, self.new_text, max_lines=self.max_lines)
+        self.signals.finished.emit(self.diff_id, result)
+
+
+class DiffView(QWidget):
+    """Shows the changes to a workbox compared to one of its backups, its
+    linked file or another workbox.
+
+    The texts are compared in a thread pool, and compared again shortly after
+    the workbox's text changes. The changes are shown as a unified diff or next
+    to each other. The previous and next change buttons move between the
+    changes, clicking on a change selects it. The selected change can be
+    reverted to the text it's compared against.
+
+    Args:
+        workbox (WorkboxMixin): The workbox to compare.
+        manager (GroupTabWidget): Provides the other workboxes to compare with.
+        parent (QWidget, optional): The parent of this window.
+    """
+
+    max_lines = DIFF_MAX_LINES
+    """Texts with more lines than this combined are not compared."""
+
+    def __init__(self, workbox, manager, parent=None):
+        super(DiffView, self).__init__(parent)
+        self.setWindowFlags(Qt.WindowType.Window)
+        self.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+        self.workbox = workbox
+        self.manager = manager
+        # The (label, kind, value) of each text that can be compared with
+        self.sources = []
+        self.result = None
+        # The rows shown by the unified and side-by-side views
+        self.rows = []
+        self.current_hunk = None
+        self._revision = None
+
+        self.pool = QThreadPool(self)
+        self._diff_id = 0
+        self._signals = DiffSignals(self)
+        self._signals.finished.connect(
+            self._finished, Qt.ConnectionType.QueuedConnection
+        )
+
+        # Compare again once the user stops typing
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(500)
+        self.timer.timeout.connect(self.refresh)
+        workbox.textChanged.connect(self.timer.start)
+        workbox.destroyed.connect(self.close)
+
+        self.setWindowTitle("Compare {}".format(workbox.__workbox_name__()))
+        self.uiSourceDDL = QComboBox(self)
+        self.uiSideBySideCHK = QCheckBox("Side by side", self)
+        self.uiPreviousBTN = QPushButton("Previous Change", self)
+        self.uiNextBTN = QPushButton("Next Change", self)
+        self.uiRevertBTN = QPushButton("Revert Change", self)
+        self.uiRevertBTN.setToolTip(
+            "Replace the selected change with the text it's compared with."
+        )
+        self.uiStatusLBL = QLabel(self)
+
+        font = workbox.__font__()
+        self.uiUnifiedTXT = self._create_text_edit(font)
+        self.uiOldTXT = self._create_text_edit(font)
+        self.uiNewTXT = self._create_text_edit(font)
+        # Scroll both sides together
+        old_bar = self.uiOldTXT.verticalScrollBar()
+        new_bar = self.uiNewTXT.verticalScrollBar()
+        old_bar.valueChanged.connect(new_bar.setValue)
+        new_bar.valueChanged.connect(old_bar.setValue)
+
+        splitter = QSplitter(self)
+        splitter.addWidget(self.uiOldTXT)
+        splitter.addWidget(self.uiNewTXT)
+        self.uiViewSTACK = QStackedWidget(self)
+        self.uiViewSTACK.addWidget(self.uiUnifiedTXT)
+        self.uiViewSTACK.addWidget(splitter)
+
+        toolbar = QHBoxLayout()
+        toolbar.addWidget(QLabel("Compare with", self))
+        toolbar.addWidget(self.uiSourceDDL, 1)
+        toolbar.addWidget(self.uiSideBySideCHK)
+        toolbar.addWidget(self.uiPreviousBTN)
+        toolbar.addWidget(self.uiNextBTN)
+        toolbar.addWidget(self.uiRevertBTN)
+        layout = QVBoxLayout(self)
+        layout.addLayout(toolbar)
+        layout.addWidget(self.uiViewSTACK, 1)
+        layout.addWidget(self.uiStatusLBL)
+
+        self.update_sources()
+        self.uiSourceDDL.currentIndexChanged.connect(self.refresh)
+        self.uiSideBySideCHK.toggled.connect(self.set_side_by_side)
+        self.uiPreviousBTN.clicked.connect(self.previous_change)
+        self.uiNextBTN.clicked.connect(self.next_change)
+        self.uiRevertBTN.clicked.connect(self.revert_change)
+        self.resize(900, 600)
+        self.refresh()
+
+    def _create_text_edit(self, font):
+        edit = QPlainTextEdit(self)
+        edit.setReadOnly(True)
+        edit.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
+        edit.setFont(font)
+        edit.cursorPositionChanged.connect(partial(self._cursor_moved, edit))
+        return edit
+
+    def _cursor_moved(self, edit):
+        # Clicking on a change selects it
+        row = edit.textCursor().blockNumber()
+        if row < len(self.rows) and self.rows[row].hunk is not None:
+            self.current_hunk = self.rows[row].hunk
+            self.update_buttons()
+
+    @Slot(int, object)
+    def _finished(self, diff_id, result):
+        if diff_id != self._diff_id:
+            # The texts were compared again since this was started
+            return
+        self.result = result
+        if self.current_hunk is not None:
+            # Stay on the same change, like after reverting the previous one
+            count = len(result.hunks or [])
+            self.current_hunk = min(self.current_hunk, count - 1) if count else None
+        self.render()
+
+    def goto_hunk(self, index):
+        """Select the change index and scroll to it."""
+        self.current_hunk = index
+        row = next(i for i, row in enumerate(self.rows) if row.hunk == index)
+        for edit in self.text_edits():
+            block = edit.document().findBlockByNumber(row)
+            edit.setTextCursor(QTextCursor(block))
+            edit.centerCursor()
+        self.update_buttons()
+
+    def next_change(self):
+        if not self.result or not self.result.hunks:
+            return
+        if self.current_hunk is None:
+            self.goto_hunk(0)
+        else:
+            self.goto_hunk(min(self.current_hunk + 1, len(self.result.hunks) - 1))
+
+    def previous_change(self):
+        if not self.result or not self.result.hunks:
+            return
+        if self.current_hunk is None:
+            self.goto_hunk(len(self.result.hunks) - 1)
+        else:
+            self.goto_hunk(max(self.current_hunk - 1, 0))
+
+    @Slot()
+    def refresh(self):
+        """Compare the workbox's text again in the thread pool."""
+        self.timer.stop()
+        self._diff_id += 1
+        self._revision = self.workbox.__revision__()
+        self.result = None
+        self.update_buttons()
+
+        index = self.uiSourceDDL.currentIndex()
+        if index < 0:
+            self.uiStatusLBL.setText("There is nothing to compare with.")
+            return
+        self.uiStatusLBL.setText("Comparing...")
+        _label, kind, value = self.sources[index]
+        old_text, old_path = "", None
+        if kind == "workbox":
+            old_text = value.__text_snapshot__()
+        else:
+            old_path = value
+        self.pool.start(
+            DiffTask(
+                self._signals,
+                self._diff_id,
+                self.workbox.__text__(),
+                old_text=old_text,
+                old_path=old_path,
+                max_lines=self.max_lines,
+            )
+        )
+
+    def render(self):
+        """Show the current result in the unified and side-by-side views."""
+        result = self.result
+        self.rows = []
+        for edit in self.text_edits(all_views=True):
+            edit.clear()
+        if result.too_large:
+            self.uiStatusLBL.setText(
+                "The texts are too large to compare, they have {} lines and the "
+                "limit is {}.".format(
+                    len(result.old_lines) + len(result.new_lines), self.max_lines
+                )
+            )
+            self.update_buttons()
+            return
+
+        def line(lines, index):
+            if index is None:
+                return ""
+            return lines[index].rstrip("\r\n")
+
+        def number(index):
+            return "" if index is None else index + 1
+
+        if self.uiSideBySideCHK.isChecked():
+            self.rows = side_by_side_rows(result)
+            old_text = []
+            new_text = []
+            for row in self.rows:
+                old_text.append(
+                    "{:>5} {}".format(
+                        number(row.old_line), line(result.old_lines, row.old_line)
+                    )
+                )
+                new_text.append(
+                    "{:>5} {}".format(
+                        number(row.new_line), line(result.new_lines, row.new_line)
+                    )
+                )
+            self.uiOldTXT.setPlainText("\n".join(old_text))
+            self.uiNewTXT.setPlainText("\n".join(new_text))
+        else:
+            self.rows = unified_rows(result)
+            signs = {"delete": "-", "insert": "+", "equal": " "}
+            text = []
+            for row in self.rows:
+                if row.kind == "gap":
+                    text.append("{:>5} {:>5}  ...".format("", ""))
+                    continue
+                lines = result.new_lines if row.kind == "insert" else result.old_lines
+                index = row.new_line if row.kind == "insert" else row.old_line
+                text.append(
+                    "{:>5} {:>5} {}{}".format(
+                        number(row.old_line),
+                        number(row.new_line),
+                        signs[row.kind],
+                        line(lines, index),
+                    )
+                )
+            self.uiUnifiedTXT.setPlainText("\n".join(text))
+
+        for edit in self.text_edits():
+            selections = []
+            block = edit.document().begin()
+            for row in self.rows:
+                color = ROW_COLORS.get(row.kind)
+                if color is not None:
+                    selection = QTextEdit.ExtraSelection()
+                    selection.format.setBackground(color)
+                    selection.format.setProperty(
+                        QTextFormat.Property.FullWidthSelection, True
+                    )
+                    selection.cursor = QTextCursor(block)
+                    selections.append(selection)
+                block = block.next()
+            edit.setExtraSelections(selections)
+
+        count = len(result.hunks)
+        if count:
+            self.uiStatusLBL.setText(
+                "{} change{}".format(count, "" if count == 1 else "s")
+            )
+            if self.current_hunk is not None:
+                self.goto_hunk(self.current_hunk)
+        else:
+            self.uiStatusLBL.setText("No differences")
+        self.update_buttons()
+
+    def revert_change(self):
+        """Replace the selected change in the workbox with the text it's
+        compared with."""
+        if self.result is None or self.current_hunk is None:
+            return
+        if self.workbox.__revision__() != self._revision:
+            # The result no longer matches the workbox's text
+            self.refresh()
+            return
+        edit = revert_edit(self.result, self.current_hunk)
+        self.workbox.__replace_text__([edit])
+        self.refresh()
+
+    def set_side_by_side(self, state):
+        self.uiViewSTACK.setCurrentIndex(1 if state else 0)
+        if self.result is not None:
+            self.render()
+
+    def text_edits(self, all_views=False):
+        """Returns the text edits of the current view, or every view."""
+        if all_views:
+            return [self.uiUnifiedTXT, self.uiOldTXT, self.uiNewTXT]
+        if self.uiSideBySideCHK.isChecked():
+            return [self.uiOldTXT, self.uiNewTXT]
+        return [self.uiUnifiedTXT]
+
+    def update_buttons(self):
+        has_changes = bool(self.result and self.result.hunks)
+        self.uiPreviousBTN.setEnabled(has_changes)
+        self.uiNextBTN.setEnabled(has_changes)
+        self.uiRevertBTN.setEnabled(
+            has_changes
+            and self.current_hunk is not None
+            and not self.workbox.isReadOnly()
+        )
+        if has_changes and self.current_hunk is not None:
+            self.uiStatusLBL.setText(
+                "Change {} of {}".format(self.current_hunk + 1, len(self.result.hunks))
+            )
+
+    def update_sources(self):
+        """Update the list of texts the workbox can be compared with: its
+        linked file, its backups from newest to oldest and the other
+        workboxes."""
+        self.sources = []
+        filename = self.workbox.__filename__()
+        if filename and Path(filename).is_file():
+            label = "Linked file: {}".format(Path(filename).name)
+            self.sources.append((label, "file", filename))
+        for time_str, _backup_file, filepath in reversed(
+            self.workbox.__history_versions__()
+        ):
+            self.sources.append(("Backup: {}".format(time_str), "backup", filepath))
+        for editor, group_name, tab_name, _, _ in self.manager.all_widgets():
+            if editor is self.workbox:
+                continue
+            label = "Workbox: {}/{}".format(group_name, tab_name)
+            self.sources.append((label, "workbox", editor))
+
+        blocked = self.uiSourceDDL.blockSignals(True)
+        self.uiSourceDDL.clear()
+        self.uiSourceDDL.addItems([label for label, _, _ in self.sources])
+        self.uiSourceDDL.blockSignals(blocked)
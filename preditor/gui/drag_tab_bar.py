@@ -4,7 +4,7 @@ from enum import IntEnum
 from functools import partial
 from pathlib import Path
 
-from Qt.QtCore import QByteArray, QMimeData, QPoint, QRect, Qt
+from Qt.QtCore import QByteArray, QMimeData, QPoint, QRect, Qt, QTimer, Signal
 from Qt.QtGui import QColor, QCursor, QDrag, QPixmap, QRegion
 from Qt.QtWidgets import (
     QApplication,
@@ -62,6 +62,9 @@ class DragTabBar(QTabBar):
     orphanedColor = QtPropertyInit('_orphanedColor', QColor("grey"))
     orphanedLinkedColor = QtPropertyInit('_orphanedLinkedColor', QColor("grey"))
 
+    # Emitted when a tab is added, removed, moved or renamed.
+    tabsChanged = Signal()
+
     def __init__(self, parent=None, mime_type='DragTabBar'):
         super(DragTabBar, self).__init__(parent=parent)
         self.setAcceptDrops(True)
@@ -73,6 +76,16 @@ class DragTabBar(QTabBar):
         self.fg_color_map = {}
         self.bg_color_map = {}
 
+        # Tab updates requested by `scheduleTabUpdate` are debounced using this
+        # timer so typing doesn't update the tabs on every keystroke.
+        self._pending_updates = []
+        self._update_timer = QTimer(self)
+        self._update_timer.setSingleShot(True)
+        self._update_timer.setInterval(100)
+        self._update_timer.timeout.connect(self.flushTabUpdates)
+
+        self.tabMoved.connect(self.tabsChanged)
+
     def updateColorMap(self):
         """This cannot be called during __init__, otherwise all bg colors will
         be default, and not read from the style sheet. So instead, the first
@@ -222,14 +235,60 @@ class DragTabBar(QTabBar):
         """Update the color and tooltip for all the tabs in this tabBar. Also,
         update the tabBar above it.
         """
+        # All tabs are updated so any scheduled updates are not needed
+        self._update_timer.stop()
+        self._pending_updates = []
+
         for index in range(self.count()):
             self.updateColorAndToolTip(index)
+        self.updateParentColorAndToolTip()
 
+    def updateParentColorAndToolTip(self):
+        """Update the color and tooltip of the tab in the tabBar above this one
+        that contains this tabBar's tab widget, if any."""
         parentIdx = self.window().indexOfWorkboxOrTabGroup(self.parent())
         if parentIdx is not None:
             tabBar = self.parent().__tab_widget__().tabBar()
             tabBar.updateColorAndToolTip(parentIdx)
 
+    def scheduleTabUpdate(self, widget):
+        """Update the color and tooltip of the tab containing widget once the
+        update timer times out. Scheduling another update restarts the timer,
+        so frequent changes like typing only update the tab once they pause.
+
+        Args:
+            widget (QWidget): The widget whose tab needs updating.
+        """
+        if widget not in self._pending_updates:
+            self._pending_updates.append(widget)
+        self._update_timer.start()
+
+    def flushTabUpdates(self):
+        """Update the tabs of any widgets passed to `scheduleTabUpdate` now."""
+        self._update_timer.stop()
+        widgets, self._pending_updates = self._pending_updates, []
+        if not widgets or not self.parent():
+            return
+
+        for widget in widgets:
+            index = self.parent().indexOf(widget)
+            # The widget may have been moved or closed since it was scheduled
+            if index != -1:
+                self.updateColorAndToolTip(index)
+        self.updateParentColorAndToolTip()
+
+    def setTabText(self, index, text):  # noqa: N802
+        super(DragTabBar, self).setTabText(index, text)
+        self.tabsChanged.emit()
+
+    def tabInserted(self, index):  # noqa: N802
+        super(DragTabBar, self).tabInserted(index)
+        self.tabsChanged.emit()
+
+    def tabRemoved(self, index):  # noqa: N802
+        super(DragTabBar, self).tabRemoved(index)
+        self.tabsChanged.emit()
+
     def mouseMoveEvent(self, event):  # noqa: N802
         if not self._mime_data:
             return super(DragTabBar, self).mouseMoveEvent(event)
@@ -1,12 +1,466 @@
 from __future__ import absolute_import, print_function
 
-from Qt.QtCore import Qt, Slot
-from Qt.QtGui import QIcon, QKeySequence
-from Qt.QtWidgets import QApplication, QShortcut, QWidget
+import re
+import threading
+import time
+from collections import deque
+
+from Qt import QtCompat
+from Qt.QtCore import QObject, QRunnable, Qt, QThreadPool, QTimer, Signal, Slot
+from Qt.QtGui import QIcon, QKeySequence, QTextCursor
+from Qt.QtWidgets import QShortcut, QWidget
 
 from .. import resourcePath
+from ..utils.search_results import to_grep, to_json
 from ..utils.text_search import RegexTextSearch, SimpleTextSearch
+from ..utils.trigram_index import get_trigram_index, read_backup
 from . import loadUi
+from .replace_files import ReplaceFiles
+from .workbox_mixin import WorkboxMixin
+
+
+def search_workboxes(managers, finder):
+    """Search the text of every workbox without a gui.
+
+    This is the same search run by `FindFiles` but runs synchronously and
+    returns the structured results instead of writing them to a console. Like
+    `FindFiles`, workboxes that are not loaded are searched without loading them.
+
+    Args:
+        managers (list): The GroupTabWidgets whose workboxes are searched.
+        finder (TextSearch): Finds the text to search for.
+
+    Returns:
+        list: A `SearchResult` for each workbox with matches, in tab order.
+    """
+    results = []
+    for manager in managers:
+        for editor, group_name, tab_name, _, _ in manager.all_widgets():
+            result = finder.search_results(
+                editor.__text_snapshot__(),
+                "/".join((group_name, tab_name)),
+                editor.__workbox_name__(),
+                workbox_id=editor.__workbox_id__(),
+            )
+            if result:
+                results.append(result)
+    return results
+
+
+class FindFilesSignals(QObject):
+    """Signals emitted by `FindFilesTask`. This lives in the gui thread so the
+    signals are delivered to it using a queued connection."""
+
+    # search_id, index, fragments, results, index_update
+    searched = Signal(int, int, object, object, object)
+
+
+class FindFilesTask(QRunnable):
+    """Searches a snapshot of a workbox's text in a `QThreadPool`.
+
+    The text is searched with a new instance of the TextSearch class so each task
+    has its own state. The SearchResults are rendered in this thread. Instead of
+    writing them, the finder callbacks are recorded as fragments that are sent
+    back to the gui thread with the results and written there in the same order
+    they were generated.
+
+    The text of workboxes that are not loaded is read from filepath in the
+    thread, so searching doesn't read every backup or linked file in the gui
+    thread.
+
+    Args:
+        signals (FindFilesSignals): Used to send the results to the gui thread.
+        search_id (int): Identifies the search this task is part of. This lets
+            results from a canceled search be ignored.
+        index (int): The order of this workbox in the search results.
+        finder (TextSearch): Used to create a TextSearch for this task with the
+            same settings.
+        text (str): A snapshot of the workbox text to search.
+        path (str): The group and tab name of the workbox separated by a `/`.
+        workbox_name (str): From editor.__workbox_name__().
+        cancelled (threading.Event): If set the search is not run.
+        workbox_id (str, optional): From editor.__workbox_id__().
+        filepath (str, optional): Search the contents of this file instead of
+            text. The file is read in the thread.
+        sample_size (int, optional): Passed to `WorkboxMixin.__open_file__` when
+            reading filepath.
+        trigram_index (TrigramIndex, optional): If provided, filepath is a
+            backup file that isn't indexed yet. Its entry is built in the thread
+            and added to the index in the gui thread.
+    """
+
+    def __init__(
+        self,
+        signals,
+        search_id,
+        index,
+        finder,
+        text,
+        path,
+        workbox_name,
+        cancelled,
+        workbox_id=None,
+        filepath=None,
+        sample_size=None,
+        trigram_index=None,
+    ):
+        super(FindFilesTask, self).__init__()
+        self.signals = signals
+        self.search_id = search_id
+        self.index = index
+        self.finder = type(finder)(
+            finder.find_text, finder.case_sensitive, context=finder.context
+        )
+        self.text = text
+        self.path = path
+        self.workbox_name = workbox_name
+        self.cancelled = cancelled
+        self.workbox_id = workbox_id
+        self.filepath = filepath
+        self.sample_size = sample_size
+        self.trigram_index = trigram_index
+        # The (trigram_index, workbox_id, entry) to add to the index
+        self.index_update = None
+
+    def read(self):
+        """Read the text to search from filepath if provided."""
+        if self.filepath is None:
+            return
+        try:
+            _encoding, self.text = WorkboxMixin.__open_file__(
+                self.filepath, strict=False, sample_size=self.sample_size
+            )
+        except OSError:
+            self.text = ""
+            return
+        if self.trigram_index is not None:
+            entry = self.trigram_index.build_entry(self.text, self.filepath)
+            self.index_update = (self.trigram_index, self.workbox_id, entry)
+
+    def run(self):
+        fragments = []
+        results = []
+        if not self.cancelled.is_set():
+            self.read()
+            results = self.search()
+
+        # Record the finder's output so it can be written in the gui thread
+        self.finder.callback_non_matching = lambda text: fragments.append(
+            (False, (text,))
+        )
+        for result in results:
+            # Links to a backup file open that version of the workbox
+            version = (result.backup_file,) if result.backup_file else ()
+            self.finder.callback_matching = (
+                lambda *args, version=version: fragments.append((True, args + version))
+            )
+            self.finder.render(result)
+
+        self.signals.searched.emit(
+            self.search_id, self.index, fragments, results, self.index_update
+        )
+
+    def search(self):
+        """Returns a list of the SearchResults for the text."""
+        result = self.finder.search_results(
+            self.text, self.path, self.workbox_name, workbox_id=self.workbox_id
+        )
+        return [result] if result else []
+
+
+class FindHistoryTask(FindFilesTask):
+    """Searches every backup version of a workbox in a `QThreadPool`.
+
+    Versions are searched from oldest to newest. Each match is only shown for
+    the first version that contains its line, later versions containing the
+    same line are not shown again. Versions with the same contents as one
+    already searched are skipped using a hash of their contents. The results
+    are grouped by version, newest first, and link to that specific version.
+
+    Args:
+        versions (list): The `(time_str, backup_file, filepath)` tuples returned
+            by `__history_versions__` for the workbox to search.
+
+    See `FindFilesTask` for the other arguments.
+    """
+
+    def __init__(
+        self,
+        signals,
+        search_id,
+        index,
+        finder,
+        versions,
+        path,
+        workbox_name,
+        cancelled,
+        workbox_id=None,
+    ):
+        super(FindHistoryTask, self).__init__(
+            signals,
+            search_id,
+            index,
+            finder,
+            None,
+            path,
+            workbox_name,
+            cancelled,
+            workbox_id=workbox_id,
+        )
+        self.versions = versions
+
+    def search(self):
+        results = []
+        hashes = set()
+        for time_str, backup_file, filepath in self.versions:
+            if self.cancelled.is_set():
+                break
+            try:
+                digest, text = read_backup(filepath)
+            except OSError:
+                continue
+            if digest in hashes:
+                # An unchanged version can't contain any new matches
+                continue
+            hashes.add(digest)
+
+            result = self.finder.search_results(
+                text,
+                "{} ({})".format(self.path, time_str),
+                self.workbox_name,
+                workbox_id=self.workbox_id,
+                backup_file=backup_file,
+            )
+            if result is None:
+                continue
+            results.append(result)
+
+            # Don't show the lines matched by this version for newer versions
+            for line in result.lines:
+                if line.spans:
+                    self.finder.ignored_lines.add(line.text)
+
+        results.reverse()
+        return results
+
+
+class ResultRenderer(QObject):
+    """Writes search results to a console in batches from a timer.
+
+    Results are added as groups of fragments, normally all of the results for a
+    single workbox. Each fragment is a tuple of `(matching, args)`. If matching
+    is True args are passed to `write_link` otherwise to `write_text`. Groups are
+    written in the order they are added without re-entering the event loop. Each
+    time the timer fires fragments are written until `budget` seconds have
+    passed, letting the gui process user input between batches.
+
+    Once `limit` links have been written, any remaining groups with links are
+    held back and a "more results" hyperlink is written in their place. Clicking
+    it writes the next `limit` links at that position. Groups without links,
+    like the search summary, are still written.
+
+    Args:
+        console (QTextEdit): The widget the results are written to.
+        parent (QObject, optional): The parent of this object.
+    """
+
+    more_href = 'preditor-find-files:more-results'
+
+    def __init__(self, console=None, parent=None):
+        super(ResultRenderer, self).__init__(parent)
+        self.console = console
+        self.budget = 0.01
+        self.limit = 2000
+        self._queue = deque()
+        # Groups held back after reaching limit, and the number of links in them
+        self._held = []
+        self._held_links = 0
+        self._link_count = 0
+        # While writing held results, the cursor they are inserted at
+        self._expand_cursor = None
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self._write_batch)
+
+    def add(self, fragments):
+        """Add a group of fragments to be written."""
+        if fragments:
+            self._queue.append(list(fragments))
+            self._timer.start()
+
+    def add_text(self, text):
+        """Add plain text to be written."""
+        self.add([(False, (text,))])
+
+    def call(self, callback):
+        """Call callback once all fragments added before it are written."""
+        self._queue.append(callback)
+        self._timer.start()
+
+    def reset(self):
+        """Write any pending results and start counting links for `limit` again.
+
+        Held results are discarded, their "more results" link no longer does
+        anything.
+        """
+        self.flush()
+        self._held = []
+        self._held_links = 0
+        self._link_count = 0
+
+    def expand(self):
+        """Write the held results at the position of the "more results" link."""
+        if not self._held:
+            return
+        # Write any pending results so they are not inserted with held results
+        self.flush()
+
+        # Remove the more results link and write the held results in its place.
+        cursor = self._find_more_link()
+        if cursor is None:
+            return
+        # Include the newlines written around the link
+        start = cursor.selectionStart()
+        end = cursor.selectionEnd()
+        cursor.setPosition(max(0, start - 1))
+        cursor.setPosition(
+            min(end + 1, self.console.document().characterCount() - 1),
+            QTextCursor.MoveMode.KeepAnchor,
+        )
+        cursor.removeSelectedText()
+        self._expand_cursor = cursor
+
+        self._link_count = 0
+        held, self._held = self._held, []
+        self._held_links = 0
+        self._queue.extendleft(reversed(held))
+        self._timer.start()
+
+    def _find_more_link(self):
+        """Returns a cursor selecting the "more results" link or None."""
+        block = self.console.document().begin()
+        while block.isValid():
+            it = block.begin()
+            while not it.atEnd():
+                fragment = it.fragment()
+                if fragment.charFormat().anchorHref() == self.more_href:
+                    cursor = QTextCursor(self.console.document())
+                    cursor.setPosition(fragment.position())
+                    cursor.setPosition(
+                        fragment.position() + fragment.length(),
+                        QTextCursor.MoveMode.KeepAnchor,
+                    )
+                    return cursor
+                it += 1
+            block = block.next()
+        return None
+
+    def flush(self):
+        """Write all pending results now."""
+        while self._queue:
+            self._write_batch(budget=None)
+
+    def pending(self):
+        """Returns True if there are results waiting to be written."""
+        return bool(self._queue)
+
+    def _cursor(self):
+        if self._expand_cursor is not None:
+            return self._expand_cursor
+        cursor = QTextCursor(self.console.document())
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        return cursor
+
+    def _write_batch(self, budget=False):
+        if budget is False:
+            budget = self.budget
+        start = time.perf_counter()
+        cursor = self._cursor()
+        cursor.beginEditBlock()
+        try:
+            while self._queue:
+                item = self._queue[0]
+                if callable(item):
+                    # Callbacks may write to the console, finish the edit first
+                    self._queue.popleft()
+                    cursor.endEditBlock()
+                    item()
+                    cursor = self._cursor()
+                    cursor.beginEditBlock()
+                    continue
+
+                links = sum(1 for matching, _ in item if matching)
+                if links and (self._held or self._link_count >= self.limit):
+                    self._queue.popleft()
+                    self._hold(cursor, item, links)
+                    continue
+
+                self._queue.popleft()
+                self._link_count += links
+                for matching, args in item:
+                    if matching:
+                        self.write_link(cursor, *args)
+                    else:
+                        self.write_text(cursor, *args)
+
+                if budget is not None and time.perf_counter() - start > budget:
+                    break
+        finally:
+            cursor.endEditBlock()
+
+        if not self._queue:
+            self._timer.stop()
+            # Any remaining results are written at the end of the console
+            self._expand_cursor = None
+
+    def _hold(self, cursor, group, links):
+        """Hold back a group of results, writing the "more results" link if this
+        is the first group held."""
+        if not self._held:
+            text = '... only the first {} results are shown, click to show more'
+            self.write_text(cursor, '\n')
+            self.write_anchor(
+                cursor, text.format(self.limit), self.more_href, 'Show more results'
+            )
+            self.write_text(cursor, '\n')
+            if hasattr(self.console, "addAnchorCallback"):
+                self.console.addAnchorCallback(self.more_href, self.expand)
+        self._held.append(group)
+        self._held_links += links
+
+    def held_count(self):
+        """The number of links held back by `limit`."""
+        return self._held_links
+
+    @classmethod
+    def write_anchor(cls, cursor, text, href, tool_tip):
+        """Insert a hyperlink to href at cursor."""
+        fmt = cursor.charFormat()
+        fmt.setAnchor(True)
+        fmt.setAnchorHref(href)
+        fmt.setFontUnderline(True)
+        fmt.setToolTip(tool_tip)
+        cursor.insertText(text, fmt)
+
+    @classmethod
+    def write_link(cls, cursor, text, workbox_id, line_num, tool_tip, version=None):
+        """Insert a hyperlink to line_num of the workbox_id at cursor. If version
+        is passed, the link opens that backup file of the workbox."""
+        href = ', {}, {}'.format(workbox_id, line_num)
+        if version:
+            href = '{}, {}'.format(href, version)
+        cls.write_anchor(cursor, text, href, tool_tip)
+
+    @classmethod
+    def write_text(cls, cursor, text):
+        """Insert plain text at cursor."""
+        fmt = cursor.charFormat()
+        fmt.setAnchor(False)
+        fmt.setAnchorHref('')
+        fmt.setFontUnderline(False)
+        fmt.setToolTip('')
+        cursor.insertText(text, fmt)
 
 
 class FindFiles(QWidget):
@@ -15,11 +469,32 @@ class FindFiles(QWidget):
         if managers is None:
             managers = []
         self.managers = managers
+        # Writes the results to the console
+        self.renderer = ResultRenderer(parent=self)
         self.console = console
         self.finder = None
         self.match_files_count = 0
+        # The SearchResults of the last search, in the order they are shown
+        self.results = []
+
+        # The text of each workbox is searched in this thread pool, results are
+        # sent back to the gui thread to be written in order.
+        self.pool = QThreadPool(self)
+        self._search_id = 0
+        self._cancelled = threading.Event()
+        self._task_count = 0
+        self._next_index = 0
+        self._pending = {}
+        # The TrigramIndexes with entries added by the current search
+        self._updated_indexes = set()
+        self._signals = FindFilesSignals(self)
+        self._signals.searched.connect(
+            self._searched, Qt.ConnectionType.QueuedConnection
+        )
 
         loadUi(__file__, self)
+        self.uiProgressBAR.hide()
+        self.uiCancelBTN.hide()
 
         # Set the icons
         self.uiCaseSensitiveBTN.setIcon(
@@ -27,6 +502,7 @@ class FindFiles(QWidget):
         )
         self.uiCloseBTN.setIcon(QIcon(resourcePath('img/close-thick.png')))
         self.uiRegexBTN.setIcon(QIcon(resourcePath("img/regex.svg")))
+        self.uiHistoryBTN.setIcon(QIcon(resourcePath("img/history.svg")))
 
         # Create shortcuts
         self.uiCloseSCT = QShortcut(
@@ -51,26 +527,52 @@ class FindFiles(QWidget):
         )
         self.uiRegexSCT.activated.connect(self.uiRegexBTN.toggle)
 
+        self.uiHistorySCT = QShortcut(
+            QKeySequence(Qt.KeyboardModifier.AltModifier | Qt.Key.Key_H),
+            self,
+            context=Qt.ShortcutContext.WidgetWithChildrenShortcut,
+        )
+        self.uiHistorySCT.activated.connect(self.uiHistoryBTN.toggle)
+
+    @property
+    def console(self):
+        """The console the results are written to."""
+        return self.renderer.console
+
+    @console.setter
+    def console(self, console):
+        self.renderer.console = console
+
     def activate(self):
         """Called to make this widget ready for the user to interact with."""
         self.show()
         self.uiFindTXT.setFocus()
 
+    @Slot()
+    def cancel(self):
+        """Stop the current search. Any workboxes that are not yet searched are
+        skipped."""
+        if not self.searching():
+            return
+        self._cancelled.set()
+        self.pool.clear()
+        # Ignore any results from the tasks that are still running
+        self._search_id += 1
+        self.insert_text('\nSearch cancelled\n')
+        self._finish()
+
     @Slot()
     def find(self):
-        find_text = self.uiFindTXT.text()
-        context = self.uiContextSPN.value()
-        # Create an instance of the TextSearch to use for this search
-        if self.uiRegexBTN.isChecked():
-            TextSearch = RegexTextSearch
-        else:
-            TextSearch = SimpleTextSearch
-        self.finder = TextSearch(
-            find_text, self.uiCaseSensitiveBTN.isChecked(), context=context
-        )
+        # Only one search can run at a time
+        self.cancel()
+
+        self.finder = self.create_finder()
         self.finder.callback_matching = self.insert_found_text
         self.finder.callback_non_matching = self.insert_text
 
+        # Finish writing the results of the previous search
+        self.renderer.reset()
+
         # Start fresh output line.
         window = self.parent().window() if self.parent() else None
         if window:
@@ -79,7 +581,44 @@ class FindFiles(QWidget):
         self.insert_text(self.finder.title())
 
         self.match_files_count = 0
+        self.results = []
+        self._search_id += 1
+        self._cancelled = threading.Event()
+        self._next_index = 0
+        self._pending = {}
+
+        # Take a snapshot of the text of every workbox in the gui thread, the
+        # editors can only be accessed from this thread.
+        history = self.uiHistoryBTN.isChecked()
+        tasks = []
         for manager in self.managers:
+            if history:
+                # Every version is searched, so the index of the latest backup
+                # files can't be used.
+                for editor, group_name, tab_name, _, _ in manager.all_widgets():
+                    tasks.append(
+                        FindHistoryTask(
+                            self._signals,
+                            self._search_id,
+                            len(tasks),
+                            self.finder,
+                            editor.__history_versions__(),
+                            "/".join((group_name, tab_name)),
+                            editor.__workbox_name__(),
+                            self._cancelled,
+                            workbox_id=editor.__workbox_id__(),
+                        )
+                    )
+                continue
+
+            # Use the trigram index to skip workboxes that can't match without
+            # reading their text from disk.
+            index = None
+            candidates = None
+            if hasattr(manager, "core_name"):
+                index = get_trigram_index(manager.core_name)
+                candidates = self.finder.candidates(index)
+
             for (
                 editor,
                 group_name,
@@ -88,7 +627,173 @@ class FindFiles(QWidget):
                 _tab_index,
             ) in manager.all_widgets():
                 path = "/".join((group_name, tab_name))
-                self.find_in_editor(editor, path)
+                snapshot = self.snapshot_editor(editor, index, candidates)
+                if snapshot is None:
+                    continue
+                tasks.append(
+                    FindFilesTask(
+                        self._signals,
+                        self._search_id,
+                        len(tasks),
+                        self.finder,
+                        snapshot.pop("text", None),
+                        path,
+                        editor.__workbox_name__(),
+                        self._cancelled,
+                        workbox_id=editor.__workbox_id__(),
+                        **snapshot
+                    )
+                )
+
+        self._task_count = len(tasks)
+        if not tasks:
+            self._finish()
+            return
+
+        self.uiProgressBAR.setRange(0, self._task_count)
+        self.uiProgressBAR.setValue(0)
+        self.uiProgressBAR.show()
+        self.uiCancelBTN.show()
+        for task in tasks:
+            self.pool.start(task)
+
+    def create_finder(self):
+        """Returns a TextSearch instance using the current find settings."""
+        find_text = self.uiFindTXT.text()
+        context = self.uiContextSPN.value()
+        if self.uiRegexBTN.isChecked():
+            TextSearch = RegexTextSearch
+        else:
+            TextSearch = SimpleTextSearch
+        return TextSearch(
+            find_text, self.uiCaseSensitiveBTN.isChecked(), context=context
+        )
+
+    @Slot()
+    def replace(self):
+        """Show a preview of replacing the matches in all workboxes and replace
+        the matches the user selects."""
+        self.cancel()
+        replace_text = self.uiReplaceTXT.text()
+        try:
+            finder = self.create_finder()
+            dialog = ReplaceFiles(finder, replace_text, self.managers, parent=self)
+        except re.error as error:
+            self.insert_text('\nUnable to replace: {}\n'.format(error))
+            return
+
+        if dialog.exec():
+            self.insert_text(
+                '\nReplace in workboxs: "{}" with "{}"{}\n'.format(
+                    finder.find_text, replace_text, finder.title_flags
+                )
+            )
+            self.insert_text(dialog.summary)
+
+    @Slot()
+    def export(self):
+        """Save the results of the last search to a file chosen by the user."""
+        if not self.results:
+            self.insert_text('\nThere are no search results to export\n')
+            return
+        path, file_filter = QtCompat.QFileDialog.getSaveFileName(
+            self, "Export Search Results", "", "Json (*.json);;Grep (*.txt)"
+        )
+        if path:
+            self.export_results(path, grep=file_filter.startswith("Grep"))
+
+    def export_results(self, path, grep=False):
+        """Write the results of the last search to path.
+
+        Args:
+            path (str): The file to write.
+            grep (bool, optional): Write the results as lines of
+                `path:line:column:text` instead of json.
+        """
+        text = to_grep(self.results) if grep else to_json(self.results)
+        with open(path, "w", encoding="utf-8") as fle:
+            fle.write(text)
+
+    def searching(self):
+        """Returns True while a search is running."""
+        return self._next_index < self._task_count
+
+    def snapshot_editor(self, editor, index=None, candidates=None):
+        """Returns how `FindFilesTask` gets the text of editor for searching.
+
+        This must be called from the gui thread. The text of loaded workboxes is
+        copied. Workboxes that are not loaded return the file their text is read
+        from instead, the task reads it in its thread. This way searching
+        doesn't load every workbox into its editor or read files in the gui
+        thread.
+
+        Args:
+            editor (WorkboxMixin): The workbox to get the text of.
+            index (TrigramIndex, optional): If provided, workboxes whose text is
+                read from an indexed backup file are skipped if they are not in
+                candidates. Backup files that are not indexed are added to it.
+            candidates (set, optional): The workbox_ids returned by
+                `TextSearch.candidates` for index.
+
+        Returns:
+            dict or None: The text or filepath and sample_size kwargs for
+                `FindFilesTask`, and the trigram_index if filepath is a backup
+                file that isn't indexed. None if the workbox can't match.
+        """
+        filepath, sample_size = editor.__snapshot_file__()
+        if filepath is None:
+            return dict(text=editor.__text_snapshot__())
+
+        snapshot = dict(filepath=filepath, sample_size=sample_size)
+        if index is not None and filepath != editor.__filename__():
+            # The text is read from the latest backup file
+            workbox_id = editor.__workbox_id__()
+            if not index.is_current(workbox_id, filepath):
+                snapshot["trigram_index"] = index
+            elif candidates is not None and workbox_id not in candidates:
+                return None
+        return snapshot
+
+    def _searched(self, search_id, index, fragments, results, index_update):
+        """Receives the results of a FindFilesTask and adds any results that
+        are ready to the renderer in order."""
+        if index_update is not None:
+            # The entry is valid even if the search was cancelled
+            trigram_index, workbox_id, entry = index_update
+            trigram_index.set_entry(workbox_id, entry)
+            self._updated_indexes.add(trigram_index)
+
+        if search_id != self._search_id:
+            # These results are for a cancelled search.
+            return
+
+        self._pending[index] = (fragments, results)
+        while self._next_index in self._pending:
+            fragments, results = self._pending.pop(self._next_index)
+            self.renderer.add(fragments)
+            if search_id != self._search_id:
+                # The search was cancelled while adding the results
+                return
+            self.finder.match_count += sum(r.match_count for r in results)
+            if results:
+                self.match_files_count += 1
+            self.results.extend(results)
+            self._next_index += 1
+            self.uiProgressBAR.setValue(self._next_index)
+
+        if not self.searching():
+            self._finish()
+
+    def _finish(self):
+        """Write the search summary once all workboxes are searched."""
+        self._task_count = self._next_index = 0
+        self._pending = {}
+        # Save the entries added for backup files read while searching
+        for trigram_index in self._updated_indexes:
+            trigram_index.save()
+        self._updated_indexes = set()
+        self.uiProgressBAR.hide()
+        self.uiCancelBTN.hide()
 
         self.insert_text(
             '\n{} matches in {} workboxes\n'.format(
@@ -96,42 +801,14 @@ class FindFiles(QWidget):
             )
         )
 
-        # If user has Auto-prompt chosen, do so now.
+        # If user has Auto-prompt chosen, do so once the results are written.
+        window = self.parent().window() if self.parent() else None
         if window:
             if window.uiAutoPromptCHK.isChecked():
-                window.console().startInputLine()
-
-    def find_in_editor(self, editor, path):
-        # Ensure the editor text is loaded and get its raw text
-        editor.__show__()
-        text = editor.__text__()
-        workbox_name = editor.__workbox_name__()
-
-        # Use the finder to check for matches
-        found = self.finder.search_text(text, path, workbox_name)
-        if found:
-            self.match_files_count += 1
+                self.renderer.call(window.console().startInputLine)
 
     def insert_found_text(self, text, workbox_id, line_num, tool_tip):
-        href = ', {}, {}'.format(workbox_id, line_num)
-        cursor = self.console.textCursor()
-        # Insert hyperlink
-        fmt = cursor.charFormat()
-        fmt.setAnchor(True)
-        fmt.setAnchorHref(href)
-        fmt.setFontUnderline(True)
-        fmt.setToolTip(tool_tip)
-        cursor.insertText(text, fmt)
-        # Show the updated text output
-        QApplication.instance().processEvents()
+        self.renderer.add([(True, (text, workbox_id, line_num, tool_tip))])
 
     def insert_text(self, text):
-        cursor = self.console.textCursor()
-        fmt = cursor.charFormat()
-        fmt.setAnchor(False)
-        fmt.setAnchorHref('')
-        fmt.setFontUnderline(False)
-        fmt.setToolTip('')
-        cursor.insertText(text, fmt)
-        # Show the updated text output
-        QApplication.instance().processEvents()
+        self.renderer.add_text(text)
@@ -5,12 +5,15 @@ from pathlib import Path
 from Qt.QtCore import Qt
 from Qt.QtWidgets import QHBoxLayout, QMessageBox, QSizePolicy, QToolButton, QWidget
 
-from ...prefs import VersionTypes, get_backup_version_info
+from ...prefs import get_latest_backup_infos
+from ...utils.trigram_index import get_trigram_index
 from ..drag_tab_bar import DragTabBar
+from ..workbox_placeholder import WorkboxPlaceholder
 from ..workbox_text_edit import WorkboxTextEdit
 from .grouped_tab_menu import GroupTabMenu
 from .grouped_tab_widget import GroupedTabWidget
 from .one_tab_widget import OneTabWidget
+from .workbox_registry import WorkboxRegistry
 
 DEFAULT_STYLE_SHEET = """
 /* Make the two buttons in the GroupTabWidget take up the
@@ -36,9 +39,15 @@ class GroupTabWidget(OneTabWidget):
     allowing users to quickly focus on any tab in the entire group.
     """
 
+    # Restore workboxes as placeholders, only creating their editors once they
+    # are shown or used. See `WorkboxPlaceholder`.
+    defer_editors = True
+
     def __init__(self, editor_kwargs=None, core_name=None, *args, **kwargs):
         super(GroupTabWidget, self).__init__(*args, **kwargs)
         DragTabBar.install_tab_widget(self, 'group_tab_widget')
+        self.workbox_registry = WorkboxRegistry(self)
+        self.tabBar().tabsChanged.connect(self.workbox_registry.invalidate)
         self.editor_kwargs = editor_kwargs
         self.editor_cls = WorkboxTextEdit
         self.core_name = core_name
@@ -111,7 +120,7 @@ class GroupTabWidget(OneTabWidget):
             if index != -1:
                 parent = self.widget(index)
 
-        if not parent:
+        if parent is None:
             parent, group_title = self.default_tab(group_title, prefs)
             self.addTab(parent, group_title)
 
@@ -125,6 +134,10 @@ class GroupTabWidget(OneTabWidget):
     def all_widgets(self):
         """A generator yielding information about every widget under every group.
 
+        Workboxes that haven't been used since their prefs were restored are
+        `WorkboxPlaceholder`s. They can be used like workboxes, creating their
+        editor when needed.
+
         Yields:
             widget, group tab name, widget tab name, group tab index, widget tab index
         """
@@ -173,11 +186,22 @@ class GroupTabWidget(OneTabWidget):
 
             self.parent().window().addRecentlyClosedWorkbox(workbox)
 
-    def current_groups_widget(self):
-        """Returns the current widget of the currently selected group or None."""
+    def current_groups_widget(self, create=True):
+        """Returns the current widget of the currently selected group or None.
+
+        Args:
+            create (bool, optional): If the current widget is a
+                `WorkboxPlaceholder`, create and return its editor. Otherwise
+                the placeholder is returned.
+        """
         editor_tab = self.currentWidget()
         if editor_tab:
-            return editor_tab.currentWidget()
+            widget = editor_tab.currentWidget()
+            # The current workbox is the one being shown and used, so make sure
+            # it's an editor not a placeholder.
+            if create and isinstance(widget, WorkboxPlaceholder):
+                widget = widget.__editor__()
+            return widget
 
     def default_tab(self, title=None, prefs=None):
         title = title or self.default_title
@@ -187,6 +211,7 @@ class GroupTabWidget(OneTabWidget):
             editor_cls=self.editor_cls,
             core_name=self.core_name,
         )
+        widget.tabBar().tabsChanged.connect(self.workbox_registry.invalidate)
         return widget, title
 
     def get_next_available_tab_name(self, name=None):
@@ -330,8 +355,17 @@ class GroupTabWidget(OneTabWidget):
 
         prefs = self.append_orphan_workboxes_to_prefs(prefs, existing_by_group)
 
+        # Reuse the existing group tabs for groups with the same name instead
+        # of creating new ones. Their workboxes are re-added as they are found.
+        existing_groups = {}
+        for index in range(self.count()):
+            existing_groups.setdefault(self.tabText(index), self.widget(index))
         self.clear()
 
+        # Find the latest backup of every workbox at once, checking each
+        # workbox's directory separately is slow when restoring many workboxes.
+        backup_infos = get_latest_backup_infos(self.window().name)
+
         current_group = None
         workboxes_missing_id = []
         for group in prefs.get('groups', []):
@@ -382,14 +416,17 @@ class GroupTabWidget(OneTabWidget):
                 orphaned_by_instance = tab.get('orphaned_by_instance', False)
 
                 # See if there are any  workbox backups available
-                backup_file, _, count = get_backup_version_info(
-                    self.window().name, workbox_id, VersionTypes.Last, ""
-                )
+                backup_file, _, count = backup_infos.get(workbox_id, ("", "", 0))
                 if count:
                     loadable = True
                 if not loadable:
                     continue
 
+                if tab_widget is None and group_name in existing_groups:
+                    tab_widget = existing_groups.pop(group_name)
+                    tab_widget.clear()
+                    self.addTab(tab_widget, group_name)
+
                 # There is a file on disk, add the tab, creating the group
                 # tab if it hasn't already been created.
                 localprefs = dict(
@@ -398,6 +435,7 @@ class GroupTabWidget(OneTabWidget):
                     backup_file=backup_file,
                     existing_editor_info=existing_by_id.pop(workbox_id, None),
                     orphaned_by_instance=orphaned_by_instance,
+                    placeholder=self.defer_editors,
                     tempfile=tempfile,
                 )
                 tab_widget, editor = self.add_new_tab(
@@ -429,13 +467,9 @@ class GroupTabWidget(OneTabWidget):
                 current_group = self.indexOf(tab_widget)
 
         if selected_workbox_id:
-            for widget_info in self.all_widgets():
-                widget, _, _, group_idx, tab_idx = widget_info
-                if widget.__workbox_id__() == selected_workbox_id:
-                    self.setCurrentIndex(group_idx)
-                    grouped = self.widget(group_idx)
-                    grouped.setCurrentIndex(tab_idx)
-                    break
+            workbox = self.workbox_registry.workbox_for_id(selected_workbox_id)
+            if workbox:
+                self.set_current_groups_from_workbox(workbox)
 
         # If any workboxes could not be loaded because they had no stored
         # workbox_id, notify user. This likely only happens if user goes back
@@ -483,6 +517,9 @@ class GroupTabWidget(OneTabWidget):
 
             groups.append(group)
 
+        # Save the search index updated by the workboxes that wrote backups
+        get_trigram_index(self.core_name).save()
+
         return prefs
 
     def set_current_groups_from_index(self, group, editor):
@@ -513,19 +550,10 @@ class GroupTabWidget(OneTabWidget):
             success (bool): Whether the workbox was found and made the current
                 widget
         """
-        workbox_infos = self.all_widgets()
-        found_info = None
-        for workbox_info in workbox_infos:
-            if workbox_info[0] == workbox:
-                found_info = workbox_info
-                break
-        if found_info:
-            workbox = workbox_info[0]
-            group_idx = workbox_info[-2]
-            editor_idx = workbox_info[-1]
-
-            self.setCurrentIndex(group_idx)
-            tab_widget = self.currentWidget()
-            tab_widget.setCurrentIndex(editor_idx)
+        if self.workbox_registry.name_for_workbox(workbox) is None:
+            return False
 
-        return bool(found_info)
+        group = workbox.__tab_widget__()
+        self.setCurrentIndex(self.indexOf(group))
+        group.setCurrentIndex(group.indexOf(workbox))
+        return True
@@ -1,10 +1,10 @@
 from __future__ import absolute_import
 
-import re
-
 from Qt.QtCore import QSortFilterProxyModel, Qt
 from Qt.QtGui import QStandardItem, QStandardItemModel
 
+from ...utils.fuzzy_match import FuzzyMatcher
+
 
 class GroupTabItemModel(QStandardItemModel):
     GroupIndexRole = Qt.ItemDataRole.UserRole + 1
@@ -74,24 +74,46 @@ class GroupTabListItemModel(GroupTabItemModel):
 
 
 class GroupTabFuzzyFilterProxyModel(QSortFilterProxyModel):
-    """Implements a fuzzy search filter proxy model."""
+    """Implements a fuzzy search filter proxy model.
+
+    Rows are filtered and sorted using `FuzzyMatcher` so the best matches are
+    listed first. Clearing the search restores the source model's order.
+    """
 
     def __init__(self, parent=None):
         super(GroupTabFuzzyFilterProxyModel, self).__init__(parent=parent)
-        self._fuzzy_regex = None
+        self._fuzzy_matcher = None
+        self._fuzzy_scores = {}
+
+    def fuzzyScore(self, text):
+        """Returns the FuzzyMatcher score of text for the current search."""
+        if text not in self._fuzzy_scores:
+            self._fuzzy_scores[text] = self._fuzzy_matcher.score(text)
+        return self._fuzzy_scores[text]
+
+    def _sortKey(self, index):
+        text = self.sourceModel().data(index) or ""
+        score = self.fuzzyScore(text)
+        # Higher scores are sorted first and non-matching rows are sorted last
+        return (score is None, -(score or 0), len(text), text)
+
+    def lessThan(self, left, right):
+        if self._fuzzy_matcher:
+            return self._sortKey(left) < self._sortKey(right)
+        return super(GroupTabFuzzyFilterProxyModel, self).lessThan(left, right)
 
     def setFuzzySearch(self, search):
-        search = '.*'.join(search)
-        # search = '.*{}.*'.format(search)
-        self._fuzzy_regex = re.compile(search, re.I)
+        self._fuzzy_scores = {}
+        self._fuzzy_matcher = FuzzyMatcher(search) if search else None
         self.invalidateFilter()
+        # Sort by score while searching, otherwise restore the source order
+        self.sort(0 if search else -1)
 
     def filterAcceptsRow(self, sourceRow, sourceParent):
-        if self.filterKeyColumn() == 0 and self._fuzzy_regex:
+        if self.filterKeyColumn() == 0 and self._fuzzy_matcher:
             index = self.sourceModel().index(sourceRow, 0, sourceParent)
             data = self.sourceModel().data(index)
-            ret = bool(self._fuzzy_regex.search(data))
-            return ret
+            return self.fuzzyScore(data) is not None
 
         return super(GroupTabFuzzyFilterProxyModel, self).filterAcceptsRow(
             sourceRow, sourceParent
@@ -5,6 +5,7 @@ from Qt.QtWidgets import QMessageBox, QToolButton
 
 from ...prefs import VersionTypes
 from ..drag_tab_bar import DragTabBar
+from ..workbox_placeholder import WorkboxPlaceholder
 from ..workbox_text_edit import WorkboxTextEdit
 from .one_tab_widget import OneTabWidget
 
@@ -158,15 +159,23 @@ class GroupedTabWidget(OneTabWidget):
         kwargs = self.editor_kwargs if self.editor_kwargs else {}
         editor = None
         orphaned_by_instance = False
+        placeholder = False
         if prefs:
             editor_info = prefs.pop("existing_editor_info", None)
             if editor_info:
                 editor = editor_info[0]
             orphaned_by_instance = prefs.pop("orphaned_by_instance", False)
+            placeholder = prefs.pop("placeholder", False)
         else:
             prefs = {}
 
-        if editor:
+        if isinstance(editor, WorkboxPlaceholder):
+            # The placeholder hasn't loaded any text, so only update where it
+            # will be loaded from.
+            editor.__set_backup_file__(prefs.get("backup_file"))
+            editor.__set_filename__(prefs.get("filename", None))
+            editor.__determine_been_changed_by_instance__()
+        elif editor:
             editor.__load_workbox_version_text__(VersionTypes.Last)
 
             editor.__set_last_saved_text__(editor.__text__())
@@ -177,6 +186,14 @@ class GroupedTabWidget(OneTabWidget):
 
             editor.__determine_been_changed_by_instance__()
             self.window().setWorkboxFontBasedOnConsole(editor)
+        elif placeholder:
+            editor = WorkboxPlaceholder(
+                self.editor_cls,
+                editor_kwargs=kwargs,
+                parent=self,
+                core_name=self.core_name,
+                **prefs,
+            )
         else:
             editor = self.editor_cls(
                 parent=self, core_name=self.core_name, **prefs, **kwargs
@@ -86,6 +86,10 @@ class OneTabWidget(QTabWidget):
         self.update_closable_tabs()
         self.window().updateTabColorsAndToolTips()
 
+    def setTabText(self, index, text):  # noqa: N802
+        # Set the text using the tab bar so subclasses of QTabBar are notified
+        self.tabBar().setTabText(index, text)
+
     def showEvent(self, event):  # noqa: N802
         super(OneTabWidget, self).showEvent(event)
         # Force the creation of a default tab if defined
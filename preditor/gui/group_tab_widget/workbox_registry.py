@@ -0,0 +1,84 @@
+from __future__ import absolute_import
+
+from .. import tab_widget_for_tab
+from ..workbox_mixin import WorkboxName
+
+
+class WorkboxRegistry(object):
+    """Maps the workbox ids and `group/workbox` names of a GroupTabWidget's
+    workboxes to the workboxes and back.
+
+    The maps are built from `GroupTabWidget.all_widgets` the first time they
+    are needed. The tab bars call `invalidate` when a tab is added, removed,
+    moved or renamed and workboxes call it when their id changes, so lookups
+    between those changes don't need to scan every tab of every group.
+
+    Args:
+        manager (GroupTabWidget): The widget whose workboxes are mapped.
+    """
+
+    def __init__(self, manager):
+        self.manager = manager
+        self._by_id = None
+        self._by_name = None
+        self._names = None
+
+    def _build(self):
+        by_id = {}
+        by_name = {}
+        names = {}
+        # Matches `OneTabWidget.index_for_text`, if multiple groups or tabs
+        # share a name, the first one is used.
+        group_indexes = {}
+        for workbox, group_name, tab_name, group_idx, _ in self.manager.all_widgets():
+            names[workbox] = WorkboxName(group_name, tab_name)
+            by_id.setdefault(workbox.__workbox_id__(), workbox)
+            if group_indexes.setdefault(group_name, group_idx) == group_idx:
+                by_name.setdefault((group_name, tab_name), workbox)
+
+        self._by_id = by_id
+        self._by_name = by_name
+        self._names = names
+
+    def invalidate(self):
+        """Clear the maps so they are rebuilt by the next lookup."""
+        self._by_id = None
+        self._by_name = None
+        self._names = None
+
+    def is_valid(self):
+        """Returns if the maps are currently built."""
+        return self._names is not None
+
+    def name_for_workbox(self, workbox):
+        """Returns the `WorkboxName` of workbox or None if it isn't a workbox
+        of this registry's GroupTabWidget."""
+        if self._names is not None:
+            return self._names.get(workbox)
+
+        # While tabs are being added, like when restoring prefs, resolve the
+        # name from the workbox's tab widgets instead of re-building the maps
+        # after every change.
+        group = tab_widget_for_tab(workbox)
+        if group is None or tab_widget_for_tab(group) is not self.manager:
+            return None
+        group_index = self.manager.indexOf(group)
+        index = group.indexOf(workbox)
+        if group_index == -1 or index == -1:
+            return None
+        return WorkboxName(self.manager.tabText(group_index), group.tabText(index))
+
+    def workbox_for_id(self, workbox_id):
+        """Returns the workbox with this workbox_id or None if not found."""
+        if self._by_id is None:
+            self._build()
+        return self._by_id.get(workbox_id)
+
+    def workbox_for_name(self, name):
+        """Returns the workbox for a `group/workbox` name or None if not found."""
+        split = name.split('/', 1)
+        if len(split) < 2:
+            return None
+        if self._by_name is None:
+            self._build()
+        return self._by_name.get(tuple(split))
@@ -0,0 +1,79 @@
+from __future__ import absolute_import
+
+from Qt.QtCore import QEvent
+from Qt.QtWidgets import QFrame, QHBoxLayout, QLabel, QPushButton
+
+
+class LargeFileBanner(QFrame):
+    """Shown across the top of a workbox in large-file mode, explaining which
+    features are disabled.
+
+    The banner is a child of the workbox and reserves space for itself with the
+    viewport margins of the workbox, so the text isn't hidden behind it.
+
+    Args:
+        workbox (WorkboxMixin): The workbox to show the banner on.
+    """
+
+    def __init__(self, workbox):
+        super(LargeFileBanner, self).__init__(workbox)
+        self.workbox = workbox
+        self.setObjectName("uiLargeFileBanner")
+        self.setFrameShape(QFrame.Shape.StyledPanel)
+        self.setAutoFillBackground(True)
+
+        self.uiMessageLBL = QLabel(self)
+        self.uiMessageLBL.setWordWrap(True)
+        self.uiEnableEditingBTN = QPushButton("Enable Editing", self)
+        self.uiEnableEditingBTN.setToolTip(
+            "Allow editing this file. Editing large files may be slow."
+        )
+        self.uiEnableEditingBTN.clicked.connect(self.enable_editing)
+
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(6, 3, 6, 3)
+        layout.addWidget(self.uiMessageLBL, 1)
+        layout.addWidget(self.uiEnableEditingBTN)
+
+        workbox.installEventFilter(self)
+        self.hide()
+
+    def enable_editing(self):
+        """Make the workbox editable, the other features stay disabled."""
+        self.workbox.setReadOnly(False)
+        self.update_message()
+
+    def eventFilter(self, obj, event):  # noqa: N802
+        if obj is self.workbox and event.type() == QEvent.Type.Resize:
+            self.update_geometry()
+        return False
+
+    def hide_banner(self):
+        self.hide()
+        self.workbox.setViewportMargins(0, 0, 0, 0)
+
+    def show_banner(self):
+        self.update_message()
+        self.show()
+        self.update_geometry()
+
+    def update_geometry(self):
+        if self.isHidden():
+            return
+        height = self.heightForWidth(self.workbox.width())
+        if height < 0:
+            height = self.sizeHint().height()
+        self.setGeometry(0, 0, self.workbox.width(), height)
+        self.workbox.setViewportMargins(0, height, 0, 0)
+
+    def update_message(self):
+        read_only = self.workbox.isReadOnly()
+        message = (
+            "This file is larger than {:.1f} MB. Syntax highlighting, spell check, "
+            "smart highlighting and the symbol outline are disabled."
+        ).format(self.workbox.__large_file_size__() / 1024.0 / 1024.0)
+        if read_only:
+            message += " It's read-only until editing is enabled."
+        self.uiMessageLBL.setText(message)
+        self.uiEnableEditingBTN.setVisible(read_only)
+        self.update_geometry()
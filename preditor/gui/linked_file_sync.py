@@ -0,0 +1,207 @@
+from __future__ import absolute_import
+
+import hashlib
+import os
+
+from Qt import QtCompat
+from Qt.QtCore import QFileSystemWatcher, QObject, QTimer, Signal
+
+
+def file_signature(path, previous=None):
+    """Returns the mtime, size and sha1 hash of the contents of path.
+
+    Args:
+        path (str): The file to get the signature of.
+        previous (tuple, optional): A signature previously returned for path.
+            If the mtime and size of path still match it, it's returned without
+            reading the file.
+
+    Returns:
+        tuple or None: `(mtime_ns, size, digest)` or None if path doesn't exist.
+    """
+    try:
+        stat = os.stat(path)
+        if previous is not None and previous[:2] == (stat.st_mtime_ns, stat.st_size):
+            return previous
+        with open(path, 'rb') as fle:
+            digest = hashlib.sha1(fle.read()).hexdigest()
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size, digest)
+
+
+class LinkedFileSync(QObject):
+    """Watches the linked files of workboxes and reports when their contents
+    change on disk.
+
+    Editors often save by writing a temporary file and renaming it over the
+    original, and a single save can emit several change signals. Changes are
+    handled once no more signals are received for `interval` milliseconds,
+    instead of waiting for the save to finish on the gui thread. Paths that
+    stopped being watched because they were replaced are watched again. While a
+    watched file doesn't exist, like between an editor deleting and re-creating
+    it, its directory is watched so the file is watched again once it exists.
+
+    The mtime, size and a hash of the contents of each file are stored when it's
+    watched. `fileChanged` is only emitted if the file was removed or its
+    contents changed, so saving a file without changes doesn't reload its
+    workboxes.
+
+    Args:
+        parent (QObject, optional): The parent of this object.
+        interval (int, optional): Milliseconds to wait for more changes.
+
+    Signals:
+        fileChanged (str): Emitted with a watched path whose contents changed
+            or that was removed.
+    """
+
+    fileChanged = Signal(str)
+
+    def __init__(self, parent=None, interval=100):
+        super(LinkedFileSync, self).__init__(parent)
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.fileChanged.connect(self.schedule)
+        self.watcher.directoryChanged.connect(self.schedule_directory)
+
+        # These are keyed by the normalized path
+        self._paths = {}
+        # The workboxes watching each path. None is used for paths watched
+        # without a workbox, like the prefs file.
+        self._owners = {}
+        self._signatures = {}
+        self._pending = []
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self.flush)
+
+    @staticmethod
+    def _key(path):
+        return os.path.normcase(os.path.abspath(str(path)))
+
+    def flush(self):
+        """Handle the changes to the files passed to `schedule`, emitting
+        `fileChanged` for the files whose contents changed."""
+        self.timer.stop()
+        pending, self._pending = self._pending, []
+        for key in pending:
+            if key not in self._signatures:
+                # No longer watched
+                continue
+            path = self._paths[key]
+            signature = file_signature(path, self._signatures[key])
+            # Replacing the file stops the watcher from watching it. Missing
+            # files are watched through their directory until they exist.
+            watched = path in self.watcher.files()
+            if signature is not None and not watched:
+                self.watcher.addPath(path)
+            elif signature is None and watched:
+                self.watcher.removePath(path)
+
+            previous = self._signatures[key]
+            self._signatures[key] = signature
+            if signature is None or previous is None:
+                # The file was removed or re-created
+                changed = signature is not previous
+            else:
+                changed = signature[2] != previous[2]
+            if changed:
+                self.fileChanged.emit(path)
+        self._update_directories()
+
+    def _update_directories(self):
+        """Watch the directories of the watched files that don't exist and stop
+        watching directories that no longer contain any."""
+        directories = {
+            os.path.dirname(self._paths[key])
+            for key, signature in self._signatures.items()
+            if signature is None
+        }
+        watched = set(self.watcher.directories())
+        for directory in watched - directories:
+            self.watcher.removePath(directory)
+        for directory in directories - watched:
+            if os.path.isdir(directory):
+                self.watcher.addPath(directory)
+
+    def is_watched(self, path):
+        """Returns if path is being watched."""
+        if not path:
+            return False
+        return self._key(path) in self._signatures
+
+    def schedule(self, path):
+        """Check if path changed once no more changes are scheduled for
+        `interval` milliseconds. Called when the watcher reports a change."""
+        key = self._key(path)
+        if key in self._signatures and key not in self._pending:
+            self._pending.append(key)
+        self.timer.start()
+
+    def schedule_directory(self, directory):
+        """Schedule the watched files in directory that don't exist. Called
+        when the watcher reports a change to the directory, which may have
+        re-created them."""
+        directory = self._key(directory)
+        for key, signature in self._signatures.items():
+            if signature is None and os.path.dirname(key) == directory:
+                self.schedule(self._paths[key])
+
+    def unwatch(self, path, workbox=None):
+        """Stop watching path for workbox. Once no workboxes are watching path
+        it's no longer watched.
+
+        Args:
+            path (str): The file to stop watching.
+            workbox (WorkboxMixin, optional): The workbox that was watching
+                path. None if it was watched without a workbox.
+        """
+        if not path:
+            return
+        key = self._key(path)
+        owners = self._owners.get(key, [])
+        if workbox not in owners:
+            return
+        owners.remove(workbox)
+        if owners:
+            return
+
+        self.watcher.removePath(self._paths[key])
+        del self._owners[key]
+        del self._paths[key]
+        del self._signatures[key]
+        if key in self._pending:
+            self._pending.remove(key)
+        self._update_directories()
+
+    def watch(self, path, workbox=None):
+        """Watch path for changes to its contents.
+
+        The current contents of path are stored, so calling this after writing
+        the file, like when saving a workbox, won't report that change.
+
+        Args:
+            path (str): The file to watch.
+            workbox (WorkboxMixin, optional): The workbox linked to path.
+        """
+        if not path:
+            return
+        key = self._key(path)
+        owners = self._owners.setdefault(key, [])
+        if workbox not in owners:
+            owners.append(workbox)
+        path = self._paths.setdefault(key, str(path))
+        self._signatures[key] = file_signature(path)
+        if self._signatures[key] is not None and path not in self.watcher.files():
+            self.watcher.addPath(path)
+        self._update_directories()
+
+    def workboxes(self, path):
+        """Returns the workboxes watching path."""
+        return [
+            workbox
+            for workbox in self._owners.get(self._key(path), [])
+            if workbox is not None and QtCompat.isValid(workbox)
+        ]
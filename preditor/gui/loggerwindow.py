@@ -16,10 +16,11 @@ from pathlib import Path
 
 import __main__
 from Qt import QtCompat, QtCore, QtWidgets
-from Qt.QtCore import QByteArray, QFileSystemWatcher, QObject, Qt, QTimer, Signal, Slot
+from Qt.QtCore import QByteArray, QObject, Qt, QTimer, Signal, Slot
 from Qt.QtGui import QFont, QIcon, QKeySequence, QTextCursor
 from Qt.QtWidgets import (
     QApplication,
+    QDockWidget,
     QFontDialog,
     QInputDialog,
     QMenu,
@@ -41,16 +42,21 @@ from .. import (
     resourcePath,
 )
 from ..delayable_engine import DelayableEngine
-from ..gui import Window, handleMenuHovered, loadUi, tab_widget_for_tab
+from ..gui import Window, handleMenuHovered, loadUi
 from ..gui.fuzzy_search.fuzzy_search import FuzzySearch
 from ..gui.group_tab_widget.grouped_tab_models import GroupTabListItemModel
 from ..logging_config import LoggingConfig
 from ..utils import Json, Truncate, stylesheets
 from .completer import CompleterMode
+from .diff_view import DiffView
 from .level_buttons import LoggingLevelButton
+from .linked_file_sync import LinkedFileSync
 from .set_text_editor_path_dialog import SetTextEditorPathDialog
 from .status_label import StatusLabel
+from .symbol_outline import SymbolIndexDelayable, SymbolListItemModel, SymbolOutline
 from .workbox_mixin import WorkboxName
+from .workbox_placeholder import WorkboxPlaceholder
+from .workbox_unloader import WorkboxUnloader
 
 logger = logging.getLogger(__name__)
 
@@ -108,6 +114,10 @@ class LoggerWindow(Window):
 
         # Setup delayable system
         self.delayable_engine = DelayableEngine.instance('logger', self)
+        # WorkboxWidgets are processed by the default engine, so index their
+        # symbols in that engine.
+        self.symbolIndex = SymbolIndexDelayable(DelayableEngine.instance('default'))
+        self.symbolIndex.engine.add_delayable(self.symbolIndex)
 
         self.uiWorkboxTAB.editor_kwargs = dict(
             console=self.uiConsoleTXT, delayable_engine=self.delayable_engine.name
@@ -127,6 +137,28 @@ class LoggerWindow(Window):
         self.uiFindInWorkboxesWGT.managers.append(self.uiWorkboxTAB)
         self.uiFindInWorkboxesWGT.console = self.console()
 
+        # Outline of the symbols defined in the current workbox
+        self.uiOutlineDOCK = QDockWidget("Outline", self)
+        self.uiOutlineDOCK.setObjectName("uiOutlineDOCK")
+        self.uiOutlineWGT = SymbolOutline(
+            self.uiWorkboxTAB, self.symbolIndex, parent=self.uiOutlineDOCK
+        )
+        self.uiOutlineDOCK.setWidget(self.uiOutlineWGT)
+        self.addDockWidget(Qt.DockWidgetArea.RightDockWidgetArea, self.uiOutlineDOCK)
+        self.uiOutlineDOCK.hide()
+        self.uiEditMENU.insertAction(
+            self.uiGoToSymbolACT, self.uiOutlineDOCK.toggleViewAction()
+        )
+
+        # Free the memory of workboxes that haven't been used recently
+        self.workboxUnloader = WorkboxUnloader(self.uiWorkboxTAB, parent=self)
+        self.uiMaxLoadedWorkboxesSPIN.valueChanged.connect(
+            self.workboxUnloader.set_max_loaded
+        )
+        self.uiUnloadIdleWorkboxesSPIN.valueChanged.connect(
+            lambda minutes: self.workboxUnloader.set_idle_time(minutes * 60)
+        )
+
         # Initial configuration of the logToFile feature
         self._logToFilePath = None
         self._stds = None
@@ -204,6 +236,7 @@ class LoggerWindow(Window):
         )
 
         self.uiAutoCompleteCaseSensitiveACT.toggled.connect(self.setCaseSensitive)
+        self.uiAutoCompleteStaticResolveACT.toggled.connect(self.setStaticResolve)
 
         self.uiSelectMonospaceFontACT.triggered.connect(
             partial(self.selectFont, origFont=None, monospace=True)
@@ -283,6 +316,8 @@ class LoggerWindow(Window):
         self.boxesOrphanedViaInstance = {}
 
         self.uiFocusNameACT.triggered.connect(self.show_focus_name)
+        self.uiGoToSymbolACT.triggered.connect(self.show_goto_symbol)
+        self.uiCompareWorkboxACT.triggered.connect(self.show_compare_workbox)
 
         self.uiCommentToggleACT.triggered.connect(self.comment_toggle)
 
@@ -399,8 +434,8 @@ class LoggerWindow(Window):
 
     def startFileSystemMonitor(self):
         """Start the file system monitor, and add this PrEditor's prefs path"""
-        self.openFileMonitor = QFileSystemWatcher(self)
-        self.openFileMonitor.fileChanged.connect(self.linkedFileChanged)
+        self.linkedFileSync = LinkedFileSync(self)
+        self.linkedFileSync.fileChanged.connect(self.linkedFileChanged)
         self.setFileMonitoringEnabled(self.prefsPath(), True)
 
     @Slot()
@@ -440,6 +475,14 @@ class LoggerWindow(Window):
         """
         self.uiAutoSaveSettingsCHK.setChecked(state)
 
+    def largeFileSize(self):
+        """Files of at least this many bytes are loaded in large-file mode.
+
+        Returns:
+            int: The size in bytes. Zero if large-file mode is disabled.
+        """
+        return self.uiLargeFileSizeSPIN.value() * 1024 * 1024
+
     def promptOnLinkedChange(self):
         """Whether or not Prompt On Linked Change option is set
 
@@ -541,23 +584,7 @@ class LoggerWindow(Window):
             name = group_widget.tabText(index)
             return WorkboxName(group, name)
 
-        # Otherwise resolve from the parent widgets.
-        # Get the parent QTabWidget of the workbox
-        workbox_tab_widget = tab_widget_for_tab(workbox)
-        if not workbox_tab_widget:
-            return None
-        # Get the group QTabWidget of the parent QTabWidget of the workbox
-        group_widget = tab_widget_for_tab(workbox_tab_widget)
-        if not group_widget:
-            return None
-
-        # Get the group name
-        index = group_widget.indexOf(workbox_tab_widget)
-        group = group_widget.tabText(index)
-
-        index = workbox_tab_widget.indexOf(workbox)
-        name = workbox_tab_widget.tabText(index)
-        return WorkboxName(group, name)
+        return cls.instance().uiWorkboxTAB.workbox_registry.name_for_workbox(workbox)
 
     @classmethod
     def workbox_for_name(cls, name, show=False, visible=False):
@@ -581,19 +608,9 @@ class LoggerWindow(Window):
 
         # If name is a string, find first tab with that name
         elif isinstance(name, str):
-            split = name.split('/', 1)
-            if len(split) < 2:
-                return None
-            group, editor = split
-            group_index = logger.uiWorkboxTAB.index_for_text(group)
-            if group_index != -1:
-                tab_widget = logger.uiWorkboxTAB.widget(group_index)
-                index = tab_widget.index_for_text(editor)
-                if index != -1:
-                    workbox = tab_widget.widget(index)
-                    if visible:
-                        tab_widget.setCurrentIndex(index)
-                        logger.uiWorkboxTAB.setCurrentIndex(group_index)
+            workbox = logger.uiWorkboxTAB.workbox_registry.workbox_for_name(name)
+            if workbox and visible:
+                logger.uiWorkboxTAB.set_current_groups_from_workbox(workbox)
 
         if show and workbox:
             workbox.__show__()
@@ -610,21 +627,13 @@ class LoggerWindow(Window):
                 to ensure that it is initialized and its text is loaded.
             visible (bool, optional): Make the this workbox visible if found.
         """
-        workbox = None
-        for box_info in self.uiWorkboxTAB.all_widgets():
-            temp_box = box_info[0]
-            if temp_box.__workbox_id__() == workbox_id:
-                workbox = temp_box
-                break
+        workbox = self.uiWorkboxTAB.workbox_registry.workbox_for_id(workbox_id)
 
         if workbox:
             if show:
                 workbox.__show__()
             if visible:
-                grp_idx, tab_idx = workbox.__group_tab_index__()
-                self.uiWorkboxTAB.setCurrentIndex(grp_idx)
-                group = self.uiWorkboxTAB.widget(grp_idx)
-                group.setCurrentIndex(tab_idx)
+                self.uiWorkboxTAB.set_current_groups_from_workbox(workbox)
 
         return workbox
 
@@ -715,7 +724,32 @@ class LoggerWindow(Window):
             return
 
         filename, idx, count = workbox_widget.__load_workbox_version_text__(versionType)
+        self.showWorkboxVersionStatus(filename, idx, count)
+
+    def change_to_workbox_backup_file(self, workbox, backup_file):
+        """Change the text of workbox to a specific previously saved version.
+
+        Args:
+            workbox (WorkboxMixin): The workbox to change the text of.
+            backup_file (str): The backup file to load, relative to the prefs
+                directory.
+        """
+        workbox.__show__()
+        idx, count = prefs.get_backup_file_index_and_count(
+            self.name, workbox.__workbox_id__(), backup_file=workbox.__backup_file__()
+        )
+
+        # Save any changes the user made to the latest version, like when
+        # browsing versions with change_to_workbox_version_text.
+        isLastWorkbox = idx is None or idx + 1 == count
+        if isLastWorkbox and workbox.__is_dirty__():
+            workbox.__save_prefs__(saveLinkedFile=False)
+
+        filename, idx, count = workbox.__load_workbox_backup_file__(backup_file)
+        self.showWorkboxVersionStatus(filename, idx, count)
 
+    def showWorkboxVersionStatus(self, filename, idx, count):
+        """Show which version of a workbox was loaded in the status text."""
         # Get rid of the hash part of the filename
         match = prefs.DATETIME_PATTERN.search(filename)
         if match:
@@ -737,7 +771,11 @@ class LoggerWindow(Window):
 
     def focusToWorkbox(self):
         """Move focus to the current workbox"""
-        self.current_workbox().setFocus()
+        # This is called while restoring prefs, don't create the editor of
+        # every workbox that is current while they are added.
+        workbox = self.uiWorkboxTAB.current_groups_widget(create=False)
+        if workbox is not None:
+            workbox.setFocus()
 
     def copyToConsole(self):
         """Copy current selection or line from workbox to console"""
@@ -976,7 +1014,8 @@ class LoggerWindow(Window):
             if workboxGroup is None:
                 return
             workbox = workboxGroup.currentWidget()
-        if workbox is None:
+        # Placeholders get the font once their editor is created
+        if workbox is None or isinstance(workbox, WorkboxPlaceholder):
             return
 
         if workbox.__font__() != font:
@@ -1186,13 +1225,16 @@ class LoggerWindow(Window):
                 self.latestTimeStrsForBoxesChangedViaInstance[workbox_id] = newStamp
                 editor.__set_changed_by_instance__(True)
 
-    def setFileMonitoringEnabled(self, filename, state):
+    def setFileMonitoringEnabled(self, filename, state, workbox=None):
         """Enables/Disables open file change monitoring. If enabled, A dialog will pop
         up when ever the open file is changed externally. If file monitoring is
         disabled in the IDE settings it will be ignored.
 
-        Returns:
-            bool:
+        Args:
+            filename (str): The file to monitor.
+            state (bool): Start or stop monitoring filename.
+            workbox (WorkboxMixin, optional): The workbox linked to filename.
+                The file is monitored until every workbox stops monitoring it.
         """
         # if file monitoring is enabled and we have a file name then set up the file
         # monitoring
@@ -1200,13 +1242,13 @@ class LoggerWindow(Window):
             return
 
         if state:
-            self.openFileMonitor.addPath(filename)
+            self.linkedFileSync.watch(filename, workbox)
         else:
-            self.openFileMonitor.removePath(filename)
+            self.linkedFileSync.unwatch(filename, workbox)
 
     def fileMonitoringEnabled(self, filename):
-        """Returns whether the provide filename is currently being watched, ie
-        is listed in self.openFileMonitor.files()
+        """Returns whether the provide filename is currently being watched by
+        self.linkedFileSync
 
         Args:
             filename (str): The filename to determine if being watched
@@ -1214,11 +1256,7 @@ class LoggerWindow(Window):
         Returns:
             bool: Whether filename is being watched.
         """
-        if not filename:
-            return False
-
-        watched_files = [Path(file) for file in self.openFileMonitor.files()]
-        return Path(filename) in watched_files
+        return self.linkedFileSync.is_watched(filename)
 
     def prefsPath(self, name='preditor_pref.json'):
         """Get the path to this core's prefs, for the given name
@@ -1281,21 +1319,18 @@ class LoggerWindow(Window):
             # another preditor instance)
             self.restorePrefs(skip_geom=True)
         else:
-            for info in self.uiWorkboxTAB.all_widgets():
-                editor, _, _, _, _ = info
-                if not editor or not editor.__filename__():
-                    continue
-                if Path(editor.__filename__()) == Path(filename):
-                    editor.__set_file_monitoring_enabled__(False)
+            for editor in self.linkedFileSync.workboxes(filename):
+                editor.__refresh_missing_linked_file__()
+                editor.__set_file_monitoring_enabled__(False)
 
-                    choice = editor.__maybe_reload_file__()
-                    # Save a backup of any unsaved changes
-                    if choice:
-                        editor.__save_prefs__(saveLinkedFile=False, force=True)
+                choice = editor.__maybe_reload_file__()
+                # Save a backup of any unsaved changes
+                if choice:
+                    editor.__save_prefs__(saveLinkedFile=False, force=True)
 
-                    filename = editor.__filename__()
-                    if filename and Path(filename).is_file():
-                        editor.__set_file_monitoring_enabled__(True)
+                linked = editor.__filename__()
+                if linked and Path(linked).is_file():
+                    editor.__set_file_monitoring_enabled__(True)
         self.updateTabColorsAndToolTips()
 
     def closeEvent(self, event):
@@ -1433,6 +1468,9 @@ class LoggerWindow(Window):
                 'dont_ask_again': self.dont_ask_again,
                 'max_num_backups': self.uiMaxNumBackupsSPIN.value(),
                 'max_recent_workboxes': self.uiMaxNumRecentWorkboxesSPIN.value(),
+                'max_loaded_workboxes': self.uiMaxLoadedWorkboxesSPIN.value(),
+                'unload_idle_workboxes': self.uiUnloadIdleWorkboxesSPIN.value(),
+                'large_file_size': self.uiLargeFileSizeSPIN.value(),
                 'closedWorkboxData': self.getClosedWorkboxData(),
                 'confirmBeforeClose': self.uiConfirmBeforeCloseCHK.isChecked(),
                 'displayExtraTooltipInfo': self.uiExtraTooltipInfoCHK.isChecked(),
@@ -1451,6 +1489,9 @@ class LoggerWindow(Window):
         completer = self.console().completer()
         pref["caseSensitive"] = completer.caseSensitive()
         pref["completerMode"] = completer.completerMode().value
+        pref["completerStaticResolve"] = completer.staticResolve()
+        pref["completerDocumentationDelay"] = completer.documentationDelay()
+        pref["completerDocumentationCacheSize"] = completer.documentationCacheSize()
 
         if self._stylesheet == 'Custom':
             pref['styleSheet'] = self.styleSheet()
@@ -1693,6 +1734,12 @@ class LoggerWindow(Window):
         completerMode = CompleterMode(pref.get('completerMode', 0))
         self.cycleToCompleterMode(completerMode)
         self.setCompleterMode(completerMode)
+        self.setStaticResolve(pref.get('completerStaticResolve', False))
+        completer = self.console().completer()
+        completer.setDocumentationDelay(pref.get('completerDocumentationDelay', 300))
+        completer.setDocumentationCacheSize(
+            pref.get('completerDocumentationCacheSize', 32)
+        )
         self.uiHighlightExactCompletionCHK.setChecked(
             pref.get('highlightExactCompletion', False)
         )
@@ -1753,6 +1800,9 @@ class LoggerWindow(Window):
         max_recent_workboxes = pref.get('max_recent_workboxes', 25)
         self.uiMaxNumRecentWorkboxesSPIN.setValue(max_recent_workboxes)
         self.uiMaxNumBackupsSPIN.setValue(pref.get('max_num_backups', 99))
+        self.uiMaxLoadedWorkboxesSPIN.setValue(pref.get('max_loaded_workboxes', 0))
+        self.uiUnloadIdleWorkboxesSPIN.setValue(pref.get('unload_idle_workboxes', 0))
+        self.uiLargeFileSizeSPIN.setValue(pref.get('large_file_size', 5))
 
         # List recently closed workboxes
         closedWorkboxData = pref.get('closedWorkboxData', [])
@@ -2085,6 +2135,11 @@ class LoggerWindow(Window):
         self.reportCaseChange(state)
         completer.refreshList()
 
+    def setStaticResolve(self, state):
+        """Set if the completer resolves objects without evaluating code"""
+        self.console().completer().setStaticResolve(state)
+        self.uiAutoCompleteStaticResolveACT.setChecked(state)
+
     def toggleCaseSensitive(self):
         """Toggle completer case-sensitivity"""
         state = self.console().completer().caseSensitive()
@@ -2215,6 +2270,32 @@ class LoggerWindow(Window):
         w.highlighted.connect(update_tab)
         w.popup()
 
+    @Slot()
+    def show_compare_workbox(self):
+        workbox = self.current_workbox()
+        if workbox is None:
+            return
+        view = DiffView(workbox, self.uiWorkboxTAB, parent=self)
+        view.show()
+
+    @Slot()
+    def show_goto_symbol(self):
+        model = SymbolListItemModel(self.uiWorkboxTAB, self.symbolIndex)
+        model.process()
+
+        def goto_symbol(index):
+            group, tab = model.workbox_indexes_from_model_index(index)
+            if group is None:
+                return
+            self.uiWorkboxTAB.set_current_groups_from_index(group, tab)
+            workbox = self.current_workbox()
+            workbox.__goto_line__(model.line_from_model_index(index))
+            workbox.setFocus()
+
+        w = FuzzySearch(model, parent=self)
+        w.selected.connect(goto_symbol)
+        w.popup()
+
     def updateCopyIndentsAsSpaces(self):
         for workbox, _, _, _, _ in self.uiWorkboxTAB.all_widgets():
             workbox.__set_copy_indents_as_spaces__(
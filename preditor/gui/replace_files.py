@@ -0,0 +1,185 @@
+from __future__ import absolute_import
+
+from collections import namedtuple
+
+from Qt.QtCore import Qt
+from Qt.QtWidgets import QDialog, QDialogButtonBox, QTreeWidgetItem
+
+from . import loadUi
+
+WorkboxReplacements = namedtuple("WorkboxReplacements", "editor path text replacements")
+"""The replacements found in a single workbox by `find_replacements` and the
+text they were found in."""
+
+
+def find_replacements(managers, finder, replace_text):
+    """Find the replacements for every workbox without loading them.
+
+    Args:
+        managers (list): The GroupTabWidgets whose workboxes are searched.
+        finder (TextSearch): Finds the text to replace.
+        replace_text (str): The text matches are replaced with. For regex
+            searches this can reference groups like `re.sub`.
+
+    Returns:
+        list: A `WorkboxReplacements` for each workbox with matches.
+    """
+    ret = []
+    for manager in managers:
+        for editor, group_name, tab_name, _, _ in manager.all_widgets():
+            text = editor.__text_snapshot__()
+            replacements = finder.replacements(text, replace_text)
+            if replacements:
+                path = "/".join((group_name, tab_name))
+                ret.append(WorkboxReplacements(editor, path, text, replacements))
+    return ret
+
+
+def apply_replacements(editor, replacements, finder, replace_text):
+    """Apply replacements to editor as a single undoable action.
+
+    The workbox is loaded if needed. As `replacements` may have been found in a
+    snapshot of its text, they are found again in the current text. Only the
+    matches that are still at the same line and column with the same text are
+    replaced.
+
+    Args:
+        editor (WorkboxMixin): The workbox to apply the replacements to.
+        replacements (list): The `Replacement`s to apply.
+        finder (TextSearch): The finder that found replacements.
+        replace_text (str): The text replacements were found for.
+
+    Returns:
+        int: The number of replacements applied.
+    """
+    if not replacements:
+        return 0
+    editor.__show__()
+    keys = {(r.line_num, r.column, r.old) for r in replacements}
+    edits = [
+        (r.start, r.end, r.new)
+        for r in finder.replacements(editor.__text__(), replace_text)
+        if (r.line_num, r.column, r.old) in keys
+    ]
+    if edits:
+        editor.__replace_text__(edits)
+    return len(edits)
+
+
+class ReplaceFiles(QDialog):
+    """Previews replacing text in workboxes and applies the checked replacements.
+
+    Each workbox with matches is shown with a child item previewing the line
+    of each match before and after it is replaced. Workboxes are only loaded
+    if a replacement is applied to them.
+
+    Args:
+        finder (TextSearch): Finds the text to replace.
+        replace_text (str): The text matches are replaced with.
+        managers (list): The GroupTabWidgets whose workboxes are searched.
+        parent (QWidget, optional): The parent of this dialog.
+    """
+
+    def __init__(self, finder, replace_text, managers, parent=None):
+        super(ReplaceFiles, self).__init__(parent)
+        loadUi(__file__, self)
+        self.finder = finder
+        self.replace_text = replace_text
+        self.summary = ""
+        self.workboxes = find_replacements(managers, finder, replace_text)
+
+        self.uiDialogButtonBox.button(QDialogButtonBox.StandardButton.Ok).setText(
+            "Replace"
+        )
+        self.refresh()
+
+    def accept(self):
+        self.summary = self.apply()
+        super(ReplaceFiles, self).accept()
+
+    def apply(self):
+        """Apply the checked replacements.
+
+        Returns:
+            str: A summary of the replacements that were applied.
+        """
+        applied = 0
+        selected = 0
+        workbox_count = 0
+        for workbox, replacements in self.checked():
+            count = apply_replacements(
+                workbox.editor, replacements, self.finder, self.replace_text
+            )
+            selected += len(replacements)
+            applied += count
+            if count:
+                workbox_count += 1
+
+        summary = '\n{} matches replaced in {} workboxes\n'.format(
+            applied, workbox_count
+        )
+        if applied != selected:
+            summary += (
+                '{} matches were skipped as the workbox changed since the '
+                'preview\n'.format(selected - applied)
+            )
+        return summary
+
+    def checked(self):
+        """Yields each `WorkboxReplacements` and the list of its checked
+        replacements."""
+        for i, workbox in enumerate(self.workboxes):
+            item = self.uiMatchesTREE.topLevelItem(i)
+            replacements = [
+                workbox.replacements[j]
+                for j in range(item.childCount())
+                if item.child(j).checkState(0) == Qt.CheckState.Checked
+            ]
+            if replacements:
+                yield workbox, replacements
+
+    def refresh(self):
+        """Re-build the preview of the replacements, checking all of them."""
+        tree = self.uiMatchesTREE
+        tree.clear()
+        count = 0
+        for workbox in self.workboxes:
+            lines = workbox.text.splitlines()
+            item = QTreeWidgetItem(tree, [workbox.path])
+            item.setFirstColumnSpanned(True)
+            item.setFlags(
+                item.flags()
+                | Qt.ItemFlag.ItemIsUserCheckable
+                | Qt.ItemFlag.ItemIsAutoTristate
+            )
+            for replacement in workbox.replacements:
+                line = lines[replacement.line_num - 1]
+                before, after = self.preview(line, replacement)
+                child = QTreeWidgetItem(
+                    item, [str(replacement.line_num), before, after]
+                )
+                child.setFlags(child.flags() | Qt.ItemFlag.ItemIsUserCheckable)
+                child.setCheckState(0, Qt.CheckState.Checked)
+                child.setToolTip(1, before)
+                child.setToolTip(2, after)
+                count += 1
+            # The workbox is checked if all of its children are checked
+            item.setCheckState(0, Qt.CheckState.Checked)
+            item.setExpanded(True)
+
+        for column in range(tree.columnCount()):
+            tree.resizeColumnToContents(column)
+        self.uiSummaryLBL.setText(
+            '{} matches in {} workboxes. Select the matches to replace.'.format(
+                count, len(self.workboxes)
+            )
+        )
+
+    @classmethod
+    def preview(cls, line, replacement):
+        """Returns line before and after applying replacement to it."""
+        column = replacement.column
+        after = "".join(
+            (line[:column], replacement.new, line[column + len(replacement.old) :])
+        )
+        return line.strip(), after.strip()
@@ -0,0 +1,207 @@
+from __future__ import absolute_import
+
+import weakref
+
+from Qt.QtCore import QModelIndex, Qt, QTimer, Signal
+from Qt.QtGui import QStandardItem
+from Qt.QtWidgets import QTreeWidget, QTreeWidgetItem
+
+from ..delayable_engine.delayables import Delayable
+from ..utils.symbol_index import parse_symbols
+from .group_tab_widget.grouped_tab_models import GroupTabItemModel
+
+
+class SymbolIndexDelayable(Delayable):
+    """Indexes the classes, functions and top level assignments of workboxes.
+
+    The symbols of each workbox are cached with the `__revision__` of the
+    workbox they were built for, so they are only parsed again after its text
+    changes. Workboxes processed by this delayable's engine are indexed in the
+    background by `schedule`, `symbolsChanged` is emitted once they are done.
+    `symbols` indexes any other workbox, like a `WorkboxPlaceholder`, when its
+    symbols are requested. Workboxes in large-file mode are not indexed.
+    """
+
+    key = 'symbol_index'
+    supports = ('workbox',)
+
+    symbolsChanged = Signal(object)
+    """Emitted with the workbox whose symbols were re-built."""
+
+    def __init__(self, engine):
+        super(SymbolIndexDelayable, self).__init__(engine)
+        # The revision each workbox was indexed at and its symbols
+        self._symbols = weakref.WeakKeyDictionary()
+
+    def is_current(self, workbox):
+        """Returns if the cached symbols of workbox match its current text."""
+        cached = self._symbols.get(workbox)
+        return cached is not None and cached[0] == workbox.__revision__()
+
+    def loop(self, document):
+        self.symbols(document)
+
+    def remove_document(self, document):
+        self._symbols.pop(document, None)
+
+    def schedule(self, workbox):
+        """Index workbox in the background if its text has changed.
+
+        Returns:
+            bool: If the workbox needs to be indexed. If it isn't processed by
+                this delayable's engine, it's indexed before returning.
+        """
+        if self.is_current(workbox):
+            return False
+        if workbox in self.engine.documents:
+            self.engine.enqueue(workbox, self.key)
+        else:
+            self.symbols(workbox)
+        return True
+
+    def symbols(self, workbox):
+        """Returns the symbols of workbox, indexing it if its text has changed.
+
+        Returns:
+            list: The `Symbol`s defined in the text of workbox, sorted by line.
+        """
+        revision = workbox.__revision__()
+        cached = self._symbols.get(workbox)
+        if cached is not None and cached[0] == revision:
+            return cached[1]
+
+        if workbox.__large_file__():
+            # Parsing large files is too slow
+            symbols = []
+        else:
+            try:
+                text = workbox.__text_snapshot__()
+            except (OSError, UnicodeDecodeError):
+                text = ""
+            symbols = parse_symbols(text)
+        self._symbols[workbox] = (revision, symbols)
+        self.symbolsChanged.emit(workbox)
+        return symbols
+
+
+class SymbolOutline(QTreeWidget):
+    """Shows the symbols of the current workbox as a tree.
+
+    While visible, the current workbox is checked periodically and re-indexed
+    in the background once its text has changed. Activating a symbol moves the
+    cursor of the workbox to it.
+
+    Args:
+        manager (GroupTabWidget): The widget whose current workbox is shown.
+        symbol_index (SymbolIndexDelayable): Provides the symbols of the workbox.
+        parent (QWidget, optional): The parent of this widget.
+    """
+
+    LineRole = Qt.ItemDataRole.UserRole + 1
+
+    def __init__(self, manager, symbol_index, parent=None):
+        super(SymbolOutline, self).__init__(parent)
+        self.manager = manager
+        self.symbol_index = symbol_index
+        self._workbox = None
+        self._revision = None
+
+        self.setHeaderLabels(["Symbol", "Line"])
+        self.setRootIsDecorated(True)
+        self.itemActivated.connect(self.goto_item)
+        self.symbol_index.symbolsChanged.connect(self.symbols_changed)
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(500)
+        self.timer.timeout.connect(self.refresh)
+
+    def goto_item(self, item, column=0):
+        """Move the cursor of the shown workbox to the line of item."""
+        if self._workbox is None:
+            return
+        self._workbox.__goto_line__(item.data(0, self.LineRole))
+        self._workbox.setFocus()
+
+    def hideEvent(self, event):  # noqa: N802
+        super(SymbolOutline, self).hideEvent(event)
+        self.timer.stop()
+
+    def refresh(self):
+        """Show the symbols of the current workbox, indexing it if needed."""
+        workbox = self.manager.current_groups_widget(create=False)
+        if workbox is None:
+            self._workbox = None
+            self._revision = None
+            self.clear()
+            return
+
+        if workbox is self._workbox and workbox.__revision__() == self._revision:
+            return
+        self._workbox = workbox
+        if not self.symbol_index.schedule(workbox):
+            self.update_symbols(self.symbol_index.symbols(workbox))
+
+    def showEvent(self, event):  # noqa: N802
+        super(SymbolOutline, self).showEvent(event)
+        self.refresh()
+        self.timer.start()
+
+    def symbols_changed(self, workbox):
+        if workbox is self._workbox:
+            self.update_symbols(self.symbol_index.symbols(workbox))
+
+    def update_symbols(self, symbols):
+        """Replace the symbols shown with symbols."""
+        self._revision = self._workbox.__revision__()
+        self.clear()
+        # The tree item of each class and function so their symbols are
+        # shown as children
+        items = {}
+        for symbol in symbols:
+            parent = items.get(symbol.scope, self.invisibleRootItem())
+            item = QTreeWidgetItem(parent, [symbol.name, str(symbol.line)])
+            item.setData(0, self.LineRole, symbol.line)
+            item.setToolTip(0, "{} {}".format(symbol.kind, symbol.qualname))
+            items[symbol.scope + (symbol.name,)] = item
+        self.expandAll()
+        self.resizeColumnToContents(0)
+
+
+class SymbolListItemModel(GroupTabItemModel):
+    """Lists the symbols of every workbox for `FuzzySearch`.
+
+    Args:
+        manager (GroupTabWidget): The widget whose workboxes are listed.
+        symbol_index (SymbolIndexDelayable): Provides the symbols of the workboxes.
+    """
+
+    LineRole = GroupTabItemModel.TabIndexRole + 1
+
+    def __init__(self, manager, symbol_index, *args, **kwargs):
+        super(SymbolListItemModel, self).__init__(manager, *args, **kwargs)
+        self.symbol_index = symbol_index
+        # There isn't a symbol to restore when the search is canceled
+        self.original_model_index = QModelIndex()
+
+    def flags(self, index):
+        return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+
+    def line_from_model_index(self, index):
+        """Returns the line number of the symbol for the provided QModelIndex"""
+        return index.data(self.LineRole)
+
+    def process(self):
+        root = self.invisibleRootItem()
+        all_widgets = self.manager.all_widgets()
+        for workbox, group_name, tab_name, group_index, tab_index in all_widgets:
+            for symbol in self.symbol_index.symbols(workbox):
+                item = QStandardItem(
+                    "{}  {}/{}:{}".format(
+                        symbol.qualname, group_name, tab_name, symbol.line
+                    )
+                )
+                item.setToolTip(symbol.kind)
+                item.setData(group_index, self.GroupIndexRole)
+                item.setData(tab_index, self.TabIndexRole)
+                item.setData(symbol.line, self.LineRole)
+                root.appendRow(item)
@@ -1,5 +1,6 @@
 from __future__ import absolute_import, print_function
 
+import datetime
 import enum
 import io
 import logging
@@ -7,7 +8,6 @@ import os
 import sys
 import tempfile
 import textwrap
-import time
 from pathlib import Path
 
 import charset_normalizer
@@ -16,17 +16,59 @@ from Qt.QtCore import Qt, Signal
 from Qt.QtWidgets import QMessageBox, QStackedWidget
 
 from ..prefs import (
+    DATETIME_FORMAT,
+    DATETIME_PATTERN,
     VersionTypes,
     create_stamped_path,
+    get_backup_file_index_and_count,
     get_backup_version_info,
+    get_file_group,
     get_full_path,
     get_prefs_dir,
     get_relative_path,
 )
+from ..utils.trigram_index import get_trigram_index
 from .group_tab_widget.one_tab_widget import OneTabWidget
+from .large_file_banner import LargeFileBanner
 
 logger = logging.getLogger(__name__)
 
+ENCODING_SAMPLE_SIZE = 64 * 1024
+"""The number of bytes of a large file used to detect its encoding."""
+
+
+def encoding_sample(data, size):
+    """Returns up to size bytes of data to detect its encoding from.
+
+    Detecting the encoding of a large file is slow, so it's detected from parts
+    of its start, middle and end instead. Each part is trimmed to whole lines
+    so multi-byte characters are not split.
+
+    Args:
+        data (bytes): The contents of a file.
+        size (int): The maximum number of bytes to return.
+
+    Returns:
+        bytes: data if it's not larger than size, otherwise the sample.
+    """
+    if len(data) <= size:
+        return data
+
+    chunk = size // 3
+    parts = []
+    for start in (0, (len(data) - chunk) // 2, len(data) - chunk):
+        part = data[start : start + chunk]
+        if start:
+            newline = part.find(b"\n")
+            if newline != -1:
+                part = part[newline + 1 :]
+        if start + chunk < len(data):
+            newline = part.rfind(b"\n")
+            if newline != -1:
+                part = part[: newline + 1]
+        parts.append(part)
+    return b"".join(parts)
+
 
 class EolTypes(enum.Enum):
     EolWindows = '\r\n'
@@ -76,6 +118,10 @@ class WorkboxMixin(object):
     _warning_text = None
     """When a user is picking this Workbox class, show a warning with this text."""
 
+    _large_file_size = 5 * 1024 * 1024
+    """Files of at least this many bytes are loaded in large-file mode if the
+    window doesn't provide `largeFileSize`. Zero disables large-file mode."""
+
     workboxSaved = Signal()
 
     def __init__(
@@ -90,10 +136,15 @@ class WorkboxMixin(object):
         core_name=None,
         **kwargs,
     ):
+        # The editor's __init__ may set its language, which checks this
+        self._large_file = False
         super(WorkboxMixin, self).__init__(parent=parent, **kwargs)
         self._is_loaded = False
+        # The view state saved by `__unload__`, restored by `__show__`
+        self._view_state = None
         self._show_blank = False
         self._tempdir = None
+        self._large_file_banner = None
 
         # As event-driven dialogs are shown, add the tuple of (title, message)
         # to this list, to prevent multiple dialogs showing for same reason.
@@ -111,6 +162,14 @@ class WorkboxMixin(object):
 
         self._tab_widget = parent
 
+        # Incremented every time the text changes, used to cache the result of
+        # comparing the text to _last_saved_text.
+        self._revision = 0
+        self._dirty_cache = None
+        self._last_saved_hash = None
+        # True if the editor's modified flag was reset while its text matched
+        # _last_saved_text. See `__is_text_dirty__`.
+        self._savepoint = False
         self.__set_last_saved_text__("")
         # You would think we should also __set_last_workbox_name_ here, but we
         # wait until __show__ so that we know the tab exists, and has tabText
@@ -122,8 +181,11 @@ class WorkboxMixin(object):
         self.__set_changed_by_instance__(False)
         self._changed_saved = False
 
-        self.textChanged.connect(self._tab_widget.tabBar().updateColorsAndToolTips)
-        self.workboxSaved.connect(self._tab_widget.tabBar().updateColorsAndToolTips)
+        # This must be connected first so the revision is updated before any
+        # other slots check if the workbox is dirty.
+        self.textChanged.connect(self.__increment_revision__)
+        self.textChanged.connect(self.__update_tab_state__)
+        self.workboxSaved.connect(self.__update_tab_state__)
 
     def __prompt_on_linked_change__(self):
         """Whether the option to prompt on linked file change is set
@@ -146,6 +208,14 @@ class WorkboxMixin(object):
             text (str): The text to define as last_saved_text
         """
         self._last_saved_text = text
+        self._last_saved_hash = None
+        self._dirty_cache = None
+
+        # If the editor shows the saved text, reset its modified flag so undoing
+        # back to this point can be detected without comparing the text.
+        self._savepoint = text == self.__text__()
+        if self._savepoint:
+            self.__set_savepoint__()
 
         tab_widget = self.__tab_widget__()
         if tab_widget is not None:
@@ -278,7 +348,7 @@ class WorkboxMixin(object):
         """
         # if file monitoring is enabled and we have a file name then set up the file
         # monitoring
-        self.window().setFileMonitoringEnabled(self.__filename__(), state)
+        self.window().setFileMonitoringEnabled(self.__filename__(), state, workbox=self)
 
     def __filename__(self):
         """The workboxes filename (ie linked file), if any
@@ -295,6 +365,7 @@ class WorkboxMixin(object):
             filename (str): The filename to link to
         """
         self._filename = filename
+        self._missing_linked_file = None
 
     def __tempfile__(self):
         """The workboxes defined tempfile, if any.
@@ -368,51 +439,9 @@ class WorkboxMixin(object):
         """Returns the name for this workbox or a given workbox.
         The name is the group tab text and the workbox tab text joined by a `/`"""
         workbox = workbox if workbox else self
-        workboxTAB = self.window().uiWorkboxTAB
-        group_name = None
-        workbox_name = None
-
-        grouped_tab_widget = workbox.__tab_widget__()
-        if grouped_tab_widget is None:
-            return WorkboxName("", "")
-
-        if workbox:
-            for group_idx in range(workboxTAB.count()):
-                # If a previous iteration determine workbox_name, bust out
-                if workbox_name:
-                    break
-                # Check if current group is the workboxes parent group
-                cur_group_widget = workboxTAB.widget(group_idx)
-                if cur_group_widget == grouped_tab_widget:
-                    group_name = workboxTAB.tabText(group_idx)
-
-                    # Found the group, now find workbox
-                    for workbox_idx in range(cur_group_widget.count()):
-                        cur_workbox_widget = cur_group_widget.widget(workbox_idx)
-                        if cur_workbox_widget == workbox:
-                            workbox_name = cur_group_widget.tabText(workbox_idx)
-                            break
-        else:
-            groupedTabBar = grouped_tab_widget.tabBar()
-
-            idx = -1
-            for idx in range(grouped_tab_widget.count()):
-                if grouped_tab_widget.widget(idx) == workbox:
-                    break
-            workbox_name = groupedTabBar.tabText(idx)
-
-            group_tab_widget = grouped_tab_widget.tab_widget()
-            groupTabBar = group_tab_widget.tabBar()
-            idx = -1
-            for idx in range(group_tab_widget.count()):
-                if group_tab_widget.widget(idx) == grouped_tab_widget:
-                    break
-            group_name = groupTabBar.tabText(idx)
-
-        # If both found, construct workbox name
-        if group_name and workbox_name:
-            name = WorkboxName(group_name, workbox_name)
-        else:
+        registry = self.window().uiWorkboxTAB.workbox_registry
+        name = registry.name_for_workbox(workbox)
+        if name is None or not name.group or not name.workbox:
             name = WorkboxName("", "")
         return name
 
@@ -437,10 +466,18 @@ class WorkboxMixin(object):
             filename (str): The file to load
         """
         if filename and Path(filename).is_file():
-            self._encoding, text = self.__open_file__(filename)
+            large_file_size = self.__large_file_size__()
+            large_file = bool(large_file_size) and (
+                os.path.getsize(filename) >= large_file_size
+            )
+            # Turn off the expensive features before setting the text
+            if large_file != self.__large_file__():
+                self.__set_large_file__(large_file)
+            sample_size = ENCODING_SAMPLE_SIZE if large_file else None
+            self._encoding, text = self.__open_file__(filename, sample_size=sample_size)
             self.__set_text__(text)
-            self.__set_file_monitoring_enabled__(True)
             self.__set_filename__(filename)
+            self.__set_file_monitoring_enabled__(True)
 
             # Determine new workbox name so we can store it
             cur_workbox_name = self.__workbox_name__()
@@ -454,6 +491,41 @@ class WorkboxMixin(object):
 
         self.__set_last_saved_text__(self.__text__())
 
+    def __large_file__(self):
+        """Returns if this workbox is in large-file mode. See `__set_large_file__`."""
+        return self._large_file
+
+    def __set_large_file__(self, state):
+        """Enable or disable large-file mode.
+
+        `__load__` enables this for files of at least `__large_file_size__`
+        bytes. The workbox is made read-only and a banner explains which
+        features are disabled. Subclasses should extend this to disable their
+        expensive features like syntax highlighting and delayables.
+
+        Args:
+            state (bool): Enable large-file mode.
+        """
+        self._large_file = state
+        self.setReadOnly(state)
+        if state:
+            if self._large_file_banner is None:
+                self._large_file_banner = LargeFileBanner(self)
+            self._large_file_banner.show_banner()
+        elif self._large_file_banner is not None:
+            self._large_file_banner.hide_banner()
+
+    def __large_file_size__(self):
+        """Files of at least this many bytes are loaded in large-file mode.
+
+        Returns:
+            int: The size in bytes. Zero if large-file mode is disabled.
+        """
+        window = self.window()
+        if window and hasattr(window, "largeFileSize"):
+            return window.largeFileSize()
+        return self._large_file_size
+
     def __margins_font__(self):
         raise NotImplementedError("Mixin method not overridden.")
 
@@ -528,9 +600,11 @@ class WorkboxMixin(object):
             tab_widget.tabBar().setTabText(editor_idx, title)
 
     def __maybe_reload_file__(self):
-        """Reload this workbox's linked file."""
-        # Loading the file too quickly misses any changes
-        time.sleep(0.1)
+        """Reload this workbox's linked file.
+
+        This is called by `LoggerWindow.linkedFileChanged` once
+        `LinkedFileSync` has waited for the file to finish being written.
+        """
         font = self.__font__()
 
         choice = self.__linked_file_changed__()
@@ -620,6 +694,16 @@ class WorkboxMixin(object):
     def __remove_selected_text__(self):
         raise NotImplementedError("Mixin method not overridden.")
 
+    def __replace_text__(self, edits):
+        """Replace multiple ranges of text as a single undoable action.
+
+        Args:
+            edits (list): A `(start, end, text)` tuple for each range to replace.
+                start and end are indexes into `__text__()`. The ranges must not
+                overlap.
+        """
+        raise NotImplementedError("Mixin method not overridden.")
+
     def __save__(self):
         """Save this workbox's linked file.
 
@@ -708,13 +792,114 @@ class WorkboxMixin(object):
         """
         raise NotImplementedError("Mixin method not overridden.")
 
+    def __text_snapshot__(self):
+        """Returns the text of this workbox without loading it into the editor.
+
+        If the workbox is loaded its current text is returned. Otherwise the text
+        it would show once loaded is read from disk, the linked file if it exists
+        or the latest backup file. This lets code like Find in Workboxes read the
+        text of every workbox without the cost of loading them all.
+
+        Returns:
+            str: The text of this workbox.
+        """
+        if self._is_loaded:
+            return self.__text__()
+
+        filepath, sample_size = self.__snapshot_file__()
+        if filepath:
+            _encoding, text = self.__open_file__(
+                filepath, strict=False, sample_size=sample_size
+            )
+            return text
+        return ""
+
+    def __snapshot_file__(self):
+        """Returns the file `__text_snapshot__` reads the text of this workbox
+        from, so it can be read outside of the gui thread.
+
+        Returns:
+            str or None: The linked file if it exists, otherwise the latest
+                backup file. None if the workbox is loaded or it has neither.
+            int or None: The sample_size to pass to `__open_file__`.
+        """
+        if self._is_loaded:
+            return None, None
+
+        filename = self.__filename__()
+        if filename and Path(filename).is_file():
+            sample_size = ENCODING_SAMPLE_SIZE if self.__large_file__() else None
+            return filename, sample_size
+        return self.__snapshot_backup_file__(), None
+
+    def __snapshot_backup_file__(self):
+        """Returns the backup file `__text_snapshot__` reads its text from.
+
+        Returns:
+            str or None: The latest backup file. None is returned if the workbox
+                is loaded, its text is read from a linked file or it doesn't have
+                any backup files.
+        """
+        if self._is_loaded:
+            return None
+        filename = self.__filename__()
+        if filename and Path(filename).is_file():
+            return None
+
+        filepath, _idx, count = get_backup_version_info(
+            self.core_name, self.__workbox_id__(), VersionTypes.Last, ""
+        )
+        if count and Path(filepath).is_file():
+            return filepath
+        return None
+
     def __set_text__(self, txt):
         """Replace all of the current text with txt. This method can be overridden
         by sub-classes to accommodate that widget's text-setting method. Most
         likely should also set self._is_loaded=True.
         """
+        # Read-only editors like large files may ignore setting their text
+        read_only = self.isReadOnly()
+        if read_only:
+            self.setReadOnly(False)
         self.setText(txt)
+        if read_only:
+            self.setReadOnly(True)
         self._is_loaded = True
+        # Setting the text may reset the editor's modified flag and textChanged
+        # may not be emitted, so the savepoint and cache can't be trusted.
+        self._savepoint = False
+        self.__increment_revision__()
+
+    def __update_tab_state__(self):
+        """Schedule updating the color and tool tip of this workbox's tab.
+
+        Updates are debounced by the tab bar, so typing only updates the tab of
+        the workbox being edited once the user pauses.
+        """
+        tab_widget = self.__tab_widget__()
+        if tab_widget is not None:
+            tab_widget.tabBar().scheduleTabUpdate(self)
+
+    def __increment_revision__(self):
+        """Record that the text of this workbox has changed."""
+        self._revision += 1
+
+    def __revision__(self):
+        """Returns a number that changes every time the text of this workbox
+        changes. Used to cache results that depend on the text."""
+        return self._revision
+
+    def __is_modified__(self):
+        """Returns if the editor has been modified since `__set_savepoint__` was
+        called. Editors using an undo stack should report False when undoing
+        back to the savepoint. None is returned if this isn't supported.
+        """
+        return None
+
+    def __set_savepoint__(self):
+        """Mark the current state of the editor as unmodified. This is called
+        when the text matches the last saved text."""
 
     def __text_part__(self, lineNum=None, start=None, end=None):
         """Returns the text in this widget, possibly limited in scope.
@@ -745,11 +930,41 @@ class WorkboxMixin(object):
             is_dirty (bool): Whether or not this workbox has unsaved changes
         """
         is_dirty = (
-            self.__text__() != self.__last_saved_text__()
+            self.__is_text_dirty__()
             or self.__workbox_name__(workbox=self) != self.__last_workbox_name__()
         )
         return is_dirty
 
+    def __is_text_dirty__(self):
+        """Returns if the text of this workbox differs from the last saved text.
+
+        This is checked every time a workbox's text changes, so it avoids
+        comparing the full text where possible. If the editor's modified flag
+        was reset when the text was saved and it is still unmodified, for example
+        after undoing all changes, the text is clean. Otherwise a hash of the text
+        is compared to a lazily computed hash of the last saved text, and the
+        result is cached until the text changes again.
+
+        Returns:
+            bool: True if the text has unsaved changes.
+        """
+        if self._savepoint and self.__is_modified__() is False:
+            return False
+
+        revision = self.__revision__()
+        if self._dirty_cache is not None and self._dirty_cache[0] == revision:
+            return self._dirty_cache[1]
+
+        if self._last_saved_hash is None:
+            self._last_saved_hash = hash(self.__last_saved_text__())
+        text = self.__text__()
+        is_dirty = hash(text) != self._last_saved_hash
+        if not is_dirty:
+            # Guard against hash collisions hiding unsaved changes
+            is_dirty = text != self.__last_saved_text__()
+        self._dirty_cache = (revision, is_dirty)
+        return is_dirty
+
     def __is_missing_linked_file__(self):
         """Determine if this workbox is linked to a file which is missing on disk.
 
@@ -757,11 +972,26 @@ class WorkboxMixin(object):
             bool: Whether this workbox is linked to a file which is missing on
                 disk.
         """
-        missing = False
-        filename = self.__filename__()
-        if filename:
-            missing = not Path(filename).is_file()
-        return missing
+        # The result is cached as this is checked every time the tab is
+        # updated. It's refreshed when the file watcher reports a change.
+        if self._missing_linked_file is None:
+            missing = False
+            filename = self.__filename__()
+            if filename:
+                missing = not Path(filename).is_file()
+            self._missing_linked_file = missing
+        return self._missing_linked_file
+
+    def __refresh_missing_linked_file__(self):
+        """Check if the linked file still exists on disk, updating the cached
+        result of `__is_missing_linked_file__`.
+
+        Returns:
+            bool: Whether this workbox is linked to a file which is missing on
+                disk.
+        """
+        self._missing_linked_file = None
+        return self.__is_missing_linked_file__()
 
     @classmethod
     def __unix_end_lines__(cls, txt):
@@ -816,7 +1046,11 @@ class WorkboxMixin(object):
             )
 
             full_path = str(full_path)
-            self.__write_file__(full_path, self.__text__(), encoding=self._encoding)
+            text = self.__unix_end_lines__(self.__text__())
+            self.__write_file__(full_path, text, encoding=self._encoding)
+            # Keep the search index up to date with the latest backup. It's
+            # saved to disk once all workboxes have been saved.
+            get_trigram_index(self.core_name).update(workbox_id, text, full_path)
 
             self._backup_file = get_relative_path(self.core_name, full_path)
             ret['backup_file'] = self._backup_file
@@ -871,6 +1105,13 @@ class WorkboxMixin(object):
         """
         self._workbox_id = workbox_id
 
+        # Update the registry used to find workboxes by id
+        group = self.__tab_widget__()
+        manager = group.tab_widget() if hasattr(group, "tab_widget") else None
+        registry = getattr(manager, "workbox_registry", None)
+        if registry:
+            registry.invalidate()
+
     def __backup_file__(self):
         """Returns this workbox's backup file
 
@@ -1001,10 +1242,75 @@ class WorkboxMixin(object):
         filename = Path(filepath).name
         return filename, idx, count
 
+    def __load_workbox_backup_file__(self, backup_file):
+        """Set the text of this workbox to the contents of a specific backup file.
+
+        Args:
+            backup_file (str): The backup file to load. This can be relative to
+                the prefs directory or a full path.
+
+        Returns:
+            filename, idx, count (str, int, int): The loaded backup file's name,
+                the (one-based) index of this file in the stack of files, and the
+                total count of files for this workbox.
+        """
+        workbox_id = self.__workbox_id__()
+        filepath = get_full_path(self.core_name, workbox_id, backup_file=backup_file)
+        idx, count = get_backup_file_index_and_count(
+            self.core_name, workbox_id, filepath
+        )
+        _encoding, txt = self.__open_file__(str(filepath))
+
+        self._backup_file = get_relative_path(self.core_name, filepath)
+        self.__set_text__(txt)
+
+        tab_widget = self.__tab_widget__()
+        if tab_widget is not None:
+            tab_widget.tabBar().update()
+
+        if idx is not None:
+            idx += 1
+        return Path(filepath).name, idx, count
+
+    def __history_versions__(self):
+        """Returns the backup files of this workbox from oldest to newest.
+
+        This must be called from the gui thread, but the files can be read in
+        any thread, letting history be searched without loading the workbox.
+
+        Returns:
+            list: A `(time_str, backup_file, filepath)` tuple for each backup.
+                time_str is the time stamp of the backup file formatted for
+                display, backup_file is relative to the prefs directory and
+                filepath is the full path to the file.
+        """
+        ret = []
+        workbox_id = self.__workbox_id__()
+        if not workbox_id:
+            return ret
+        for filepath in get_file_group(self.core_name, workbox_id):
+            time_str = filepath.stem
+            match = DATETIME_PATTERN.search(time_str)
+            if match:
+                stamp = datetime.datetime.strptime(match.group(), DATETIME_FORMAT)
+                time_str = stamp.strftime("%Y-%m-%d %H:%M:%S")
+            backup_file = get_relative_path(self.core_name, filepath)
+            ret.append((time_str, backup_file, str(filepath)))
+        return ret
+
     @classmethod
-    def __open_file__(cls, filename, strict=True):
+    def __open_file__(cls, filename, strict=True, sample_size=None):
         """Open a file and try to detect the text encoding it was saved as.
 
+        Args:
+            filename (str): The file to open.
+            strict (bool, optional): Raise a UnicodeDecodeError if the file can't
+                be decoded with the detected encoding. Otherwise undecodable
+                bytes are ignored.
+            sample_size (int, optional): If the file isn't utf-8, detect its
+                encoding from this many bytes sampled by `encoding_sample`
+                instead of the whole file.
+
         Returns:
             encoding(str): The detected encoding, Defaults to "utf-8" if unable
                 to detect encoding.
@@ -1021,7 +1327,10 @@ class WorkboxMixin(object):
             pass
 
         # Otherwise, attempt to detect source encoding and convert to utf-8
-        encoding = charset_normalizer.detect(text_bytes)['encoding'] or 'utf-8'
+        sample = text_bytes
+        if sample_size:
+            sample = encoding_sample(text_bytes, sample_size)
+        encoding = charset_normalizer.detect(sample)['encoding'] or 'utf-8'
         try:
             text = text_bytes.decode(encoding)
         except UnicodeDecodeError as e:
@@ -1064,6 +1373,7 @@ class WorkboxMixin(object):
         filename = self.__filename__()
         if filename and Path(filename).is_file():
             self.__load__(filename)
+            self.__restore_view_state__()
             return
         else:
             core_name = self.window().name
@@ -1077,8 +1387,70 @@ class WorkboxMixin(object):
                 self.__set_last_saved_text__(self.__text__())
 
         self.__set_last_workbox_name__()
+        self.__restore_view_state__()
         self.__tab_widget__().tabBar().updateColorsAndToolTips()
 
+    def __restore_view_state__(self):
+        """Restore the view state saved by `__unload__` if any."""
+        if self._view_state is not None:
+            self.__set_view_state__(self._view_state)
+            self._view_state = None
+
+    def __unload__(self):
+        """Free the memory used by this workbox's text, undo history and styling.
+
+        The workbox is reloaded from disk by `__show__` the next time it's shown,
+        restoring its cursor, selection and scroll position. Unsaved changes are
+        saved to a new backup file first. Linked workboxes are only unloaded if
+        they don't have unsaved changes, as they are reloaded from the linked
+        file. Nothing is unloaded unless the text that would be reloaded matches
+        the current text.
+
+        Returns:
+            bool: If the workbox was unloaded.
+        """
+        if not self._is_loaded or self.__changed_by_instance__():
+            return False
+
+        if self.__filename__():
+            if self.__is_dirty__():
+                return False
+        else:
+            self.__save_prefs__(saveLinkedFile=False)
+
+        text = self.__text__()
+        view_state = self.__view_state__()
+
+        # Check the text __show__ will load before discarding anything
+        self._is_loaded = False
+        try:
+            snapshot = self.__text_snapshot__()
+        except (OSError, UnicodeDecodeError):
+            snapshot = None
+        if snapshot not in (text, self.__unix_end_lines__(text)):
+            self._is_loaded = True
+            return False
+
+        self.__set_text__("")
+        self.__set_last_saved_text__("")
+        self._is_loaded = False
+        self._view_state = view_state
+        return True
+
+    def __view_state__(self):
+        """Returns the cursor, selection and scroll position of the editor.
+
+        Returns:
+            dict: The `anchor` and `cursor` as `(line, index)` and the
+                horizontal and vertical `scroll` positions. This can be passed to
+                `__set_view_state__`.
+        """
+        raise NotImplementedError("Mixin method not overridden.")
+
+    def __set_view_state__(self, state):
+        """Restore the view state returned by `__view_state__`."""
+        raise NotImplementedError("Mixin method not overridden.")
+
     def process_shortcut(self, event, run=True):
         """Check for workbox shortcuts and optionally call them.
 
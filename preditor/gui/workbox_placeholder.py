@@ -0,0 +1,219 @@
+from __future__ import absolute_import
+
+from functools import partial, wraps
+
+from Qt.QtWidgets import QTabWidget, QWidget
+
+from .workbox_mixin import WorkboxMixin
+
+# Settings applied to every workbox, like by `LoggerWindow.setAutoCompleteEnabled`,
+# are stored and applied once the editor is created instead of creating it.
+DEFERRED_SETTERS = (
+    "__set_auto_complete_enabled__",
+    "__set_copy_indents_as_spaces__",
+    "__set_indentations_use_tabs__",
+    "__set_tab_width__",
+)
+
+
+def _state_method(name):
+    """Returns a method that calls the WorkboxMixin implementation of name on
+    the placeholder, or name on the editor once it has been created."""
+    method = getattr(WorkboxMixin, name)
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self._editor is not None:
+            return getattr(self._editor, name)(*args, **kwargs)
+        return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+class WorkboxPlaceholder(QWidget):
+    """Stands in for a workbox in its tab until the workbox is needed.
+
+    Creating an editor widget for every workbox when restoring prefs is slow
+    and uses a lot of memory even though their text is loaded lazily. This only
+    stores the information needed to create the editor and show its tab, like
+    the workbox id, linked file and backup file. The methods of `WorkboxMixin`
+    that only use that information are answered by the placeholder.
+
+    The editor is created and replaces this in its tab the first time it's
+    shown or any other workbox method is called. Those calls are then passed on
+    to the editor, so code holding a placeholder can use it like a workbox.
+
+    Args:
+        editor_cls (type): The WorkboxMixin subclass to create.
+        editor_kwargs (dict, optional): Extra keyword arguments passed to
+            editor_cls when it is created.
+        parent (GroupedTabWidget, optional): The tab widget this is added to.
+        core_name (str, optional): The current core_name.
+        workbox_id (str, optional): The workbox_id of the workbox.
+        filename (str, optional): The linked file of the workbox.
+        backup_file (str, optional): The backup file to load the workbox from.
+        tempfile (str, optional): The legacy tempfile of the workbox.
+    """
+
+    def __init__(
+        self,
+        editor_cls,
+        editor_kwargs=None,
+        parent=None,
+        core_name=None,
+        workbox_id=None,
+        filename=None,
+        backup_file=None,
+        tempfile=None,
+    ):
+        super(WorkboxPlaceholder, self).__init__(parent)
+        self._editor = None
+        self.editor_cls = editor_cls
+        self.editor_kwargs = editor_kwargs or {}
+        self.core_name = core_name
+        self._deferred_calls = {}
+
+        self._workbox_id = workbox_id
+        self._filename = filename
+        self._missing_linked_file = None
+        self._backup_file = backup_file
+        self._tempfile = tempfile
+        self._last_workbox_name = None
+        self._changed_by_instance = False
+        self._orphaned_by_instance = False
+        self._changed_saved = False
+        self._is_loaded = False
+        self._large_file = False
+        self._revision = 0
+
+        if not workbox_id:
+            self.__set_workbox_id__(self.__create_workbox_id__(core_name))
+
+    def __getattr__(self, name):
+        # Any other workbox method needs the editor. It's created when the
+        # method is called, not by checking if it exists with hasattr.
+        if name.startswith("__") and name.endswith("__"):
+            if hasattr(self.editor_cls, name):
+                if name in DEFERRED_SETTERS:
+                    return partial(self._call_deferred, name)
+                return partial(self._call_editor, name)
+        raise AttributeError(
+            "'{}' object has no attribute '{}'".format(type(self).__name__, name)
+        )
+
+    def _call_deferred(self, name, *args, **kwargs):
+        if self._editor is not None:
+            return getattr(self._editor, name)(*args, **kwargs)
+        self._deferred_calls[name] = (args, kwargs)
+
+    def _call_editor(self, name, *args, **kwargs):
+        return getattr(self.__editor__(), name)(*args, **kwargs)
+
+    def __editor__(self):
+        """Returns the editor for this workbox, creating it and replacing this
+        placeholder in its tab if needed.
+
+        Returns:
+            WorkboxMixin: The editor.
+        """
+        if self._editor is not None:
+            return self._editor
+
+        group = self.__tab_widget__()
+        editor = self.editor_cls(
+            parent=group,
+            core_name=self.core_name,
+            workbox_id=self._workbox_id,
+            filename=self._filename,
+            backup_file=self._backup_file,
+            tempfile=self._tempfile,
+            **self.editor_kwargs,
+        )
+        self._editor = editor
+
+        index = group.indexOf(self) if group is not None else -1
+        if index != -1:
+            tab_bar = group.tabBar()
+            current = group.currentIndex() == index
+            focus = self.hasFocus()
+            text = tab_bar.tabText(index)
+            color = tab_bar.tabTextColor(index)
+            tool_tip = tab_bar.tabToolTip(index)
+
+            # Don't show the other tabs while swapping the widgets
+            blocked = group.blockSignals(True)
+            try:
+                QTabWidget.removeTab(group, index)
+                group.insertTab(index, editor, text)
+                tab_bar.setTabTextColor(index, color)
+                tab_bar.setTabToolTip(index, tool_tip)
+                if current:
+                    group.setCurrentIndex(index)
+            finally:
+                group.blockSignals(blocked)
+            if focus:
+                editor.setFocus()
+
+        editor.__set_last_workbox_name__(self._last_workbox_name)
+        editor.__set_changed_by_instance__(self._changed_by_instance)
+        editor.__set_orphaned_by_instance__(self._orphaned_by_instance)
+        editor._changed_saved = self._changed_saved
+        for name, (args, kwargs) in self._deferred_calls.items():
+            getattr(editor, name)(*args, **kwargs)
+        self._deferred_calls = {}
+        window = editor.window()
+        if hasattr(window, "setWorkboxFontBasedOnConsole"):
+            window.setWorkboxFontBasedOnConsole(editor)
+
+        # The placeholder is deleted once nothing references it
+        self.setParent(None)
+        return editor
+
+    def __is_created__(self):
+        """Returns if the editor for this placeholder has been created."""
+        return self._editor is not None
+
+    def __is_text_dirty__(self):
+        if self._editor is not None:
+            return self._editor.__is_text_dirty__()
+        # The text isn't loaded yet so it can't have changed
+        return False
+
+    def __show__(self):
+        self.__editor__().__show__()
+
+    __open_file__ = WorkboxMixin.__open_file__
+    __create_workbox_id__ = WorkboxMixin.__create_workbox_id__
+
+    __backup_file__ = _state_method("__backup_file__")
+    __set_backup_file__ = _state_method("__set_backup_file__")
+    __changed_by_instance__ = _state_method("__changed_by_instance__")
+    __set_changed_by_instance__ = _state_method("__set_changed_by_instance__")
+    __close__ = _state_method("__close__")
+    __determine_been_changed_by_instance__ = _state_method(
+        "__determine_been_changed_by_instance__"
+    )
+    __filename__ = _state_method("__filename__")
+    __set_filename__ = _state_method("__set_filename__")
+    __set_file_monitoring_enabled__ = _state_method("__set_file_monitoring_enabled__")
+    __group_tab_index__ = _state_method("__group_tab_index__")
+    __history_versions__ = _state_method("__history_versions__")
+    __is_dirty__ = _state_method("__is_dirty__")
+    __is_missing_linked_file__ = _state_method("__is_missing_linked_file__")
+    __large_file__ = _state_method("__large_file__")
+    __refresh_missing_linked_file__ = _state_method("__refresh_missing_linked_file__")
+    __last_workbox_name__ = _state_method("__last_workbox_name__")
+    __set_last_workbox_name__ = _state_method("__set_last_workbox_name__")
+    __orphaned_by_instance__ = _state_method("__orphaned_by_instance__")
+    __set_orphaned_by_instance__ = _state_method("__set_orphaned_by_instance__")
+    __revision__ = _state_method("__revision__")
+    __save_prefs__ = _state_method("__save_prefs__")
+    __snapshot_backup_file__ = _state_method("__snapshot_backup_file__")
+    __snapshot_file__ = _state_method("__snapshot_file__")
+    __tab_widget__ = _state_method("__tab_widget__")
+    __tempfile__ = _state_method("__tempfile__")
+    __text_snapshot__ = _state_method("__text_snapshot__")
+    __unload__ = _state_method("__unload__")
+    __workbox_id__ = _state_method("__workbox_id__")
+    __set_workbox_id__ = _state_method("__set_workbox_id__")
+    __workbox_name__ = _state_method("__workbox_name__")
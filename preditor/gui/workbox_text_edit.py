@@ -88,10 +88,21 @@ class WorkboxTextEdit(WorkboxMixin, QTextEdit):
     def __set_margins_font__(self, font):
         pass
 
+    def __set_large_file__(self, state):
+        super(WorkboxTextEdit, self).__set_large_file__(state)
+        # Highlighting large files is slow
+        self.uiCodeHighlighter.setDocument(None if state else self.document())
+
     def __tab_width__(self):
         # TODO: Implement custom tab widths
         return 4
 
+    def __is_modified__(self):
+        return self.document().isModified()
+
+    def __set_savepoint__(self):
+        self.document().setModified(False)
+
     def __text__(self):
         """Returns the text in this widget
         Returns:
@@ -99,6 +110,56 @@ class WorkboxTextEdit(WorkboxMixin, QTextEdit):
         """
         return self.toPlainText()
 
+    def __replace_text__(self, edits):
+        text = self.__text__()
+
+        def position(index):
+            # Document positions count utf-16 code units not characters
+            return len(text[:index].encode("utf-16-le")) // 2
+
+        cursor = QTextCursor(self.document())
+        cursor.beginEditBlock()
+        # Replace from the end so the earlier positions don't change
+        for start, end, txt in sorted(edits, reverse=True):
+            cursor.setPosition(position(start))
+            cursor.setPosition(position(end), QTextCursor.MoveMode.KeepAnchor)
+            cursor.insertText(txt)
+        cursor.endEditBlock()
+
+    def __view_state__(self):
+        cursor = self.textCursor()
+
+        def line_index(position):
+            block = self.document().findBlock(position)
+            return block.blockNumber(), position - block.position()
+
+        return {
+            "anchor": line_index(cursor.anchor()),
+            "cursor": line_index(cursor.position()),
+            "scroll": (
+                self.horizontalScrollBar().value(),
+                self.verticalScrollBar().value(),
+            ),
+        }
+
+    def __set_view_state__(self, state):
+        document = self.document()
+
+        def position(line_index):
+            line, index = line_index
+            block = document.findBlockByNumber(line)
+            if not block.isValid():
+                block = document.lastBlock()
+            return block.position() + min(index, block.length() - 1)
+
+        cursor = QTextCursor(document)
+        cursor.setPosition(position(state["anchor"]))
+        cursor.setPosition(position(state["cursor"]), QTextCursor.MoveMode.KeepAnchor)
+        self.setTextCursor(cursor)
+        horizontal, vertical = state["scroll"]
+        self.horizontalScrollBar().setValue(horizontal)
+        self.verticalScrollBar().setValue(vertical)
+
     def __selected_text__(self, start_of_line=False, selectText=False):
         cursor = self.textCursor()
 
@@ -0,0 +1,99 @@
+from __future__ import absolute_import
+
+import time
+
+from Qt.QtCore import QObject, QTimer
+
+
+class WorkboxUnloader(QObject):
+    """Unloads workboxes that haven't been used recently to free memory.
+
+    Workboxes are loaded when they are first shown, after that their text, undo
+    history and styling stay in memory. This periodically checks the workboxes
+    of a GroupTabWidget and calls `__unload__` on the least recently used ones.
+    A workbox is used while it's visible or when its text changes.
+
+    Workboxes are unloaded when they have been idle for longer than `idle_time`
+    or, if more than `max_loaded` workboxes are loaded, the least recently used
+    workboxes are unloaded until `max_loaded` are left. Setting either to zero
+    disables it. See `WorkboxMixin.__unload__` for how unsaved changes are kept.
+
+    Args:
+        manager (GroupTabWidget): The widget whose workboxes are unloaded.
+        max_loaded (int, optional): The maximum number of loaded workboxes.
+        idle_time (float, optional): Seconds a workbox can be unused before it
+            is unloaded.
+        parent (QObject, optional): The parent of this object.
+    """
+
+    def __init__(self, manager, max_loaded=0, idle_time=0, parent=None):
+        super(WorkboxUnloader, self).__init__(parent)
+        self.manager = manager
+        self.max_loaded = max_loaded
+        self.idle_time = idle_time
+        # The time each loaded workbox was last used, and its revision then
+        self._last_used = {}
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(10000)
+        self.timer.timeout.connect(self.check)
+
+    def check(self, now=None):
+        """Update when each workbox was last used and unload any workboxes that
+        exceed the limits.
+
+        Args:
+            now (float, optional): The current `time.monotonic` time.
+
+        Returns:
+            list: The workboxes that were unloaded.
+        """
+        if now is None:
+            now = time.monotonic()
+
+        last_used = {}
+        for editor, _, _, _, _ in self.manager.all_widgets():
+            if not editor._is_loaded:
+                continue
+            revision = editor.__revision__()
+            used, last_revision = self._last_used.get(editor, (now, revision))
+            if editor.isVisible() or revision != last_revision:
+                used = now
+            last_used[editor] = (used, revision)
+        # Forget workboxes that were unloaded or closed
+        self._last_used = last_used
+
+        # Least recently used first
+        candidates = sorted(
+            (used, i, editor)
+            for i, (editor, (used, _)) in enumerate(last_used.items())
+            if not editor.isVisible()
+        )
+        excess = 0
+        if self.max_loaded:
+            excess = len(last_used) - self.max_loaded
+
+        unloaded = []
+        for used, _, editor in candidates:
+            idle = self.idle_time and now - used > self.idle_time
+            if len(unloaded) >= excess and not idle:
+                continue
+            if editor.__unload__():
+                unloaded.append(editor)
+                del self._last_used[editor]
+        return unloaded
+
+    def set_max_loaded(self, max_loaded):
+        self.max_loaded = max_loaded
+        self.update_timer()
+
+    def set_idle_time(self, idle_time):
+        self.idle_time = idle_time
+        self.update_timer()
+
+    def update_timer(self):
+        """Only run the timer if a limit is set."""
+        if self.max_loaded or self.idle_time:
+            self.timer.start()
+        else:
+            self.timer.stop()
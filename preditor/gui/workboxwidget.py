@@ -111,6 +111,7 @@ class WorkboxWidget(WorkboxMixin, DocumentEditor):
 
     def __set_filename__(self, filename):
         self.set_filename(filename)
+        self._missing_linked_file = None
 
     def __font__(self):
         if self.lexer():
@@ -137,6 +138,20 @@ class WorkboxWidget(WorkboxMixin, DocumentEditor):
     def __insert_text__(self, txt):
         self.insert(txt)
 
+    def __set_large_file__(self, state):
+        if state:
+            # Stop lexing, spell checking and smart highlighting this document
+            self._large_file_language = self.language()
+            self._large_file_engine = self.delayable_engine
+            super(WorkboxWidget, self).__set_large_file__(state)
+            self.setLanguage("")
+            self.delayable_engine.remove_document(self)
+            self.delayable_info.clear()
+        else:
+            super(WorkboxWidget, self).__set_large_file__(state)
+            self._large_file_engine.add_document(self)
+            self.setLanguage(self._large_file_language or self._defaultLanguage)
+
     def __load__(self, filename):
         if filename and Path(filename).is_file():
             # This is overriding WorkboxMixin.__load__, make sure to base class
@@ -181,6 +196,24 @@ class WorkboxWidget(WorkboxMixin, DocumentEditor):
     def __remove_selected_text__(self):
         self.removeSelectedText()
 
+    def __replace_text__(self, edits):
+        text = self.__text__()
+
+        def position(index):
+            # Scintilla positions are the byte offsets of the utf-8 text
+            return len(text[:index].encode("utf-8"))
+
+        self.beginUndoAction()
+        try:
+            # Replace from the end so the earlier positions don't change
+            for start, end, txt in sorted(edits, reverse=True):
+                self.SendScintilla(
+                    QsciScintilla.SCI_SETSEL, position(start), position(end)
+                )
+                self.replaceSelectedText(txt)
+        finally:
+            self.endUndoAction()
+
     def __selected_text__(self, start_of_line=False, selectText=False):
         line, s, end, e = self.getSelection()
 
@@ -211,6 +244,32 @@ class WorkboxWidget(WorkboxMixin, DocumentEditor):
     def __set_tab_width__(self, width):
         self.setTabWidth(width)
 
+    def __is_modified__(self):
+        return self.isModified()
+
+    def __set_savepoint__(self):
+        self.setModified(False)
+
+    def __view_state__(self):
+        anchor = self.SendScintilla(self.SCI_GETANCHOR)
+        cursor = self.SendScintilla(self.SCI_GETCURRENTPOS)
+        return {
+            "anchor": self.lineIndexFromPosition(anchor),
+            "cursor": self.lineIndexFromPosition(cursor),
+            "scroll": (
+                self.SendScintilla(self.SCI_GETXOFFSET),
+                self.firstVisibleLine(),
+            ),
+        }
+
+    def __set_view_state__(self, state):
+        anchor = self.positionFromLineIndex(*state["anchor"])
+        cursor = self.positionFromLineIndex(*state["cursor"])
+        self.SendScintilla(self.SCI_SETSEL, anchor, cursor)
+        horizontal, vertical = state["scroll"]
+        self.setFirstVisibleLine(vertical)
+        self.SendScintilla(self.SCI_SETXOFFSET, horizontal)
+
     def __text__(self):
         """Returns the text in this widget
         Returns:
@@ -298,6 +357,13 @@ class WorkboxWidget(WorkboxMixin, DocumentEditor):
     def setSearchText(self, txt):
         self._searchText = txt
 
+    def setLanguage(self, language):
+        # The language of large files is applied once large-file mode is disabled
+        if self.__large_file__() and language:
+            self._large_file_language = language
+            language = ""
+        super(WorkboxWidget, self).setLanguage(language)
+
     def showMenu(self, pos):
         menu = super(WorkboxWidget, self).showMenu(pos, popup=False)
         menu.addSeparator()
@@ -287,6 +287,41 @@ def get_backup_version_info(core_name, workbox_id, versionType, backup_file=None
     return filepath, display_idx, count
 
 
+def get_latest_backup_infos(core_name):
+    """Find the latest backup file of every workbox in the given core_name with a
+    single scan of the workboxes directory. This is the same as calling
+    `get_backup_version_info` with `VersionTypes.Last` for every workbox, without
+    scanning the directory of each workbox separately.
+
+    Args:
+        core_name (str): The current core_name
+
+    Returns:
+        infos (dict): Maps each workbox_id with backup files to the filepath,
+            display_idx, count tuple `get_backup_version_info` returns for it.
+    """
+    directory = get_prefs_dir(core_name=core_name, sub_dir='workboxes')
+    infos = {}
+    try:
+        workbox_dirs = list(os.scandir(directory))
+    except OSError:
+        return infos
+
+    for workbox_dir in workbox_dirs:
+        if not workbox_dir.is_dir():
+            continue
+        try:
+            names = os.listdir(workbox_dir.path)
+        except OSError:
+            continue
+        if not names:
+            continue
+        count = len(names)
+        filepath = str(Path(workbox_dir.path) / max(names))
+        infos[workbox_dir.name] = (filepath, count, count)
+    return infos
+
+
 def get_prefs_updates():
     """Get any defined updates to prefs args / values
 
@@ -0,0 +1,93 @@
+from __future__ import absolute_import
+
+import asyncio
+
+
+class AsyncRunner(object):
+    """Runs coroutines created by code using top-level `await` to completion.
+
+    PrEditor executes code on the Qt gui thread. When that code uses `await`
+    outside of a async function, running it returns a coroutine that needs a
+    event loop to drive it. This class owns that event loop and runs it on the
+    calling thread so awaited code can still safely interact with Qt widgets.
+
+    While the loop is waiting on the coroutine, `process_events` is called every
+    `interval` seconds so the application stays responsive. The loop is kept
+    between calls so any tasks created but not awaited by previous code are
+    resumed the next time a coroutine is run.
+
+    Args:
+        process_events (callable, optional): Called periodically while the event
+            loop is waiting for the coroutine to finish. This is normally
+            `QApplication.processEvents`.
+        interval (float, optional): The number of seconds between calls to
+            process_events.
+    """
+
+    def __init__(self, process_events=None, interval=0.01):
+        self.process_events = process_events
+        self.interval = interval
+        self._loop = None
+        self._pump_handle = None
+
+    def close(self):
+        """Cancel any pending tasks and close the event loop if it was created."""
+        if self._loop is None or self._loop.is_closed():
+            return
+        pending = asyncio.all_tasks(self._loop)
+        for task in pending:
+            task.cancel()
+        if pending:
+            self._loop.run_until_complete(
+                asyncio.gather(*pending, return_exceptions=True)
+            )
+        self._loop.close()
+        self._loop = None
+
+    def is_running(self):
+        """Returns True while a coroutine is being run by this instance."""
+        return self._loop is not None and self._loop.is_running()
+
+    @property
+    def loop(self):
+        """The asyncio event loop used to run coroutines, created on first use."""
+        if self._loop is None or self._loop.is_closed():
+            self._loop = asyncio.new_event_loop()
+        return self._loop
+
+    def _pump(self):
+        """Process the host application's events and re-schedule this call."""
+        if self.process_events is not None:
+            self.process_events()
+        self._pump_handle = self.loop.call_later(self.interval, self._pump)
+
+    def run(self, coroutine):
+        """Run coroutine to completion and return its result.
+
+        Args:
+            coroutine: The coroutine to run. Normally this is the return of calling
+                `eval` on code compiled with `ast.PyCF_ALLOW_TOP_LEVEL_AWAIT`.
+
+        Raises:
+            RuntimeError: If this is called while a previous coroutine is still
+                being awaited or another asyncio event loop is already running on
+                this thread. The coroutine is closed without being run.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            coroutine.close()
+            raise RuntimeError(
+                "Unable to run a top-level await while an asyncio event loop "
+                "is already running."
+            )
+
+        loop = self.loop
+        self._pump_handle = loop.call_soon(self._pump)
+        try:
+            return loop.run_until_complete(coroutine)
+        finally:
+            self._pump_handle.cancel()
+            self._pump_handle = None
@@ -0,0 +1,183 @@
+from __future__ import absolute_import
+
+import heapq
+
+# Characters that start a new word for the following character.
+WORD_SEPARATORS = frozenset(' _-./\\:()[]{}<>,')
+
+
+class FuzzyMatcher(object):
+    """Scores and ranks strings against a fuzzy search pattern.
+
+    Every character of the pattern must be found in the candidate in order, but
+    other characters may be intermixed. Candidates are scored so the best matches
+    can be shown first. The score rewards:
+
+    - Candidates that start with the pattern.
+    - Matching the first character of a word, ie the start of the string or the
+      character after a separator like `_`, `.` or space.
+    - Matching a camelCase hump, ie a uppercase character after a lowercase one.
+    - Matching consecutive characters.
+
+    and penalizes gaps of characters skipped between matches.
+
+    This is pure python so it can be used by anything that needs to fuzzy search
+    a list of strings, like the completer or the workbox name search.
+
+    Args:
+        pattern (str): The text the user typed to search for.
+        case_sensitive (bool, optional): If False, case is ignored when matching
+            characters. Case is still used to detect camelCase humps.
+    """
+
+    bonus_boundary = 8
+    bonus_camel = 7
+    bonus_consecutive = 8
+    bonus_first_char = 10
+    bonus_match = 16
+    bonus_prefix = 30
+    penalty_gap_start = 3
+    penalty_gap = 1
+    penalty_leading = 1
+    max_leading_penalty = 6
+
+    def __init__(self, pattern, case_sensitive=False):
+        self.pattern = pattern
+        self.case_sensitive = case_sensitive
+        self._pattern = pattern if case_sensitive else pattern.lower()
+
+    def __repr__(self):
+        return '{}({!r}, case_sensitive={})'.format(
+            type(self).__name__, self.pattern, self.case_sensitive
+        )
+
+    def _char_bonus(self, candidate, index):
+        """Returns the bonus for matching the character at index of candidate."""
+        if index == 0:
+            return self.bonus_first_char
+        prev = candidate[index - 1]
+        char = candidate[index]
+        if prev in WORD_SEPARATORS:
+            return self.bonus_boundary
+        if prev.islower() and char.isupper():
+            return self.bonus_camel
+        if not prev.isdigit() and char.isdigit():
+            return self.bonus_camel
+        return 0
+
+    def matches(self, candidate):
+        """Returns True if all characters of the pattern are in candidate in order.
+
+        This is a fast check that doesn't calculate a score.
+        """
+        if not self.case_sensitive:
+            candidate = candidate.lower()
+        pos = 0
+        for char in self._pattern:
+            pos = candidate.find(char, pos) + 1
+            if not pos:
+                return False
+        return True
+
+    def score(self, candidate):
+        """Returns the score of the best match of the pattern in candidate.
+
+        Returns:
+            int or None: A higher score is a better match. None is returned if
+                candidate doesn't match the pattern. A empty pattern matches
+                everything with a score of zero.
+        """
+        pattern = self._pattern
+        if not pattern:
+            return 0
+        if not self.matches(candidate):
+            return None
+
+        folded = candidate if self.case_sensitive else candidate.lower()
+        count = len(candidate)
+        bonuses = [self._char_bonus(candidate, i) for i in range(count)]
+
+        # previous[j] is the best score for matching the pattern up to the
+        # previous character with that character matched at index j of candidate.
+        previous = None
+        for p_index, char in enumerate(pattern):
+            current = [None] * count
+            # The best value of `previous[k] + penalty_gap * k` for k < j - 1,
+            # this lets the gap penalty for matching at j after matching at k,
+            # `penalty_gap_start + penalty_gap * (j - k - 2)`, be calculated
+            # without a nested loop.
+            best_gap = None
+            for j in range(count):
+                if p_index and j > 1 and previous[j - 2] is not None:
+                    value = previous[j - 2] + self.penalty_gap * (j - 2)
+                    if best_gap is None or value > best_gap:
+                        best_gap = value
+
+                if folded[j] != char:
+                    continue
+
+                bonus = self.bonus_match + bonuses[j]
+                if not p_index:
+                    leading = min(self.penalty_leading * j, self.max_leading_penalty)
+                    current[j] = bonus - leading
+                    continue
+
+                best = None
+                if best_gap is not None:
+                    best = (
+                        best_gap - self.penalty_gap * (j - 2) - self.penalty_gap_start
+                    )
+                if j and previous[j - 1] is not None:
+                    consecutive = previous[j - 1] + self.bonus_consecutive
+                    if best is None or consecutive > best:
+                        best = consecutive
+                if best is not None:
+                    current[j] = best + bonus
+            previous = current
+
+        scores = [value for value in previous if value is not None]
+        if not scores:
+            return None
+        ret = max(scores)
+        if folded.startswith(pattern):
+            ret += self.bonus_prefix
+        return ret
+
+    def rank(self, candidates, limit=None, key=None):
+        """Returns the candidates that match the pattern, best matches first.
+
+        Candidates with the same score are sorted by length then alphabetically.
+
+        Args:
+            candidates (iterable): The items to search.
+            limit (int, optional): If specified, only this many of the best
+                matches are returned.
+            key (callable, optional): Called on each candidate to get the string
+                that is scored. Use this when candidates are not strings.
+
+        Returns:
+            list: Tuples of the score and candidate.
+        """
+        results = []
+        for index, candidate in enumerate(candidates):
+            text = key(candidate) if key else candidate
+            score = self.score(text)
+            if score is not None:
+                # index ensures candidates themselves are never compared
+                results.append(((-score, len(text), text, index), candidate))
+
+        if limit is not None and limit < len(results):
+            results = heapq.nsmallest(limit, results, key=lambda r: r[0])
+        else:
+            results.sort(key=lambda r: r[0])
+        return [(-order[0], candidate) for order, candidate in results]
+
+
+def rank(pattern, candidates, limit=None, case_sensitive=False, key=None):
+    """Returns the candidates matching pattern ranked best match first.
+
+    This is a shortcut for `FuzzyMatcher(pattern, case_sensitive).rank(...)`
+    that only returns the candidates, not their scores.
+    """
+    matcher = FuzzyMatcher(pattern, case_sensitive=case_sensitive)
+    return [item for _, item in matcher.rank(candidates, limit=limit, key=key)]
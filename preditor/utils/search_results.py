@@ -0,0 +1,137 @@
+"""A structured model of the results of searching text with `TextSearch`.
+
+`TextSearch.search_results` returns a `SearchResult` for each workbox with
+matches. It records the lines that would be shown when rendering the results,
+the match spans on each line and enough information to link back to the
+workbox. `TextSearch.render` turns a result into the text shown in the console,
+the functions in this module export results for other tools.
+"""
+from __future__ import absolute_import
+
+import json
+from collections import namedtuple
+
+SearchLine = namedtuple("SearchLine", "line_num text spans")
+"""A line of text included in a `SearchResult`.
+
+`line_num` is the one based line number and `text` the line including its line
+ending. `spans` is a tuple of the `(start, end)` indexes of each match in text,
+it is empty for context lines.
+"""
+
+SearchMatch = namedtuple(
+    "SearchMatch",
+    "workbox_id workbox_name path backup_file line_num column end text line "
+    "before after",
+)
+"""A single match yielded by `SearchResult.matches`.
+
+`column` and `end` are the zero based indexes of the match in `line`, `text` is
+the matching text. `before` and `after` are the context lines shown before and
+after the line of the match. Lines don't include line endings.
+"""
+
+
+class SearchResult(object):
+    """The matches found in the text of a single workbox.
+
+    Args:
+        path (str): The group and tab name of the workbox separated by a `/`.
+        workbox_name (str): From editor.__workbox_name__(), used by links to
+            find the workbox.
+        workbox_id (str, optional): From editor.__workbox_id__().
+        line_count (int, optional): The number of lines in the searched text.
+        context (int, optional): The number of context lines included before
+            and after each line with a match.
+        backup_file (str, optional): If the text was read from a specific
+            backup file of the workbox, the backup file relative to the prefs
+            directory.
+    """
+
+    def __init__(
+        self,
+        path,
+        workbox_name,
+        workbox_id=None,
+        line_count=0,
+        context=0,
+        backup_file=None,
+    ):
+        self.path = path
+        self.workbox_name = workbox_name
+        self.workbox_id = workbox_id
+        self.line_count = line_count
+        self.context = context
+        self.backup_file = backup_file
+        # The SearchLines to show, in order
+        self.lines = []
+
+    def __bool__(self):
+        return bool(self.lines)
+
+    def __repr__(self):
+        return "{}({!r}, matches={})".format(
+            type(self).__name__, self.path, self.match_count
+        )
+
+    @property
+    def match_count(self):
+        """The number of matches in this result."""
+        return sum(len(line.spans) for line in self.lines)
+
+    def matches(self):
+        """Yields a `SearchMatch` for each match in this result."""
+        text = {line.line_num: line.text.rstrip("\r\n") for line in self.lines}
+        for line in self.lines:
+            if not line.spans:
+                continue
+            before = tuple(
+                text[i]
+                for i in range(line.line_num - self.context, line.line_num)
+                if i in text
+            )
+            after = tuple(
+                text[i]
+                for i in range(line.line_num + 1, line.line_num + 1 + self.context)
+                if i in text
+            )
+            for start, end in line.spans:
+                yield SearchMatch(
+                    self.workbox_id,
+                    self.workbox_name,
+                    self.path,
+                    self.backup_file,
+                    line.line_num,
+                    start,
+                    end,
+                    line.text[start:end],
+                    text[line.line_num],
+                    before,
+                    after,
+                )
+
+
+def to_grep(results):
+    """Returns results formatted like the output of `grep -n --column`.
+
+    Each match is a line of `path:line:column:text` using one based line and
+    column numbers. Lines with multiple matches are repeated for each match.
+    """
+    lines = []
+    for result in results:
+        for match in result.matches():
+            lines.append(
+                "{}:{}:{}:{}".format(
+                    match.path, match.line_num, match.column + 1, match.line
+                )
+            )
+    return "".join(line + "\n" for line in lines)
+
+
+def to_json(results, indent=2):
+    """Returns results as a json string containing a list of matches.
+
+    Each match is stored as an object with the fields of `SearchMatch`.
+    """
+    data = [match._asdict() for result in results for match in result.matches()]
+    return json.dumps(data, indent=indent)
@@ -0,0 +1,293 @@
+"""Resolve python names to objects without evaluating any code.
+
+This is used by the completer's static mode so showing completions never runs
+properties, descriptors or `__getattr__` hooks of the objects being inspected.
+"""
+from __future__ import absolute_import
+
+import ast
+import builtins
+import inspect
+import sys
+import types
+
+
+def is_symbol(text):
+    """Returns True if text is a dotted name like `os.path.join`."""
+    return bool(text) and all(part.isidentifier() for part in text.split('.'))
+
+
+def static_attribute(obj, name):
+    """Returns the attribute name of obj using `inspect.getattr_static`.
+
+    Returns None if the attribute doesn't exist or can only be resolved by
+    running code, like the value of a property or other descriptor.
+    """
+    try:
+        value = inspect.getattr_static(obj, name)
+    except AttributeError:
+        return None
+
+    if isinstance(value, (staticmethod, classmethod)):
+        return value.__func__
+    if isinstance(
+        value,
+        (
+            types.FunctionType,
+            types.BuiltinFunctionType,
+            types.ModuleType,
+            type,
+        ),
+    ):
+        return value
+    # Descriptors need to be called to get the actual value. Functions and
+    # classes are excluded above as they are safe to return.
+    if hasattr(type(value), '__get__'):
+        # Method descriptors of builtin types are safe to show completions for.
+        if isinstance(
+            value,
+            (
+                types.MethodDescriptorType,
+                types.ClassMethodDescriptorType,
+                types.WrapperDescriptorType,
+            ),
+        ):
+            return value
+        return None
+    return value
+
+
+def static_dict(obj):
+    """Returns the `__dict__` of obj or a empty dict, the same way
+    `inspect.getattr_static` finds it."""
+    try:
+        ret = object.__getattribute__(obj, '__dict__')
+    except AttributeError:
+        return {}
+    return ret if isinstance(ret, (dict, types.MappingProxyType)) else {}
+
+
+def static_dir(obj):
+    """Returns the sorted attribute names of obj without running any code.
+
+    Unlike `dir` this doesn't call `__dir__` or a `__class__` property. The
+    names are collected from the `__dict__` of obj and the classes in its mro,
+    or the mro of obj itself if it is a class. Like `dir`, only the `__dict__`
+    of modules is used.
+    """
+    names = set(static_dict(obj))
+    if isinstance(obj, types.ModuleType):
+        mro = ()
+    elif isinstance(obj, type):
+        mro = type.__dict__['__mro__'].__get__(obj)
+    else:
+        mro = type.__dict__['__mro__'].__get__(type(obj))
+    for cls in mro:
+        names.update(type.__dict__['__dict__'].__get__(cls))
+    return sorted(name for name in names if isinstance(name, str))
+
+
+class AssignmentFinder(ast.NodeVisitor):
+    """Finds the last top level assignment, import or definition of a name.
+
+    Args:
+        name (str): The name to find.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.node = None
+
+    def _check_target(self, target, value):
+        if isinstance(target, ast.Name) and target.id == self.name:
+            self.node = value
+
+    def visit_Assign(self, node):  # noqa: N802
+        for target in node.targets:
+            self._check_target(target, node.value)
+
+    def visit_AnnAssign(self, node):  # noqa: N802
+        if node.value is not None:
+            self._check_target(node.target, node.value)
+
+    def visit_Import(self, node):  # noqa: N802
+        for alias in node.names:
+            if (alias.asname or alias.name.split('.')[0]) == self.name:
+                self.node = alias
+
+    def visit_ImportFrom(self, node):  # noqa: N802
+        for alias in node.names:
+            if (alias.asname or alias.name) == self.name:
+                self.node = node
+
+    def visit_ClassDef(self, node):  # noqa: N802
+        # Don't look inside the body of classes, only top level names are used.
+        if node.name == self.name:
+            self.node = node
+
+    def visit_FunctionDef(self, node):  # noqa: N802
+        if node.name == self.name:
+            self.node = node
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+
+class StaticResolver(object):
+    """Resolves dotted names to objects by walking dictionaries.
+
+    Names are first looked up in scope, then builtins and finally imported
+    modules in `sys.modules`. Attributes are looked up using
+    `inspect.getattr_static`. If the first name is not found, the last top
+    level assignment to it in source is used to infer its value.
+
+    The parsed source and the assignments found in it are cached, so the same
+    resolver can be re-used while source doesn't change. `scope` may be
+    replaced between calls to `resolve`.
+
+    Args:
+        scope (dict): The namespace names are looked up in, normally
+            `__main__.__dict__`.
+        source (str, optional): Python code, normally the text of the current
+            workbox, used to infer the value of names not defined in scope.
+    """
+
+    def __init__(self, scope, source=None):
+        self.scope = scope if scope is not None else {}
+        self.source = source
+        self._tree = None
+        # The node found by `AssignmentFinder` for each name
+        self._assignments = {}
+        # Names currently being inferred, prevents infinite recursion for code
+        # like `a = b; b = a`.
+        self._inferring = set()
+
+    def infer_node(self, node):
+        """Returns the value a ast node would create without evaluating it.
+
+        Only nodes that can be inferred without side effects are supported,
+        anything else returns None.
+        """
+        if isinstance(node, ast.alias):
+            # `import a.b` binds `a`, `import a.b as c` binds `a.b`.
+            name = node.name if node.asname else node.name.split('.')[0]
+            return sys.modules.get(name)
+        if isinstance(node, ast.Name):
+            return self.resolve(node.id)
+        if isinstance(node, ast.Attribute):
+            symbol = self._dotted_name(node)
+            return self.resolve(symbol) if symbol else None
+        if isinstance(node, ast.Call):
+            # A call to a class is assumed to return a instance of that class.
+            # The class itself is returned as it shows the same completions
+            # without needing to run its __init__.
+            cls = self.infer_node(node.func)
+            if isinstance(cls, type):
+                return cls
+            return None
+        if isinstance(
+            node, (ast.List, ast.ListComp, ast.Dict, ast.DictComp, ast.Set, ast.SetComp)
+        ):
+            kind = {
+                ast.List: list,
+                ast.ListComp: list,
+                ast.Dict: dict,
+                ast.DictComp: dict,
+                ast.Set: set,
+                ast.SetComp: set,
+            }
+            return kind[type(node)]()
+        if isinstance(node, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+            return None
+        try:
+            return ast.literal_eval(node)
+        except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+            return None
+
+    @classmethod
+    def _dotted_name(cls, node):
+        parts = []
+        while isinstance(node, ast.Attribute):
+            parts.append(node.attr)
+            node = node.value
+        if not isinstance(node, ast.Name):
+            return None
+        parts.append(node.id)
+        return '.'.join(reversed(parts))
+
+    def infer_name(self, name):
+        """Returns the value of name inferred from the assignments in source."""
+        if not self.source or name in self._inferring:
+            return None
+        if self._tree is None:
+            try:
+                self._tree = ast.parse(self.source)
+            except (SyntaxError, ValueError):
+                # Invalid code, don't try to parse it again
+                self.source = None
+                return None
+
+        if name not in self._assignments:
+            finder = AssignmentFinder(name)
+            # Only check top level statements, names assigned inside functions
+            # are not in the global scope.
+            for statement in self._tree.body:
+                finder.visit(statement)
+            self._assignments[name] = finder.node
+        node = self._assignments[name]
+        if node is None:
+            return None
+        if isinstance(node, ast.ImportFrom):
+            module = sys.modules.get(node.module or '')
+            if module is None or node.level:
+                return None
+            for alias in node.names:
+                if (alias.asname or alias.name) == name:
+                    qualified = '{}.{}'.format(node.module, alias.name)
+                    if qualified in sys.modules:
+                        return sys.modules[qualified]
+                    return static_attribute(module, alias.name)
+            return None
+
+        self._inferring.add(name)
+        try:
+            return self.infer_node(node)
+        finally:
+            self._inferring.discard(name)
+
+    def _resolve_root(self, name):
+        if name in self.scope:
+            return self.scope[name], True
+        builtin = vars(builtins)
+        if name in builtin:
+            return builtin[name], True
+        if name in sys.modules:
+            return sys.modules[name], True
+        value = self.infer_name(name)
+        return value, value is not None
+
+    def resolve(self, symbol):
+        """Returns the object for a dotted name like `os.path` or None.
+
+        None is returned if the symbol is not a dotted name, it is not defined,
+        or it can only be resolved by running code.
+        """
+        if not is_symbol(symbol):
+            return None
+        # An imported module may not have been added to the parent module yet.
+        if symbol in sys.modules and symbol not in self.scope:
+            return sys.modules[symbol]
+
+        parts = symbol.split('.')
+        obj, found = self._resolve_root(parts[0])
+        if not found:
+            return None
+        for part in parts[1:]:
+            obj = static_attribute(obj, part)
+            if obj is None:
+                return None
+        return obj
+
+
+def resolve_static(symbol, scope, source=None):
+    """Resolve symbol without evaluating code. See `StaticResolver`."""
+    return StaticResolver(scope, source=source).resolve(symbol)
@@ -0,0 +1,154 @@
+"""Finds the classes, functions and top level assignments defined in python code.
+
+The symbols are used to navigate large workboxes. The code is parsed with `ast`
+when possible. Workboxes are often in the middle of being edited and may not
+parse, so `scan_symbols` finds the symbols by looking at the start of each line
+instead. It doesn't understand the code, but is good enough to keep navigation
+working until the code parses again.
+"""
+from __future__ import absolute_import
+
+import ast
+import re
+from collections import namedtuple
+
+_DEF_RE = re.compile(
+    r"^(?P<indent>[ \t]*)(?:async[ \t]+)?(?P<kind>def|class)[ \t]+(?P<name>\w+)"
+)
+_ASSIGN_RE = re.compile(
+    r"^(?P<names>[A-Za-z_]\w*(?:[ \t]*,[ \t]*[A-Za-z_]\w*)*)[ \t]*(?::[^=]*)?=(?!=)"
+)
+_TRIPLE_QUOTE_RE = re.compile(r"\"\"\"|'''")
+
+
+class Symbol(namedtuple("Symbol", "name kind line scope")):
+    """A symbol defined in python code.
+
+    Attributes:
+        name (str): The name of the symbol.
+        kind (str): One of "class", "function", "method" or "variable".
+        line (int): The line number the symbol is defined on, starting at 1.
+        scope (tuple): The names of the classes and functions the symbol is
+            defined in, outermost first.
+    """
+
+    __slots__ = ()
+
+    @property
+    def qualname(self):
+        """The dotted name of the symbol including its scope."""
+        return ".".join(self.scope + (self.name,))
+
+
+def _def_kind(kind, scope_kinds):
+    if kind == "class":
+        return "class"
+    if scope_kinds and scope_kinds[-1] == "class":
+        return "method"
+    return "function"
+
+
+def _visit(body, scope, scope_kinds, symbols):
+    for node in body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            kind = "class" if isinstance(node, ast.ClassDef) else "def"
+            kind = _def_kind(kind, scope_kinds)
+            symbols.append(Symbol(node.name, kind, node.lineno, scope))
+            _visit(
+                node.body,
+                scope + (node.name,),
+                scope_kinds + ("class" if kind == "class" else "function",),
+                symbols,
+            )
+            continue
+
+        if not scope and isinstance(node, (ast.Assign, ast.AnnAssign)):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            for target in targets:
+                elts = target.elts if isinstance(target, ast.Tuple) else [target]
+                for elt in elts:
+                    if isinstance(elt, ast.Name):
+                        symbols.append(Symbol(elt.id, "variable", node.lineno, ()))
+
+        # Symbols defined inside if, try, with and loop blocks belong to the
+        # enclosing scope.
+        for field in ("body", "orelse", "finalbody"):
+            child = getattr(node, field, None)
+            if isinstance(child, list):
+                _visit(child, scope, scope_kinds, symbols)
+        for handler in getattr(node, "handlers", []):
+            _visit(handler.body, scope, scope_kinds, symbols)
+
+
+def parse_symbols(text):
+    """Returns the symbols defined in text, sorted by line.
+
+    If text can't be parsed by `ast`, `scan_symbols` is used instead.
+
+    Args:
+        text (str): The python code to find the symbols of.
+
+    Returns:
+        list: A `Symbol` for each class, function and top level assignment.
+    """
+    try:
+        tree = ast.parse(text)
+    except (SyntaxError, ValueError, RecursionError):
+        return scan_symbols(text)
+
+    symbols = []
+    _visit(tree.body, (), (), symbols)
+    return sorted(symbols, key=lambda symbol: symbol.line)
+
+
+def scan_symbols(text):
+    """Returns the symbols defined in text by scanning the start of each line.
+
+    This works on code that doesn't parse. Lines starting with `def` or `class`
+    are symbols, their scope is found from their indentation. Unindented lines
+    assigning a name are top level assignments. Lines inside triple quoted
+    strings are skipped.
+
+    Args:
+        text (str): The python code to find the symbols of.
+
+    Returns:
+        list: A `Symbol` for each class, function and top level assignment.
+    """
+    symbols = []
+    # The indentation, name and kind of the classes and functions that
+    # contain the current line.
+    stack = []
+    in_string = False
+    for line_num, line in enumerate(text.splitlines(), start=1):
+        was_in_string = in_string
+        if len(_TRIPLE_QUOTE_RE.findall(line)) % 2:
+            in_string = not in_string
+        if was_in_string or not line.strip() or line.lstrip().startswith("#"):
+            continue
+
+        indent = len(line) - len(line.lstrip())
+        while stack and stack[-1][0] >= indent:
+            stack.pop()
+
+        match = _DEF_RE.match(line)
+        if match:
+            scope = tuple(name for _, name, _ in stack)
+            scope_kinds = tuple(kind for _, _, kind in stack)
+            kind = _def_kind(match.group("kind"), scope_kinds)
+            symbols.append(Symbol(match.group("name"), kind, line_num, scope))
+            stack.append(
+                (
+                    indent,
+                    match.group("name"),
+                    "class" if kind == "class" else "function",
+                )
+            )
+            continue
+
+        if indent == 0:
+            match = _ASSIGN_RE.match(line)
+            if match:
+                for name in match.group("names").split(","):
+                    symbols.append(Symbol(name.strip(), "variable", line_num, ()))
+    return symbols
@@ -0,0 +1,180 @@
+"""Compares two versions of a workbox's text.
+
+The diff is computed with `difflib` line by line, keeping line endings so
+reverting a change restores the old text exactly. `compute_diff` is safe to
+call outside of the gui thread, its result is laid out for the unified and
+side-by-side views by `unified_rows` and `side_by_side_rows`.
+"""
+from __future__ import absolute_import
+
+import difflib
+from collections import namedtuple
+
+DIFF_MAX_LINES = 10000
+"""Texts with more lines than this combined are not compared. `difflib` gets
+quadratically slower as the number of changed lines grows."""
+
+
+class Hunk(namedtuple("Hunk", "tag old_start old_end new_start new_end")):
+    """A change between the old and new text.
+
+    Attributes:
+        tag (str): One of "replace", "delete" or "insert".
+        old_start (int): The index of the first line of the old text changed.
+        old_end (int): The index after the last line of the old text changed.
+        new_start (int): The index of the first line of the new text changed.
+        new_end (int): The index after the last line of the new text changed.
+    """
+
+    __slots__ = ()
+
+
+class DiffResult(object):
+    """The lines of the compared texts and the changes between them.
+
+    Args:
+        old_lines (list): The lines of the old text, including line endings.
+        new_lines (list): The lines of the new text, including line endings.
+        hunks (list, optional): The `Hunk`s changing old_lines into new_lines.
+            None if the texts were too large to compare.
+    """
+
+    def __init__(self, old_lines, new_lines, hunks=None):
+        self.old_lines = old_lines
+        self.new_lines = new_lines
+        self.hunks = hunks
+
+    @property
+    def too_large(self):
+        """If the texts were not compared because of `DIFF_MAX_LINES`."""
+        return self.hunks is None
+
+
+Row = namedtuple("Row", "kind old_line new_line hunk")
+"""A line shown by the diff views.
+
+`kind` is "equal", "delete", "insert" or "replace", or "gap" for skipped
+unchanged lines in the unified view. `old_line` and `new_line` are the indexes
+of the line shown from each text, None if the row doesn't show a line of that
+text. `hunk` is the index of the `Hunk` the row is part of or None.
+"""
+
+
+def compute_diff(old_text, new_text, max_lines=DIFF_MAX_LINES):
+    """Compare old_text to new_text.
+
+    Args:
+        old_text (str): The text to compare against, like a backup.
+        new_text (str): The current text.
+        max_lines (int, optional): Don't compare texts with more lines than
+            this combined. Zero compares texts of any size.
+
+    Returns:
+        DiffResult: The changes between the texts.
+    """
+    old_lines = old_text.splitlines(True)
+    new_lines = new_text.splitlines(True)
+    if max_lines and len(old_lines) + len(new_lines) > max_lines:
+        return DiffResult(old_lines, new_lines)
+
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    hunks = [Hunk(*opcode) for opcode in matcher.get_opcodes() if opcode[0] != "equal"]
+    return DiffResult(old_lines, new_lines, hunks)
+
+
+def revert_edit(result, index):
+    """Returns the edit reverting a hunk of the new text to the old text.
+
+    Args:
+        result (DiffResult): The diff containing the hunk.
+        index (int): The index of the hunk in `result.hunks`.
+
+    Returns:
+        tuple: `(start, end, text)` replacing the characters between start
+            and end of the new text with text. This can be passed to
+            `WorkboxMixin.__replace_text__`.
+    """
+    hunk = result.hunks[index]
+    start = sum(len(line) for line in result.new_lines[: hunk.new_start])
+    end = start + sum(
+        len(line) for line in result.new_lines[hunk.new_start : hunk.new_end]
+    )
+    text = "".join(result.old_lines[hunk.old_start : hunk.old_end])
+    return start, end, text
+
+
+def _rows(result, hunk_rows):
+    """Returns the rows of result, using hunk_rows to lay out each hunk and
+    showing the unchanged lines between them on the same row."""
+    rows = []
+    old_line = new_line = 0
+    for index, hunk in enumerate(result.hunks or []):
+        while old_line < hunk.old_start:
+            rows.append(Row("equal", old_line, new_line, None))
+            old_line += 1
+            new_line += 1
+        rows.extend(hunk_rows(index, hunk))
+        old_line, new_line = hunk.old_end, hunk.new_end
+
+    while old_line < len(result.old_lines):
+        rows.append(Row("equal", old_line, new_line, None))
+        old_line += 1
+        new_line += 1
+    return rows
+
+
+def side_by_side_rows(result):
+    """Lay out the lines of result to show the texts next to each other.
+
+    Every line of both texts is shown. Changed lines are shown on the same rows,
+    with empty rows added to the shorter side of a hunk.
+
+    Returns:
+        list: A `Row` for each line shown.
+    """
+
+    def hunk_rows(index, hunk):
+        old_count = hunk.old_end - hunk.old_start
+        new_count = hunk.new_end - hunk.new_start
+        for offset in range(max(old_count, new_count)):
+            yield Row(
+                hunk.tag,
+                hunk.old_start + offset if offset < old_count else None,
+                hunk.new_start + offset if offset < new_count else None,
+                index,
+            )
+
+    return _rows(result, hunk_rows)
+
+
+def unified_rows(result, context=3):
+    """Lay out the lines of result as a unified diff.
+
+    The removed lines of each hunk are shown before the added lines. Only
+    context unchanged lines are shown around each hunk, the other unchanged
+    lines are replaced with a single "gap" row.
+
+    Returns:
+        list: A `Row` for each line shown.
+    """
+
+    def hunk_rows(index, hunk):
+        for line in range(hunk.old_start, hunk.old_end):
+            yield Row("delete", line, None, index)
+        for line in range(hunk.new_start, hunk.new_end):
+            yield Row("insert", None, line, index)
+
+    rows = _rows(result, hunk_rows)
+
+    # Replace unchanged lines far from any hunk with gaps
+    shown = set()
+    for i, row in enumerate(rows):
+        if row.hunk is not None:
+            shown.update(range(max(0, i - context), i + context + 1))
+    ret = []
+    for i, row in enumerate(rows):
+        if i in shown:
+            ret.append(row)
+        elif not ret or ret[-1].kind != "gap":
+            ret.append(Row("gap", None, None, None))
+    return ret
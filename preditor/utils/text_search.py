@@ -2,7 +2,18 @@ from __future__ import absolute_import, print_function
 
 import abc
 import re
-from collections import deque
+from collections import deque, namedtuple
+
+from .search_results import SearchLine, SearchResult
+from .trigram_index import regex_literals, trigrams
+
+Replacement = namedtuple("Replacement", "line_num column old new start end")
+"""A single replacement found by `TextSearch.replacements`.
+
+`line_num` is the one based line number and `column` the index of the match in
+that line. `old` is the matched text and `new` the text replacing it. `start`
+and `end` are the indexes of the match in the searched text.
+"""
 
 
 class TextSearch(object, metaclass=abc.ABCMeta):
@@ -17,6 +28,9 @@ class TextSearch(object, metaclass=abc.ABCMeta):
             the results shown. These variables are provided when formatting. `dot`
             `dot` is a `.` for each digit required to show the current line number.
             `padding` can be used to properly pad `dot`.
+        ignored_lines (set): Lines of text that are never treated as matches,
+            even if they contain find_text. Used to only show new matches when
+            searching multiple versions of the same text.
         margin_format (str): A format string used to generate the line number
             text at the start of a text line. These variables are provided when
             formatting. `line_num` the current line number as an int. `padding`
@@ -25,7 +39,7 @@ class TextSearch(object, metaclass=abc.ABCMeta):
         match_count (int): The number times matching text was found including
             multiple finds on the same line. This value is not reset internally
             and can be used to track all matches across multiple calls of `search_text`.
-        padding (int): Set by `search_text` to the number of digits required to
+        padding (int): Set by `render` to the number of digits required to
             show all line numbers in the document. Used to ensure consistent number
             padding for all line numbers printed in the margin and gaps.
 
@@ -42,45 +56,119 @@ class TextSearch(object, metaclass=abc.ABCMeta):
         self.context = context
         self.find_text = find_text
         self.gap_format = "  {dot: >{padding}} \n"
+        self.ignored_lines = set()
         self.margin_format = "  {line_num: >{padding}}{match_indicator} "
         self.match_count = 0
 
         self.callback_matching = self.print_matching
         self.callback_non_matching = self.print_non_matching
 
+    def _search_line(self, line, line_num):
+        """Returns a SearchLine for the str line, finding its matches."""
+        spans = ()
+        if line not in self.ignored_lines:
+            spans = tuple(self.line_spans(line))
+        return SearchLine(line_num, line, spans)
+
+    def candidates(self, index):
+        """Returns the workbox_ids in a TrigramIndex that may contain matches.
+
+        Returns:
+            set or None: The workbox_ids that contain all of the `index_trigrams`.
+                None is returned if the index can't be used to narrow down the
+                workboxes that need to be searched.
+        """
+        required = self.index_trigrams()
+        if not required:
+            return None
+        return index.candidates(required)
+
     def clear_cache(self):
         """The finder can implement this to clear any cached data.
 
         This is called when no matches have been found beyond the # of context lines
         """
 
+    @classmethod
+    def apply_replacements(cls, text, replacements):
+        """Returns text with replacements applied.
+
+        Args:
+            text (str): The text `replacements` were generated from.
+            replacements (list): The `Replacement`s to apply. They must not
+                overlap, this is true for any subset of `replacements`.
+        """
+        parts = []
+        end = 0
+        for replacement in sorted(replacements, key=lambda r: r.start):
+            parts.append(text[end : replacement.start])
+            parts.append(replacement.new)
+            end = replacement.end
+        parts.append(text[end:])
+        return "".join(parts)
+
     @abc.abstractmethod
+    def index_trigrams(self):
+        """Returns the set of lowercase trigrams all text matching find_text must
+        contain, used to narrow the text searched with a TrigramIndex.
+
+        Returns None if no trigrams are known to be required.
+        """
+
     def indicate_line(self, line):
         """Yields chunks of line and if each chunk should be indicated.
 
-        The first yield should always be `(None, bool)`. The None value indicates
+        The first yield is always `(None, bool)`. The None value indicates
         that the margin should be printed. This triggers printing of `self.margin`
         passing the bool to the match_found argument.
 
+        Args:
+            line (SearchLine): The line to split into chunks.
+
         Yields:
             text (str or None): The text to be printed.
             indicate (bool): Should text treated as a match for the search term.
         """
+        # Write the margin indicating if this line has any matches
+        yield None, bool(line.spans)
+
+        start = 0
+        for span_start, span_end in line.spans:
+            pre = line.text[start:span_start]
+            if pre:
+                yield pre, False
+            yield line.text[span_start:span_end], True
+            # Record the match
+            self.match_count += 1
+            start = span_end
+        post = line.text[start:]
+        if post:
+            yield post, False
 
     def indicate_results(
-        self, line, line_num, path="undefined", workbox_name="undefined"
+        self, line, line_num=None, path="undefined", workbox_name="undefined"
     ):
-        """Writes a single line adding markup for any matches on the line."""
-        tool_tip = "Open {} at line number {}".format(path, line_num)
+        """Writes a single line adding markup for any matches on the line.
+
+        Args:
+            line (SearchLine or str): The line to write. If a str is passed its
+                matches are found and line_num is required.
+            line_num (int, optional): The line number of a str line.
+            path (str): Used to generate the tool tip of matches.
+            workbox_name (str): Passed to `callback_matching`.
+        """
+        if not isinstance(line, SearchLine):
+            line = self._search_line(line, line_num)
+        tool_tip = "Open {} at line number {}".format(path, line.line_num)
         for text, indicate in self.indicate_line(line):
             # Print the margin text after the finder tells us if the line matches
             if text is None:
-                self.callback_non_matching(self.margin(line_num, indicate))
+                self.callback_non_matching(self.margin(line.line_num, indicate))
                 continue
 
             # Otherwise print the next section of the line text
             if indicate:
-                self.callback_matching(text, workbox_name, line_num, tool_tip)
+                self.callback_matching(text, workbox_name, line.line_num, tool_tip)
             else:
                 self.callback_non_matching(text)
 
@@ -116,8 +204,22 @@ class TextSearch(object, metaclass=abc.ABCMeta):
         )
 
     @abc.abstractmethod
+    def iter_replacements(self, line, replace_text):
+        """Yields the start and end index of each match in line, and the text
+        it should be replaced with.
+
+        Args:
+            line (str): The line of text to find matches in.
+            replace_text (str): The text to replace the matches with.
+        """
+
+    @abc.abstractmethod
+    def line_spans(self, line):
+        """Returns a list of the `(start, end)` indexes of each match in line."""
+
     def matches(self, line):
         """Returns bool for if find_text is contained in this line."""
+        return bool(self.line_spans(line))
 
     def print_matching(self, text, workbox_name, line_num, tool_tip):
         """Simple callback for `callback_matching` that prints text.
@@ -141,79 +243,151 @@ class TextSearch(object, metaclass=abc.ABCMeta):
         """
         print(text, end="")
 
-    def search_text(self, text, path, workbox_name):
-        """Search each line of text for matching text and write the the matches
-        including context lines.
+    def replacements(self, text, replace_text):
+        """Returns a `Replacement` for each match of find_text in text.
+
+        Like `search_text`, matches are found in each line of text so they never
+        span multiple lines.
+
+        Args:
+            text (str): The text to search.
+            replace_text (str): The text to replace the matches with.
+
+        Returns:
+            list: The `Replacement`s in the order they are found.
+        """
+        ret = []
+        offset = 0
+        for i, line in enumerate(text.splitlines(keepends=True)):
+            for start, end, new in self.iter_replacements(line, replace_text):
+                ret.append(
+                    Replacement(
+                        i + 1, start, line[start:end], new, offset + start, offset + end
+                    )
+                )
+            offset += len(line)
+        return ret
+
+    def render(self, result):
+        """Write a SearchResult using `callback_matching` and
+        `callback_non_matching`.
+
+        The path of the workbox is written first followed by each line of the
+        result. Gaps between the lines are indicated by dots.
+
+        Args:
+            result (SearchResult): The result to write.
+        """
+        # Calculate the padding count so we can ensure all line numbers and gaps
+        # are consistently spaced in the margins.
+        self._padding = len(str(result.line_count))
+        info = dict(path=result.path, workbox_name=result.workbox_name)
+
+        self.callback_non_matching("# File: ")
+        tool_tip = "Open {}".format(result.path)
+        self.callback_matching(result.path, result.workbox_name, 0, tool_tip)
+        self.callback_non_matching("\n")
+
+        last_insert = None
+        for i, line in enumerate(result.lines):
+            if last_insert is not None and line.line_num > last_insert + 1:
+                # If there is a gap in output, insert dots for the width of the
+                # line number(zero based) of the next match.
+                line_num = next(ln.line_num for ln in result.lines[i:] if ln.spans)
+                self.callback_non_matching(
+                    self.gap_format.format(
+                        dot='.' * len(str(line_num - 1)), padding=self._padding
+                    )
+                )
+            self.indicate_results(line, **info)
+            last_insert = line.line_num
+
+    def search_results(
+        self,
+        text,
+        path="undefined",
+        workbox_name="undefined",
+        workbox_id=None,
+        backup_file=None,
+    ):
+        """Search each line of text for matching text.
 
         Args:
             text (str): The text to search.
             path (str): The workbox name this text represents. Should be the
                 Group_name and tab_name separated by a `/`.
             workbox_name (str): From editor.__workbox_name__()
+            workbox_id (str, optional): From editor.__workbox_id__()
+            backup_file (str, optional): The backup file text was read from.
+
+        Returns:
+            SearchResult or None: The matches and context lines found in text.
+                None is returned if there are no matches.
         """
         # NOTE: splitlines discards the "newline at end of file" so it doesn't
         # show up in the final search results.
         lines = text.splitlines(keepends=True)
+        result = SearchResult(
+            path,
+            workbox_name,
+            workbox_id=workbox_id,
+            line_count=len(lines),
+            context=self.context,
+            backup_file=backup_file,
+        )
 
-        # Calculate the padding count so we can ensure all line numbers and gaps
-        # are consistently spaced in the margins.
-        self._padding = len(str(len(lines)))
-
-        # Buffer to record up to context lines of text. This will be printed
+        # Buffer to record up to context lines of text. This will be included
         # only if we find a match in the middle of the document.
         # https://stackoverflow.com/a/52009859
         pre_history = deque(maxlen=self.context)
         remaining_context_lines = 0
 
-        # last_insert keeps track of the last time we inserted a line. This lets
-        # us keep track of if there is a gap in output and we need to add dots.
-        last_insert = 0
-        found = False
-
         for i, line in enumerate(lines):
-            info = dict(path=path, workbox_name=workbox_name)
-            if self.matches(line):
-                len_pre_history = len(pre_history)
-                if not found:
-                    # Print the path on the first find
-                    self.callback_non_matching("# File: ")
-                    tool_tip = "Open {}".format(path)
-                    self.callback_matching(path, workbox_name, 0, tool_tip)
-                    self.callback_non_matching("\n")
-                    found = True
-                elif i - last_insert - 1 - len_pre_history > 0:
-                    # If there is a in output larger than context, insert dots
-                    # for the width of the line numbers to indicate the gap.
-                    self.callback_non_matching(
-                        self.gap_format.format(
-                            dot='.' * len(str(i)), padding=self._padding
-                        )
-                    )
-                # Add the matching line the pre-context of the matching line.
-                last_insert = self.insert_lines(
-                    i - len_pre_history, *pre_history, line, info=info
-                )
-                # Reset the pre-context history now that we have printed it.
+            # Note: The `+ 1` is due to line numbers being 1 based not zero based
+            line = self._search_line(line, i + 1)
+            if line.spans:
+                # Add the pre-context of the matching line and the matching line
+                result.lines.extend(pre_history)
+                result.lines.append(line)
                 pre_history.clear()
-                # Reset the post context line count so we will print the full
+                # Reset the post context line count so we will include the full
                 # context after this latest match if no other matches are found.
                 remaining_context_lines = self.context
+            elif remaining_context_lines > 0:
+                # Include any remaining context lines after we found a result
+                result.lines.append(line)
+                remaining_context_lines -= 1
             else:
-                if remaining_context_lines > 0:
-                    # Print any remaining context lines after we found a result
-                    last_insert = self.insert_lines(i, line, info=info)
-                    remaining_context_lines -= 1
-                else:
-                    # If we don't need to print any post context lines record
-                    # this line into pre-context history so we can print it if
-                    # we find a match on the next line.
-                    # When deque reaches maxlen lines, it automatically evicts oldest
-                    pre_history.append(line)
-                    # Clear any cached match information the finder may have stored.
-                    self.clear_cache()
-
-        # Return if this file contained any matches
-        return found
+                # If we don't need any post context lines record this line into
+                # pre-context history so we can include it if we find a match on
+                # the next line. When deque reaches maxlen lines, it
+                # automatically evicts oldest
+                pre_history.append(line)
+                # Clear any cached match information the finder may have stored.
+                self.clear_cache()
+
+        if not result:
+            return None
+        return result
+
+    def search_text(self, text, path, workbox_name):
+        """Search each line of text for matching text and write the the matches
+        including context lines.
+
+        Args:
+            text (str): The text to search.
+            path (str): The workbox name this text represents. Should be the
+                Group_name and tab_name separated by a `/`.
+            workbox_name (str): From editor.__workbox_name__()
+
+        Returns:
+            bool: If text contained any matches.
+        """
+        result = self.search_results(text, path, workbox_name)
+        if result is None:
+            return False
+        self.render(result)
+        return True
 
     def title(self):
         return '\nFind in workboxs: "{}"{}\n\n'.format(self.find_text, self.title_flags)
@@ -232,39 +406,21 @@ class RegexTextSearch(TextSearch):
             find_text, case_sensitive, context=context
         )
         self.pattern = re.compile(find_text, flags=0 if case_sensitive else re.I)
-        # Cache regex match objects between the `matches` call and `indicate_line`
-        # The key is the original line of text
-        self._matches = {}
-
-    def clear_cache(self):
-        # Reset regex cache for the next call to `matches`
-        self._matches = {}
 
-    def indicate_line(self, line):
-        # Check if this line is a match.
-        match = self._matches.get(line)
-        # Write the margin indicating if this line has any matches
-        yield None, bool(match)
+    def index_trigrams(self):
+        ret = set()
+        for literal in regex_literals(self.find_text, self.pattern.flags):
+            ret.update(trigrams(literal))
+        return ret or None
 
-        start = 0
-        if match:
-            for m in match:
-                pre = line[start : m.start()]
-                if pre:
-                    yield pre, False
-                yield line[m.start() : m.end()], True
-                start = m.end()
-                # Record the match
-                self.match_count += 1
-            post = line[start:]
-            if post:
-                yield post, False
-        else:
-            yield line, False
+    def iter_replacements(self, line, replace_text):
+        for match in self.pattern.finditer(line):
+            # Ignore empty matches, there is nothing to preview or select
+            if match.end() > match.start():
+                yield match.start(), match.end(), match.expand(replace_text)
 
-    def matches(self, line):
-        self._matches[line] = list(self.pattern.finditer(line))
-        return bool(self._matches[line])
+    def line_spans(self, line):
+        return [match.span() for match in self.pattern.finditer(line)]
 
     @property
     def title_flags(self):
@@ -280,54 +436,34 @@ class SimpleTextSearch(TextSearch):
         super(SimpleTextSearch, self).__init__(
             find_text, case_sensitive, context=context
         )
-        # Assign the correct matching method based on the desired case setting
-        if case_sensitive:
-            self._matches = self._search_text_case_sensitive
-        else:
-            self._matches = self._search_text
+        if not case_sensitive:
             find_text = self.find_text.lower()
         # Preserve the original find_text value but cache the value needed internally
         self._find_text = find_text
 
-    def _search_text(self, line):
-        """Check for pattern ignoring case."""
-        return self._find_text in line.lower()
+    def index_trigrams(self):
+        return trigrams(self.find_text) or None
 
-    def _search_text_case_sensitive(self, line):
-        """Check for pattern matching case."""
-        return self._find_text in line
+    def iter_replacements(self, line, replace_text):
+        for start, end in self.line_spans(line):
+            yield start, end, replace_text
 
-    def indicate_line(self, line):
-        # Handle case sensitivity setting, ensuring return of the correct case
-        original_line = line
+    def line_spans(self, line):
+        # Handle case sensitivity setting, the indexes are used on the original
+        # line so its case is preserved
         if not self.case_sensitive:
             line = line.lower()
 
+        ret = []
         find_len = len(self._find_text)
-        start = 0
-        end = line.find(self._find_text)
-        # Write the margin indicating if this line has any matches
-        yield None, end != -1
-
-        # Write the text of the line with indications
-        while end != -1:
-            # insert prefix text
-            yield original_line[start:end], False
-            # insert indicated text preserving case
-            yield original_line[end : end + find_len], True
-            # Record the match
-            self.match_count += 1
-
+        if not find_len:
+            return ret
+        start = line.find(self._find_text)
+        while start != -1:
+            ret.append((start, start + find_len))
             # Check for any more matches in this line
-            start = end + find_len
-            end = line.find(self._find_text, start)
-
-        # Include text at the end of the line
-        if end < find_len:
-            yield original_line[start:], False
-
-    def matches(self, line):
-        return self._matches(line)
+            start = line.find(self._find_text, start + find_len)
+        return ret
 
     @property
     def title_flags(self):
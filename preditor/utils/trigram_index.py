@@ -0,0 +1,340 @@
+"""A persistent index of the trigrams in workbox backup files.
+
+Searching thousands of workboxes requires reading every backup file from disk.
+This index stores the set of lowercase three character strings contained in the
+latest backup of each workbox. A search term can only match a workbox if the
+workbox contains every trigram of the term, so most workboxes can be skipped
+without reading them.
+
+The index only narrows down the candidates, the text of each candidate is still
+searched. Entries record the backup file they were built from, if that is no
+longer the latest backup the entry is ignored. This means a missing, corrupt or
+out of date index only makes searching slower, never incorrect.
+"""
+from __future__ import absolute_import
+
+import hashlib
+import json
+import logging
+import os
+import re
+from pathlib import Path
+
+import charset_normalizer
+
+try:
+    from re import _parser as sre_parse
+    from re._constants import LITERAL
+except ImportError:  # Python < 3.11
+    import sre_parse
+    from sre_constants import LITERAL
+
+from ..prefs import get_latest_backup_infos, get_prefs_dir, prefs_path
+
+logger = logging.getLogger(__name__)
+
+# Cache of the TrigramIndex for each core_name
+_cache = {}
+
+
+def trigrams(text):
+    """Returns the set of lowercase trigrams contained in text."""
+    text = text.lower()
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def read_backup(path):
+    """Returns the sha1 hash of the contents of path and its decoded text."""
+    data = Path(path).read_bytes()
+    digest = hashlib.sha1(data).hexdigest()
+    try:
+        return digest, data.decode("utf-8")
+    except UnicodeDecodeError:
+        pass
+    encoding = charset_normalizer.detect(data)["encoding"] or "utf-8"
+    return digest, data.decode(encoding, errors="ignore")
+
+
+def regex_literals(pattern, flags=0):
+    """Returns the literal strings that every match of a regex pattern contains.
+
+    Only the top level of the pattern is checked, anything that isn't a literal
+    character, like a character class or repeat, ends the current literal string.
+    Patterns that use alternation at the top level return an empty list.
+
+    Non-ascii characters also end a literal string as some of them match other
+    characters when ignoring case in ways that lowercasing doesn't reproduce.
+    """
+    try:
+        parsed = sre_parse.parse(pattern, flags)
+    except (re.error, TypeError, ValueError):
+        return []
+
+    literals = []
+    current = []
+    for op, value in parsed:
+        if op == LITERAL and value < 128:
+            current.append(chr(value))
+            continue
+        if current:
+            literals.append("".join(current))
+            current = []
+    if current:
+        literals.append("".join(current))
+    return literals
+
+
+class TrigramIndex(object):
+    """Stores the trigrams of the latest backup file of each workbox.
+
+    The index is stored as json in the core's prefs directory. Each entry is
+    keyed by workbox_id and records the relative backup file, its size and
+    modified time, a hash of its text and its trigrams.
+
+    Args:
+        core_name (str): The core_name whose workbox backups are indexed.
+        filename (str, optional): The json file the index is stored in. Defaults
+            to `trigram_index.json` in the prefs directory of core_name.
+    """
+
+    version = 1
+
+    def __init__(self, core_name, filename=None):
+        self.core_name = core_name
+        if filename is None:
+            filename = prefs_path("trigram_index.json", core_name=core_name)
+        self.filename = filename
+        self._entries = {}
+        # Maps each trigram to the set of workbox_ids that contain it.
+        self._inverted = {}
+        self._dirty = False
+        self.load()
+
+    def __contains__(self, workbox_id):
+        return workbox_id in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _backup_info(self, backup_file):
+        """Returns the relative path, size and modified time of backup_file."""
+        path = Path(backup_file)
+        stat = path.stat()
+        relative = os.path.relpath(str(path), get_prefs_dir(core_name=self.core_name))
+        return relative.replace("\\", "/"), stat.st_size, stat.st_mtime_ns
+
+    def _add(self, workbox_id, entry):
+        self.remove(workbox_id)
+        self._entries[workbox_id] = entry
+        for trigram in entry["trigrams"]:
+            self._inverted.setdefault(trigram, set()).add(workbox_id)
+
+    def build_entry(self, text, backup_file):
+        """Returns the index entry for text read from backup_file.
+
+        This doesn't modify the index so it can be called outside of the gui
+        thread. Pass the result to `set_entry` to add it to the index.
+
+        Args:
+            text (str): The contents of backup_file.
+            backup_file (str): The backup file text was read from.
+
+        Returns:
+            dict or None: The entry, None if backup_file can't be read.
+        """
+        try:
+            relative, size, mtime = self._backup_info(backup_file)
+            digest = hashlib.sha1(Path(backup_file).read_bytes()).hexdigest()
+        except OSError:
+            return None
+        return {
+            "file": relative,
+            "hash": digest,
+            "mtime": mtime,
+            "size": size,
+            "trigrams": trigrams(text),
+        }
+
+    def candidates(self, required):
+        """Returns the workbox_ids that contain all of the required trigrams.
+
+        Args:
+            required (set): The trigrams that must be contained. If empty, every
+                indexed workbox is a candidate.
+
+        Returns:
+            set: The workbox_ids of the indexed workboxes that may match.
+        """
+        if not required:
+            return set(self._entries)
+
+        # Intersect the smallest sets first so the result shrinks quickly
+        sets = []
+        for trigram in required:
+            workbox_ids = self._inverted.get(trigram)
+            if not workbox_ids:
+                return set()
+            sets.append(workbox_ids)
+        sets.sort(key=len)
+        ret = set(sets[0])
+        for workbox_ids in sets[1:]:
+            ret &= workbox_ids
+            if not ret:
+                break
+        return ret
+
+    def is_current(self, workbox_id, backup_file):
+        """Returns True if the entry for workbox_id was built from backup_file
+        and that file hasn't changed since then."""
+        entry = self._entries.get(workbox_id)
+        if entry is None:
+            return False
+        try:
+            info = self._backup_info(backup_file)
+        except OSError:
+            return False
+        return (entry["file"], entry["size"], entry["mtime"]) == info
+
+    def is_dirty(self):
+        """Returns True if the index has changes that are not saved."""
+        return self._dirty
+
+    def load(self):
+        """Load the index from disk. If the file is missing or corrupt, the
+        index is empty and will be re-built as workboxes are saved or searched.
+        """
+        self._entries = {}
+        self._inverted = {}
+        self._dirty = False
+        try:
+            with open(self.filename, encoding="utf-8") as fle:
+                data = json.load(fle)
+            if data.get("version") != self.version:
+                raise ValueError("Unsupported version {}".format(data.get("version")))
+            for workbox_id, entry in data["entries"].items():
+                # Trigrams are stored as a single string to keep the file small
+                text = entry["trigrams"]
+                entry["trigrams"] = {text[i : i + 3] for i in range(0, len(text), 3)}
+                if len(entry["hash"]) != 40 or not isinstance(entry["size"], int):
+                    raise ValueError("Invalid entry {}".format(workbox_id))
+                self._add(workbox_id, entry)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as error:
+            logger.warning(
+                "Ignoring corrupt trigram index {}: {}".format(self.filename, error)
+            )
+            self._entries = {}
+            self._inverted = {}
+            # Replace the corrupt file the next time the index is saved.
+            self._dirty = True
+
+    def rebuild(self):
+        """Re-build the index from scratch from the latest backup file of every
+        workbox in the prefs directory."""
+        self._entries = {}
+        self._inverted = {}
+        self._dirty = True
+        backup_infos = get_latest_backup_infos(self.core_name)
+        for workbox_id, (backup_file, _, _) in sorted(backup_infos.items()):
+            try:
+                _digest, text = read_backup(backup_file)
+            except OSError:
+                continue
+            self.update(workbox_id, text, backup_file)
+
+    def remove(self, workbox_id):
+        """Remove workbox_id from the index."""
+        entry = self._entries.pop(workbox_id, None)
+        if entry is None:
+            return
+        self._dirty = True
+        for trigram in entry["trigrams"]:
+            workbox_ids = self._inverted.get(trigram)
+            if workbox_ids is not None:
+                workbox_ids.discard(workbox_id)
+                if not workbox_ids:
+                    del self._inverted[trigram]
+
+    def save(self, force=False):
+        """Write the index to disk if it has changed or force is True."""
+        if not (self._dirty or force):
+            return
+        entries = {}
+        for workbox_id, entry in sorted(self._entries.items()):
+            entry = dict(entry)
+            entry["trigrams"] = "".join(sorted(entry["trigrams"]))
+            entries[workbox_id] = entry
+        data = {"entries": entries, "version": self.version}
+
+        # Write to a temp file and replace the index so a interrupted save
+        # doesn't leave a corrupt index.
+        temp = "{}.tmp".format(self.filename)
+        try:
+            Path(self.filename).parent.mkdir(parents=True, exist_ok=True)
+            with open(temp, "w", encoding="utf-8") as fle:
+                json.dump(data, fle)
+            os.replace(temp, self.filename)
+        except OSError as error:
+            # The index is only used to speed up searching, don't prevent
+            # saving the workboxes if it can't be saved.
+            logger.warning(
+                "Unable to save trigram index {}: {}".format(self.filename, error)
+            )
+            return
+        self._dirty = False
+
+    def set_entry(self, workbox_id, entry):
+        """Store a entry returned by `build_entry` for workbox_id. If entry is
+        None, workbox_id is removed from the index."""
+        if entry is None:
+            self.remove(workbox_id)
+            return
+        self._add(workbox_id, entry)
+        self._dirty = True
+
+    def update(self, workbox_id, text, backup_file):
+        """Index text as the contents of backup_file for workbox_id.
+
+        Args:
+            workbox_id (str): The workbox the backup belongs to.
+            text (str): The text written to backup_file. This is passed so the
+                file doesn't need to be decoded again.
+            backup_file (str): The backup file that was just written.
+        """
+        self.set_entry(workbox_id, self.build_entry(text, backup_file))
+
+    def verify(self):
+        """Check every entry against its backup file.
+
+        Returns:
+            list: The workbox_ids whose entries are out of date or don't match
+                the contents of their backup file.
+        """
+        invalid = []
+        workbox_dir = Path(get_prefs_dir(core_name=self.core_name))
+        backup_infos = get_latest_backup_infos(self.core_name)
+        for workbox_id, entry in sorted(self._entries.items()):
+            backup_file, _, count = backup_infos.get(workbox_id, ("", "", 0))
+            if not count or not self.is_current(workbox_id, backup_file):
+                invalid.append(workbox_id)
+                continue
+            try:
+                digest, text = read_backup(workbox_dir / entry["file"])
+            except OSError:
+                invalid.append(workbox_id)
+                continue
+            if digest != entry["hash"] or trigrams(text) != entry["trigrams"]:
+                invalid.append(workbox_id)
+        return invalid
+
+
+def get_trigram_index(core_name):
+    """Returns the cached TrigramIndex for core_name, loading it if needed."""
+    index = _cache.get(core_name)
+    if index is None or index.filename != prefs_path(
+        "trigram_index.json", core_name=core_name
+    ):
+        index = TrigramIndex(core_name)
+        _cache[core_name] = index
+    return index
@@ -0,0 +1,35 @@
+"""Measures the time CodeHighlighter takes to highlight 5,000 character lines.
+
+Run with `python tests/benchmarks/benchmark_codehighlighter.py`.
+"""
+import os
+import timeit
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from Qt.QtGui import QTextDocument  # noqa: E402
+from Qt.QtWidgets import QApplication  # noqa: E402
+
+from preditor.gui.codehighlighter import CodeHighlighter  # noqa: E402
+
+SAMPLE = "if value: print('text', \"other\") # comment for x in range(10) "
+
+
+def main(length=5000, lines=20, number=5):
+    app = QApplication.instance() or QApplication([])
+    line = (SAMPLE * (length // len(SAMPLE) + 1))[:length]
+    text = "\n".join([line] * lines)
+
+    document = QTextDocument()
+    document.documentLayout()
+    highlighter = CodeHighlighter(document, 'Python')
+    app.processEvents()
+    document.setPlainText(text)
+
+    duration = timeit.timeit(highlighter.rehighlight, number=number) / number
+    print("Line length: {}".format(length))
+    print("Per line: {:.3f} ms".format(duration / lines * 1000))
+
+
+if __name__ == '__main__':
+    main()
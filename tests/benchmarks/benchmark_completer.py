@@ -0,0 +1,48 @@
+"""Measures the per-keystroke cost of refreshing the completer on a object with
+10,000 attributes.
+
+Run with `python tests/benchmarks/benchmark_completer.py`.
+"""
+import os
+import timeit
+import types
+
+import __main__
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from Qt.QtWidgets import QApplication  # noqa: E402
+
+from preditor.gui.console import ConsolePrEdit  # noqa: E402
+
+
+def main(count=10000, number=50):
+    app = QApplication.instance() or QApplication([])  # noqa: F841
+    console = ConsolePrEdit(None)
+    completer = console.completer()
+
+    obj = types.ModuleType("big")
+    for i in range(count):
+        setattr(obj, "attribute_{:05d}".format(i), i)
+    __main__.big = obj
+    console.setPlainText("big.attribute_0")
+    console.moveCursor(console.textCursor().MoveOperation.End)
+
+    def keystroke():
+        completer.refreshList(scope=__main__.__dict__)
+
+    def uncached():
+        completer._attributeCache.clear()
+        completer._modelKeys = None
+        keystroke()
+
+    keystroke()
+    cold = timeit.timeit(uncached, number=number) / number
+    warm = timeit.timeit(keystroke, number=number) / number
+    print("Attributes: {}".format(count))
+    print("Uncached keystroke: {:.3f} ms".format(cold * 1000))
+    print("Cached keystroke:   {:.3f} ms".format(warm * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""Measures the time to append output to the console with and without the
+code highlighter enabled.
+
+Run with `python tests/benchmarks/benchmark_console_highlight.py`.
+"""
+import os
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from Qt.QtGui import QTextCursor  # noqa: E402
+from Qt.QtWidgets import QApplication  # noqa: E402
+
+from preditor.gui.console import ConsolePrEdit  # noqa: E402
+
+SAMPLE = ">>> if value: print('text', \"other\") # comment for x in range(10)\n"
+
+
+def append_lines(console, app, lines):
+    start = time.perf_counter()
+    for _ in range(lines):
+        console.moveCursor(QTextCursor.MoveOperation.End)
+        console.insertPlainText(SAMPLE)
+    app.processEvents()
+    return time.perf_counter() - start
+
+
+def main(lines=5000):
+    app = QApplication.instance() or QApplication([])
+    console = ConsolePrEdit(None)
+    console.resize(800, 600)
+    console.show()
+    app.processEvents()
+
+    for enabled in (False, True):
+        console.clear()
+        console.codeHighlighter().setEnabled(enabled)
+        duration = append_lines(console, app, lines)
+        print(
+            "Highlighting {}: {:.1f} lines/s".format(
+                "enabled" if enabled else "disabled", lines / duration
+            )
+        )
+    console.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""Measures restoring the workbox prefs of 500 workboxes, each with 5 backup
+files, comparing finding the latest backup of each workbox separately with the
+single scan used by `GroupTabWidget.restore_prefs`.
+
+Run with `python tests/benchmarks/benchmark_restore_prefs.py`.
+"""
+import os
+import tempfile
+import timeit
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from Qt.QtWidgets import QApplication, QCheckBox, QWidget  # noqa: E402
+
+from preditor.gui.group_tab_widget.group_tab_widget import GroupTabWidget  # noqa: E402
+from preditor.prefs import (  # noqa: E402
+    VersionTypes,
+    get_backup_version_info,
+    get_latest_backup_infos,
+    get_prefs_dir,
+)
+
+
+class Window(QWidget):
+    """Provides the parts of the LoggerWindow api used when restoring prefs."""
+
+    def __init__(self, core_name):
+        super(Window, self).__init__()
+        self.name = core_name
+        self.boxesOrphanedViaInstance = {}
+        self.latestTimeStrsForBoxesChangedViaInstance = {}
+        self.uiExtraTooltipInfoCHK = QCheckBox(self)
+        self.uiWorkboxTAB = GroupTabWidget(core_name=core_name, parent=self)
+
+    def current_workbox(self):
+        return self.uiWorkboxTAB.current_groups_widget()
+
+    def focusToWorkbox(self):  # noqa: N802
+        pass
+
+    def indexOfWorkboxOrTabGroup(self, widget):  # noqa: N802
+        return None
+
+    def setWorkboxFontBasedOnConsole(self, workbox=None):  # noqa: N802
+        pass
+
+    def updateTabColorsAndToolTips(self):  # noqa: N802
+        pass
+
+
+def create_prefs(core_name, count, backups):
+    workbox_dir = Path(get_prefs_dir(core_name=core_name, create=True))
+    groups = []
+    for i in range(count):
+        workbox_id = "workbox_{:04}".format(i)
+        (workbox_dir / workbox_id).mkdir()
+        for j in range(backups):
+            time_str = "2024-01-01-00-00-{:02}-000000".format(j)
+            filepath = (
+                workbox_dir / workbox_id / "{}-{}.py".format(workbox_id, time_str)
+            )
+            filepath.write_text("print({})\n".format(i))
+        if i % 50 == 0:
+            groups.append(dict(name="Group {}".format(i // 50), tabs=[]))
+        groups[-1]["tabs"].append(
+            dict(name="Workbox {}".format(i % 50), workbox_id=workbox_id)
+        )
+    return dict(groups=groups)
+
+
+def main(count=500, backups=5, number=5):
+    app = QApplication.instance() or QApplication([])  # noqa: F841
+    os.environ["PREDITOR_PREF_PATH"] = tempfile.mkdtemp()
+
+    core_name = "benchmark_restore_prefs"
+    prefs = create_prefs(core_name, count, backups)
+    workbox_ids = [
+        tab["workbox_id"] for group in prefs["groups"] for tab in group["tabs"]
+    ]
+
+    def per_workbox():
+        for workbox_id in workbox_ids:
+            get_backup_version_info(core_name, workbox_id, VersionTypes.Last, "")
+
+    def single_scan():
+        infos = get_latest_backup_infos(core_name)
+        for workbox_id in workbox_ids:
+            infos.get(workbox_id)
+
+    window = Window(core_name)
+    manager = window.uiWorkboxTAB
+
+    def restore():
+        manager.restore_prefs(prefs)
+
+    separate = timeit.timeit(per_workbox, number=number) / number
+    single = timeit.timeit(single_scan, number=number) / number
+    first = timeit.timeit(restore, number=1)
+    # Restoring again reuses the existing group and workbox widgets
+    again = timeit.timeit(restore, number=1)
+
+    print("Workboxes: {}, backups each: {}".format(count, backups))
+    print("Latest backups, scan per workbox:  {:.1f} ms".format(separate * 1000))
+    print("Latest backups, single scan:       {:.1f} ms".format(single * 1000))
+    print("restore_prefs:                     {:.1f} ms".format(first * 1000))
+    print("restore_prefs, reusing widgets:    {:.1f} ms".format(again * 1000))
+
+
+if __name__ == '__main__':
+    main()
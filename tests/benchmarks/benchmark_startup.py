@@ -0,0 +1,91 @@
+"""Measures creating a LoggerWindow whose prefs contain 1,000 workboxes, comparing
+restoring them as `WorkboxPlaceholder`s with creating every editor.
+
+Each mode is run in a separate process so their peak memory can be compared.
+
+Run with `python tests/benchmarks/benchmark_startup.py`.
+"""
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+
+def create_prefs(core_name, count):
+    from preditor.prefs import get_prefs_dir
+
+    workbox_dir = Path(get_prefs_dir(core_name=core_name, create=True))
+    groups = []
+    for i in range(count):
+        workbox_id = "workbox_{:04}".format(i)
+        (workbox_dir / workbox_id).mkdir()
+        filepath = workbox_dir / workbox_id / "{}-2024-01-01-00-00-00-000000.py"
+        filepath = Path(str(filepath).format(workbox_id))
+        filepath.write_text("".join("print({})\n".format(j) for j in range(100)))
+        if i % 50 == 0:
+            groups.append(dict(name="Group {}".format(i // 50), tabs=[]))
+        groups[-1]["tabs"].append(
+            dict(name="Workbox {}".format(i % 50), workbox_id=workbox_id)
+        )
+
+    prefs_file = Path(get_prefs_dir(sub_dir="", core_name=core_name))
+    prefs_file = prefs_file / "preditor_pref.json"
+    with prefs_file.open("w") as fle:
+        json.dump(dict(workbox_prefs=dict(groups=groups)), fle)
+
+
+def run(core_name, defer_editors):
+    from Qt.QtWidgets import QApplication
+
+    from preditor.gui.group_tab_widget.group_tab_widget import GroupTabWidget
+    from preditor.gui.loggerwindow import LoggerWindow
+
+    app = QApplication.instance() or QApplication([])  # noqa: F841
+    GroupTabWidget.defer_editors = defer_editors
+
+    start = time.perf_counter()
+    window = LoggerWindow(None, name=core_name)
+    duration = time.perf_counter() - start
+
+    editors = sum(
+        1
+        for workbox, _, _, _, _ in window.uiWorkboxTAB.all_widgets()
+        if getattr(workbox, "__is_created__", lambda: True)()
+    )
+    # ru_maxrss is in kilobytes on linux
+    memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps(dict(duration=duration, memory=memory, editors=editors)))
+
+
+def main(count=1000):
+    os.environ["PREDITOR_PREF_PATH"] = tempfile.mkdtemp()
+    core_name = "benchmark_startup"
+    create_prefs(core_name, count)
+
+    print("Workboxes: {}".format(count))
+    for label, defer in (("placeholders", "1"), ("editors", "")):
+        output = subprocess.check_output(
+            [sys.executable, __file__, core_name, defer], stderr=subprocess.DEVNULL
+        )
+        result = json.loads(output.decode().splitlines()[-1])
+        print(
+            "{:<13} {:8.1f} ms {:8.1f} MB peak, {} editors created".format(
+                label + ":",
+                result["duration"] * 1000,
+                result["memory"],
+                result["editors"],
+            )
+        )
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        run(sys.argv[1], bool(sys.argv[2]))
+    else:
+        main()
@@ -0,0 +1,76 @@
+"""Measures the per-keystroke cost of updating the tab colors and tool tips of a
+group with 200 linked workboxes.
+
+Run with `python tests/benchmarks/benchmark_tab_state.py`.
+"""
+import os
+import tempfile
+import timeit
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from Qt.QtWidgets import QApplication, QCheckBox, QWidget  # noqa: E402
+
+from preditor.gui.group_tab_widget.group_tab_widget import GroupTabWidget  # noqa: E402
+from preditor.gui.workbox_text_edit import WorkboxTextEdit  # noqa: E402
+from preditor.prefs import get_prefs_dir  # noqa: E402
+
+
+class Window(QWidget):
+    """Provides the parts of the LoggerWindow api used by the tab bars."""
+
+    def __init__(self, core_name):
+        super(Window, self).__init__()
+        self.name = core_name
+        self.uiExtraTooltipInfoCHK = QCheckBox(self)
+        self.uiWorkboxTAB = GroupTabWidget(core_name=core_name, parent=self)
+
+    def indexOfWorkboxOrTabGroup(self, widget):  # noqa: N802
+        return None
+
+
+def main(count=200, number=200):
+    app = QApplication.instance() or QApplication([])  # noqa: F841
+    tempdir = tempfile.mkdtemp()
+    os.environ["PREDITOR_PREF_PATH"] = tempdir
+
+    get_prefs_dir(core_name="benchmark_tab_state", create=True)
+    window = Window("benchmark_tab_state")
+    manager = window.uiWorkboxTAB
+    group, _ = manager.default_tab("Group")
+    manager.addTab(group, "Group")
+    text = "print('hello world')\n" * 500
+    for i in range(count):
+        editor = WorkboxTextEdit(parent=group, core_name=manager.core_name)
+        group.addTab(editor, "Workbox {}".format(i))
+        filename = Path(tempdir) / "workbox_{}.py".format(i)
+        filename.write_text(text)
+        editor.__set_filename__(str(filename))
+        editor.__set_text__(text)
+        editor.__set_last_saved_text__(text)
+        editor.__set_last_workbox_name__()
+
+    tab_bar = group.tabBar()
+    editor = group.widget(count // 2)
+
+    def full_update():
+        # Every tab is updated and re-checks its linked file on disk
+        editor.insertPlainText("a")
+        for index in range(group.count()):
+            group.widget(index).__refresh_missing_linked_file__()
+        tab_bar.updateColorsAndToolTips()
+
+    def keystroke():
+        editor.insertPlainText("a")
+        tab_bar.flushTabUpdates()
+
+    full = timeit.timeit(full_update, number=number) / number
+    incremental = timeit.timeit(keystroke, number=number) / number
+    print("Tabs: {}".format(count))
+    print("Update all tabs:     {:.3f} ms".format(full * 1000))
+    print("Update changed tab:  {:.3f} ms".format(incremental * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,339 @@
+import os
+
+import pytest
+from Qt.QtGui import QTextDocument
+
+from preditor.gui.codehighlighter import CodeHighlighter
+
+
+class CountingHighlighter(CodeHighlighter):
+    """Records the block numbers that are highlighted."""
+
+    def __init__(self, *args, **kwargs):
+        self.highlighted = []
+        super(CountingHighlighter, self).__init__(*args, **kwargs)
+
+    def highlightBlock(self, text):
+        self.highlighted.append(self.currentBlock().blockNumber())
+        super(CountingHighlighter, self).highlightBlock(text)
+
+
+@pytest.fixture()
+def document(qapp):
+    document = QTextDocument()
+    # The document only emits contentsChange, used by the highlighter, once it
+    # has a layout. This is normally created by the QTextEdit showing it.
+    document.documentLayout()
+    return document
+
+
+def set_text(document, text):
+    """Set the text of document and wait for the highlighter to process it."""
+    from Qt.QtWidgets import QApplication
+
+    # Attaching the highlighter to the document queues a full re-highlight,
+    # changes made to the document before that is processed are not highlighted.
+    QApplication.processEvents()
+    document.setPlainText(text)
+
+
+def formats(document, color):
+    """Returns the text of each block that is formatted with color."""
+    ret = []
+    block = document.begin()
+    while block.isValid():
+        text = block.text()
+        for fmt in block.layout().formats():
+            if fmt.format.foreground().color() == color:
+                ret.append(text[fmt.start : fmt.start + fmt.length])
+        block = block.next()
+    return ret
+
+
+def block_states(document):
+    ret = []
+    block = document.begin()
+    while block.isValid():
+        ret.append(block.userState())
+        block = block.next()
+    return ret
+
+
+def test_multiline_strings(document):
+    highlighter = CodeHighlighter(document, 'Python')
+    set_text(
+        document,
+        "\n".join(
+            (
+                'a = """start',
+                'if else',
+                'end""" if True',
+                "b = '''one line''' + 'single'",
+                "c = '''",
+                '"""',
+                "'''",
+                '# not a """ string',
+                'd = 1',
+            )
+        ),
+    )
+    assert block_states(document) == [1, 1, 0, 0, 2, 2, 0, 0, 0]
+
+    strings = formats(document, highlighter.stringColor())
+    assert strings == [
+        '"""start',
+        'if else',
+        'end"""',
+        "'''one line'''",
+        "'single'",
+        "'''",
+        '"""',
+        "'''",
+    ]
+    # Keywords inside of the multi-line string are not highlighted
+    assert formats(document, highlighter.keywordColor()) == ["if", "True"]
+
+
+def test_rehighlighted_blocks(document):
+    from Qt.QtGui import QTextCursor
+
+    highlighter = CountingHighlighter(document, 'Python')
+    lines = ["line{} = {}".format(i, i) for i in range(20)]
+    set_text(document, "\n".join(lines))
+    assert sorted(set(highlighter.highlighted)) == list(range(20))
+
+    # A single character edit only re-highlights the edited block
+    highlighter.highlighted = []
+    cursor = QTextCursor(document.findBlockByNumber(5))
+    cursor.insertText("x")
+    assert highlighter.highlighted == [5]
+
+    # Opening a multi-line string re-highlights all of the following blocks
+    highlighter.highlighted = []
+    cursor = QTextCursor(document.findBlockByNumber(10))
+    cursor.insertText('"""')
+    assert highlighter.highlighted == list(range(10, 20))
+    assert block_states(document)[10:] == [1] * 10
+
+    # Editing inside of the multi-line string only re-highlights that block
+    highlighter.highlighted = []
+    cursor = QTextCursor(document.findBlockByNumber(15))
+    cursor.insertText("x")
+    assert highlighter.highlighted == [15]
+
+    # Closing the string re-highlights the blocks after it
+    highlighter.highlighted = []
+    cursor = QTextCursor(document.findBlockByNumber(12))
+    cursor.insertText('"""')
+    assert highlighter.highlighted == list(range(12, 20))
+    assert block_states(document)[10:] == [1, 1] + [0] * 8
+
+
+def test_console_mode(document):
+    highlighter = CodeHighlighter(document, 'Python')
+    highlighter.setConsoleMode(True)
+    set_text(document, '>>> x = """if\nif\n>>> if True')
+    # Multi-line strings are not carried between console blocks
+    assert block_states(document) == [1, 0, 0]
+    assert formats(document, highlighter.keywordColor()) == ["if", "True"]
+
+
+class OutputDocument(QTextDocument):
+    """A document that provides the outputPrompt used to highlight results,
+    like the console."""
+
+    def outputPrompt(self):
+        return '#Result: '
+
+
+def text_for_test(filename):
+    dirname = os.path.dirname(__file__)
+    filename = os.path.join(dirname, filename)
+    with open(filename) as fle:
+        return fle.read()
+
+
+def render_formats(document, highlighter):
+    """Returns text showing the format applied to each character of document.
+
+    Each line of the document is followed by a line marking the kind of each
+    highlighted character: c=comment, k=keyword, r=result and s=string.
+    """
+    kinds = {
+        highlighter.commentColor().name(): "c",
+        highlighter.keywordColor().name(): "k",
+        highlighter.resultColor().name(): "r",
+        highlighter.stringColor().name(): "s",
+    }
+    lines = []
+    block = document.begin()
+    while block.isValid():
+        text = block.text()
+        markers = [" "] * len(text)
+        for fmt in block.layout().formats():
+            kind = kinds[fmt.format.foreground().color().name()]
+            for i in range(fmt.start, fmt.start + fmt.length):
+                markers[i] = kind
+        lines.append(text)
+        lines.append("".join(markers).rstrip())
+        block = block.next()
+    return "\n".join(lines) + "\n"
+
+
+@pytest.mark.parametrize(
+    "filename,console_mode",
+    (
+        ("python.txt", False),
+        ("console.txt", True),
+    ),
+)
+def test_golden_formats(qapp, filename, console_mode):
+    document = OutputDocument()
+    document.documentLayout()
+    highlighter = CodeHighlighter(document, 'Python')
+    highlighter.setConsoleMode(console_mode)
+    set_text(document, text_for_test(filename).rstrip("\n"))
+
+    result = render_formats(document, highlighter)
+    # To update these tests, write result over the golden file and verify that
+    # every line is highlighted correctly.
+    check = text_for_test(filename.replace(".txt", "_golden.txt"))
+    assert result == check
+
+
+def has_formats(document, number):
+    return bool(document.findBlockByNumber(number).layout().formats())
+
+
+@pytest.fixture()
+def console(qapp, monkeypatch):
+    import sys
+
+    import preditor.stream
+    from preditor.gui.console import ConsolePrEdit
+
+    # Showing the console installs the stream manager replacing sys.stdout/err,
+    # restore them once the test is finished so other tests are not affected.
+    monkeypatch.setattr(preditor.stream, "active", preditor.stream.active)
+    monkeypatch.setattr(sys, "stdout", sys.stdout)
+    monkeypatch.setattr(sys, "stderr", sys.stderr)
+
+    console = ConsolePrEdit(None)
+    console.resize(400, 200)
+    yield console
+    console.close()
+    console.deleteLater()
+
+
+def append(console, text):
+    from Qt.QtGui import QTextCursor
+    from Qt.QtWidgets import QApplication
+
+    console.moveCursor(QTextCursor.MoveOperation.End)
+    console.insertPlainText(text)
+    QApplication.processEvents()
+
+
+def test_console_prefixes(console):
+    from preditor.gui.codehighlighter import ConsoleCodeHighlighter
+
+    console.clear()
+
+    highlighter = console.codeHighlighter()
+    assert isinstance(highlighter, ConsoleCodeHighlighter)
+    assert not highlighter.isConsoleMode()
+    assert highlighter.consolePrefixes() == ('>>>',)
+
+    # Every line of the console is highlighted, including result lines and
+    # the output of the executed code.
+    console.show()
+    append(console, ">>> if True: pass\nif 'output'\n#Result: 5")
+    document = console.document()
+    assert has_formats(document, 0)
+    assert has_formats(document, 1)
+    assert [
+        (r.start, r.length) for r in document.findBlockByNumber(2).layout().formats()
+    ] == [(0, 10)]
+
+    # In console mode only lines starting with the prompt are highlighted
+    highlighter.setConsoleMode(True)
+    highlighter.rehighlight()
+    assert has_formats(document, 0)
+    assert not has_formats(document, 1)
+    assert not has_formats(document, 2)
+
+
+def test_console_deferred(console):
+    from Qt.QtGui import QTextCursor
+    from Qt.QtWidgets import QApplication
+
+    highlighter = console.codeHighlighter()
+    document = console.document()
+    console.clear()
+
+    # Blocks added while the console is hidden are deferred
+    append(console, "\n".join(">>> if {}: pass".format(i) for i in range(100)))
+    assert highlighter.deferredCount() == 100
+    assert not has_formats(document, 0)
+
+    # Showing the console only highlights the visible blocks. The console
+    # shows the end of its text.
+    console.show()
+    QApplication.processEvents()
+    scrollbar = console.verticalScrollBar()
+    assert scrollbar.value() == scrollbar.maximum()
+    assert has_formats(document, 99)
+    assert not has_formats(document, 0)
+    assert 0 < highlighter.deferredCount() < 100
+
+    # Deferred blocks are highlighted when scrolled into view
+    scrollbar.setValue(0)
+    QApplication.processEvents()
+    assert has_formats(document, 0)
+
+    # Blocks appended while scrolled to the bottom are highlighted
+    scrollbar.setValue(scrollbar.maximum())
+    QApplication.processEvents()
+    count = highlighter.deferredCount()
+    append(console, "\n>>> if True: pass")
+    last = document.blockCount() - 1
+    assert has_formats(document, last)
+    assert highlighter.deferredCount() == count
+
+    # Blocks appended while scrolled up are deferred until scrolled into view
+    scrollbar.setValue(0)
+    QApplication.processEvents()
+    append(console, "\n>>> if True: pass")
+    last = document.blockCount() - 1
+    assert not has_formats(document, last)
+    assert highlighter.deferredCount() == count + 1
+    scrollbar.setValue(scrollbar.maximum())
+    QApplication.processEvents()
+    assert has_formats(document, last)
+
+    # Deferred blocks stay deferred when text is inserted above them
+    scrollbar.setValue(0)
+    QApplication.processEvents()
+    before = [block.text() for block in highlighter.deferredBlocks()]
+    assert before
+    console.moveCursor(QTextCursor.MoveOperation.Start)
+    console.insertPlainText("inserted\ninserted\n")
+    QApplication.processEvents()
+    assert [block.text() for block in highlighter.deferredBlocks()] == before
+
+    # All deferred blocks can be highlighted
+    highlighter.highlightDeferredBlocks()
+    assert highlighter.deferredCount() == 0
+    prompts = [
+        i
+        for i in range(document.blockCount())
+        if document.findBlockByNumber(i).text().startswith('>>> if')
+    ]
+    assert all(has_formats(document, i) for i in prompts)
+
+    # Clearing the console doesn't leave blocks waiting to be highlighted
+    console.hide()
+    append(console, "\n>>> if True: pass")
+    assert highlighter.deferredCount()
+    console.clear()
+    assert highlighter.deferredCount() == console.document().blockCount()
@@ -21,3 +21,72 @@ def pref_root(tmp_path):
     path.mkdir()
     os.environ["PREDITOR_PREF_PATH"] = str(path)
     return path
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    """A QApplication instance for tests that need to create widgets.
+
+    Uses the offscreen platform if not otherwise configured so tests can run
+    without a display.
+    """
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from Qt.QtWidgets import QApplication
+
+    app = QApplication.instance()
+    if app is None:
+        app = QApplication([])
+    return app
+
+
+@pytest.fixture()
+def workbox_manager(qapp, tmp_path, monkeypatch):
+    """A GroupTabWidget without any tabs that workboxes can be added to.
+
+    It is parented to a widget providing the parts of the LoggerWindow api used
+    by workboxes and their tab bars, without the cost of creating a LoggerWindow.
+    """
+    from Qt.QtCore import QEvent
+    from Qt.QtWidgets import QApplication, QCheckBox, QWidget
+
+    from preditor.gui.group_tab_widget.group_tab_widget import GroupTabWidget
+    from preditor.prefs import get_prefs_dir
+
+    class Window(QWidget):
+        def __init__(self, core_name):
+            super(Window, self).__init__()
+            self.name = core_name
+            self.boxesOrphanedViaInstance = {}
+            self.latestTimeStrsForBoxesChangedViaInstance = {}
+            self.uiExtraTooltipInfoCHK = QCheckBox(self)
+            self.uiWorkboxTAB = GroupTabWidget(core_name=core_name, parent=self)
+
+        def current_workbox(self):
+            return self.uiWorkboxTAB.current_groups_widget()
+
+        def focusToWorkbox(self):  # noqa: N802
+            pass
+
+        def indexOfWorkboxOrTabGroup(self, widget):  # noqa: N802
+            return None
+
+        def setFileMonitoringEnabled(self, filename, state, workbox=None):  # noqa: N802
+            pass
+
+        def setWorkboxFontBasedOnConsole(self, workbox=None):  # noqa: N802
+            pass
+
+        def updateTabColorsAndToolTips(self):  # noqa: N802
+            pass
+
+    # Use a per-test prefs dir, restoring the shared prefs dir afterwards
+    monkeypatch.setenv("PREDITOR_PREF_PATH", str(tmp_path / "_prefs"))
+    core_name = "test_workboxes"
+    get_prefs_dir(core_name=core_name, create=True)
+    window = Window(core_name)
+    yield window.uiWorkboxTAB
+    window.close()
+    window.deleteLater()
+    # Delete the window now, so timers like the debounced tab updates don't
+    # fire after its python wrapper is garbage collected.
+    QApplication.sendPostedEvents(None, QEvent.Type.DeferredDelete)
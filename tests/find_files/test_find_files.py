@@ -1,4 +1,5 @@
 import os
+from pathlib import Path
 
 import pytest
 
@@ -72,3 +73,424 @@ def test_find_files(capsys, check_type, search_text, is_cs, context, is_re):
     #     print([line])
 
     assert captured.out == check
+
+
+class Editor(object):
+    """Provides the workbox api used by FindFiles."""
+
+    def __init__(self, text, workbox_name):
+        self.text = text
+        self.workbox_name = workbox_name
+
+    def __snapshot_file__(self):
+        return None, None
+
+    def __text_snapshot__(self):
+        return self.text
+
+    def __workbox_id__(self):
+        return self.workbox_name
+
+    def __workbox_name__(self):
+        return self.workbox_name
+
+
+class Manager(object):
+    """Provides the `all_widgets` api of GroupTabWidget used by FindFiles."""
+
+    def __init__(self, editors):
+        self.editors = editors
+
+    def all_widgets(self):
+        for i, editor in enumerate(self.editors):
+            yield editor, "Group {}".format(i), "Tab", i, 0
+
+
+@pytest.fixture()
+def find_files(qapp):
+    from Qt.QtWidgets import QTextEdit
+
+    from preditor.gui.find_files import FindFiles
+
+    find_files = FindFiles(console=QTextEdit())
+    yield find_files
+    find_files.cancel()
+    find_files.pool.waitForDone()
+    find_files.renderer.flush()
+
+
+def console_text(console):
+    """Returns the text of console using the markdown links of the print
+    callbacks so it can be compared to the golden files."""
+    lines = []
+    block = console.document().begin()
+    while block.isValid():
+        line = []
+        it = block.begin()
+        while not it.atEnd():
+            fragment = it.fragment()
+            fmt = fragment.charFormat()
+            if fmt.isAnchor():
+                line.append(
+                    '[{}]({} "{}")'.format(
+                        fragment.text(), fmt.anchorHref(), fmt.toolTip()
+                    )
+                )
+            else:
+                line.append(fragment.text())
+            it += 1
+        lines.append("".join(line))
+        block = block.next()
+    return "\n".join(lines)
+
+
+def wait_for_results(find_files):
+    from Qt.QtWidgets import QApplication
+
+    while find_files.searching() or find_files.renderer.pending():
+        QApplication.processEvents()
+
+
+def run_find(find_files, search_text, is_cs=False, context=2, is_re=False):
+    find_files.console.clear()
+    find_files.uiFindTXT.setText(search_text)
+    find_files.uiCaseSensitiveBTN.setChecked(is_cs)
+    find_files.uiContextSPN.setValue(context)
+    find_files.uiRegexBTN.setChecked(is_re)
+    find_files.find()
+    wait_for_results(find_files)
+    return console_text(find_files.console)
+
+
+def expected_threaded(editors, search_text, is_cs, context, is_re):
+    """Returns the output of searching each of editors one at a time."""
+    check_type = "re_greedy" if is_re else "simple"
+    check_filename = "{}_{}_{}_{}.md".format(check_type, is_cs, context, is_re)
+    check = text_for_test(check_filename)
+    search = RegexTextSearch if is_re else SimpleTextSearch
+    title = search(search_text, case_sensitive=is_cs, context=context).title()
+    assert check.startswith(title + "\n")
+    body = check[len(title) + 1 :]
+
+    expected = [title]
+    count = 0
+    for i, editor in enumerate(editors):
+        if editor.workbox_name == "empty":
+            continue
+        count += 1
+        path = "Group {}/Tab".format(i)
+        body_i = body.replace("First Group/First Tab", path)
+        expected.append(body_i.replace(", 1,2, ", ", {}, ".format(editor.workbox_name)))
+    # Each match is a link, the path link at the start of each file is not
+    matches = (body.count("](") - 1) * count
+    expected.append("\n{} matches in {} workboxes\n".format(matches, count))
+    return "".join(expected)
+
+
+def threaded_editors(count=20):
+    text = text_for_test("tab_text.txt")
+    editors = [Editor(text, "{},0".format(i)) for i in range(count)]
+    # Include a workbox without any matches
+    editors.insert(5, Editor("no matches", "empty"))
+    return editors
+
+
+@pytest.mark.parametrize(
+    "search_text,is_cs,context,is_re",
+    (
+        ("search term", False, 2, False),
+        ("search.+term", True, 2, True),
+    ),
+)
+def test_find_files_threaded(find_files, search_text, is_cs, context, is_re):
+    editors = threaded_editors()
+    find_files.managers = [Manager(editors)]
+
+    # Write the results in small batches to check that they are written in
+    # the order of the workboxes, exactly like searching them one at a time.
+    find_files.renderer.budget = 0
+    out = run_find(find_files, search_text, is_cs, context, is_re)
+
+    assert out == expected_threaded(editors, search_text, is_cs, context, is_re)
+    assert not find_files.searching()
+    assert find_files.renderer.held_count() == 0
+
+
+def test_find_files_limit(find_files):
+    editors = threaded_editors()
+    find_files.managers = [Manager(editors)]
+    expected = expected_threaded(editors, "search term", False, 2, False)
+
+    # Only the results of the first workboxes are written
+    find_files.renderer.limit = 10
+    out = run_find(find_files, "search term")
+    more = '\n[... only the first 10 results are shown, click to show more]({} "{}")\n'
+    more = more.format(find_files.renderer.more_href, "Show more results")
+    assert more in out
+    assert find_files.renderer.held_count() > 0
+    # The search summary is still written after the "more results" link
+    summary = expected[expected.rindex("\n", 0, -1) :]
+    assert summary.endswith(" matches in 20 workboxes\n")
+    assert out.endswith(summary)
+    shown = out[: out.index(more)]
+    assert expected.startswith(shown)
+
+    # Expanding the results keeps expanding until all results are shown
+    find_files.renderer.limit = 50
+    while find_files.renderer.held_count():
+        find_files.renderer.expand()
+        wait_for_results(find_files)
+    assert console_text(find_files.console) == expected
+
+    # Searching again resets the limit
+    find_files.renderer.limit = 2000
+    assert run_find(find_files, "search term") == expected
+
+
+def test_find_files_export(find_files, tmp_path):
+    import json
+
+    editors = threaded_editors(3)
+    find_files.managers = [Manager(editors)]
+    out = run_find(find_files, "search term", context=0)
+
+    # The structured results match what was written to the console
+    results = find_files.results
+    assert [r.path for r in results] == ["Group 0/Tab", "Group 1/Tab", "Group 2/Tab"]
+    assert [r.workbox_id for r in results] == ["0,0", "1,0", "2,0"]
+    count = sum(r.match_count for r in results)
+    assert out.endswith("\n{} matches in 3 workboxes\n".format(count))
+
+    filename = tmp_path / "results.json"
+    find_files.export_results(str(filename))
+    data = json.loads(filename.read_text())
+    assert len(data) == count
+    assert data[0]["path"] == "Group 0/Tab"
+    assert data[0]["text"].lower() == "search term"
+
+    filename = tmp_path / "results.txt"
+    find_files.export_results(str(filename), grep=True)
+    lines = filename.read_text().splitlines()
+    assert len(lines) == count
+    first = data[0]
+    assert lines[0].startswith(
+        "Group 0/Tab:{}:{}:".format(first["line_num"], first["column"] + 1)
+    )
+
+
+def test_find_files_cancel(find_files, monkeypatch):
+    text = text_for_test("tab_text.txt")
+    find_files.managers = [Manager([Editor(text, str(i)) for i in range(200)])]
+
+    # Cancel the search when the first result is added to the renderer
+    add = find_files.renderer.add
+
+    def cancel(fragments):
+        add(fragments)
+        if any(matching for matching, _ in fragments):
+            find_files.cancel()
+
+    monkeypatch.setattr(find_files.renderer, "add", cancel)
+    out = run_find(find_files, "search term")
+
+    assert out.count("Search cancelled") == 1
+    assert out.endswith("\n0 matches in 0 workboxes\n")
+
+
+def test_find_files_unloaded(find_files, workbox_manager, tmp_path):
+    from preditor.gui.workbox_text_edit import WorkboxTextEdit
+    from preditor.prefs import create_stamped_path
+
+    manager = workbox_manager
+    core_name = manager.core_name
+    group, _ = manager.default_tab("Group")
+    manager.addTab(group, "Group")
+
+    def add_workbox(name, **kwargs):
+        editor = WorkboxTextEdit(parent=group, core_name=core_name, **kwargs)
+        group.addTab(editor, name)
+        return editor
+
+    # A workbox with older and newer backups, only the newest is searched
+    backup = add_workbox("Backup")
+    older = create_stamped_path(core_name, backup.__workbox_id__(), time_str="1")
+    Path(older).write_text("old search term\n")
+    newer = create_stamped_path(core_name, backup.__workbox_id__(), time_str="2")
+    Path(newer).write_text("new search term\n")
+
+    # A workbox linked to a file
+    linked_file = tmp_path / "linked.py"
+    linked_file.write_text("linked search term\n")
+    linked = add_workbox("Linked", filename=str(linked_file))
+
+    # A workbox without any backups
+    empty = add_workbox("Empty")
+
+    # A loaded workbox uses its current text, not the backup
+    loaded = add_workbox("Loaded")
+    loaded.__set_text__("loaded search term\n")
+
+    find_files.managers = [manager]
+    out = run_find(find_files, "search term")
+
+    assert "old search term" not in out
+    assert "new [search term]" in out
+    assert "linked [search term]" in out
+    assert "loaded [search term]" in out
+    assert out.endswith("\n3 matches in 3 workboxes\n")
+
+    # Searching didn't load any of the workboxes
+    assert not backup._is_loaded
+    assert not linked._is_loaded
+    assert not empty._is_loaded
+    assert loaded._is_loaded
+
+
+def test_find_files_trigram_index(find_files, workbox_manager, monkeypatch):
+    import threading
+
+    from preditor.gui.find_files import FindFilesTask
+    from preditor.gui.workbox_text_edit import WorkboxTextEdit
+    from preditor.prefs import create_stamped_path
+    from preditor.utils.trigram_index import get_trigram_index
+
+    manager = workbox_manager
+    core_name = manager.core_name
+    group, _ = manager.default_tab("Group")
+    manager.addTab(group, "Group")
+
+    editors = []
+    for i in range(10):
+        editor = WorkboxTextEdit(parent=group, core_name=core_name)
+        group.addTab(editor, "Workbox{}".format(i))
+        text = "search term\n" if i in (2, 7) else "other text\n"
+        path = create_stamped_path(core_name, editor.__workbox_id__())
+        Path(path).write_text(text)
+        editors.append(editor)
+
+    # Record the workboxes whose text is read and the thread reading it
+    read = []
+    threads = set()
+    workbox_ids = [editor.__workbox_id__() for editor in editors]
+    original = FindFilesTask.read
+
+    def record(task):
+        read.append(workbox_ids.index(task.workbox_id))
+        threads.add(threading.current_thread())
+        original(task)
+
+    monkeypatch.setattr(FindFilesTask, "read", record)
+
+    # The first search reads every workbox and adds them to the index
+    find_files.managers = [manager]
+    out = run_find(find_files, "search term")
+    assert out.endswith("\n2 matches in 2 workboxes\n")
+    assert sorted(read) == list(range(10))
+    # The backup files are read in the thread pool
+    assert threading.main_thread() not in threads
+    index = get_trigram_index(core_name)
+    assert len(index) == 10
+    assert not index.is_dirty()
+
+    # Searching again only reads the workboxes that may match
+    read[:] = []
+    out = run_find(find_files, "search term")
+    assert out.endswith("\n2 matches in 2 workboxes\n")
+    assert sorted(read) == [2, 7]
+
+    # A new backup file is not in the index so it is read and indexed
+    read[:] = []
+    path = create_stamped_path(core_name, editors[4].__workbox_id__(), time_str="3")
+    Path(path).write_text("new search term\n")
+    out = run_find(find_files, "search term")
+    assert out.endswith("\n3 matches in 3 workboxes\n")
+    assert sorted(read) == [2, 4, 7]
+    assert not index.is_dirty()
+
+
+def test_find_files_history(find_files, workbox_manager):
+    from preditor.gui.workbox_text_edit import WorkboxTextEdit
+    from preditor.prefs import create_stamped_path
+
+    manager = workbox_manager
+    core_name = manager.core_name
+    group, _ = manager.default_tab("Group")
+    manager.addTab(group, "Group")
+    editor = WorkboxTextEdit(parent=group, core_name=core_name)
+    group.addTab(editor, "Workbox")
+    workbox_id = editor.__workbox_id__()
+
+    versions = (
+        ("2024-01-01-10-00-00-000000", "one search term\n"),
+        ("2024-01-02-10-00-00-000000", "one search term\ntwo search term\n"),
+        # An unchanged version is only searched once
+        ("2024-01-03-10-00-00-000000", "one search term\ntwo search term\n"),
+        ("2024-01-04-10-00-00-000000", "other text\n"),
+        # A line removed and added back again is not shown again
+        ("2024-01-05-10-00-00-000000", "one search term\nthree search term\n"),
+    )
+    for time_str, text in versions:
+        path = create_stamped_path(core_name, workbox_id, time_str=time_str)
+        Path(path).write_text(text)
+
+    find_files.managers = [manager]
+    find_files.uiHistoryBTN.setChecked(True)
+    out = run_find(find_files, "search term", context=0)
+
+    # Results are grouped by version, newest first. Each match is only shown
+    # for the first version it was added in.
+    def link(text, time_str, line_num, tool_tip):
+        backup_file = "{0}/{0}-{1}.py".format(workbox_id, time_str)
+        href = ", Group/Workbox, {}, {}".format(line_num, backup_file)
+        return '[{}]({} "{}")'.format(text, href, tool_tip)
+
+    expected = []
+    for time_str, display, lines in (
+        ("2024-01-05-10-00-00-000000", "2024-01-05 10:00:00", {2: "three"}),
+        ("2024-01-02-10-00-00-000000", "2024-01-02 10:00:00", {2: "two"}),
+        ("2024-01-01-10-00-00-000000", "2024-01-01 10:00:00", {1: "one"}),
+    ):
+        path = "Group/Workbox ({})".format(display)
+        expected.append("# File: " + link(path, time_str, 0, "Open " + path))
+        for line_num, prefix in lines.items():
+            tool_tip = "Open {} at line number {}".format(path, line_num)
+            term = link("search term", time_str, line_num, tool_tip)
+            expected.append("  {}: {} {}".format(line_num, prefix, term))
+    expected.append("")
+    expected.append("3 matches in 1 workboxes")
+    expected.append("")
+    title = SimpleTextSearch("search term", context=0).title()
+    assert out == title + "\n".join(expected)
+
+    # Searching history doesn't load the workbox
+    assert not editor._is_loaded
+
+
+def test_load_workbox_backup_file(workbox_manager):
+    from preditor.gui.workbox_text_edit import WorkboxTextEdit
+    from preditor.prefs import create_stamped_path, get_relative_path
+
+    manager = workbox_manager
+    core_name = manager.core_name
+    group, _ = manager.default_tab("Group")
+    manager.addTab(group, "Group")
+    editor = WorkboxTextEdit(parent=group, core_name=core_name)
+    group.addTab(editor, "Workbox")
+    workbox_id = editor.__workbox_id__()
+
+    paths = []
+    for i in range(3):
+        path = create_stamped_path(core_name, workbox_id, time_str=str(i))
+        Path(path).write_text("version {}\n".format(i))
+        paths.append(path)
+
+    versions = editor.__history_versions__()
+    assert [version[2] for version in versions] == paths
+    backup_file = get_relative_path(core_name, paths[1])
+    assert versions[1][1] == backup_file
+
+    filename, idx, count = editor.__load_workbox_backup_file__(backup_file)
+    assert filename == Path(paths[1]).name
+    assert (idx, count) == (2, 3)
+    assert editor.__text__() == "version 1\n"
+    assert editor.__backup_file__() == backup_file
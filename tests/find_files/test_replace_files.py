@@ -0,0 +1,182 @@
+from pathlib import Path
+
+import pytest
+
+from preditor.utils.text_search import RegexTextSearch, SimpleTextSearch
+
+TEXT = """def helper(value):
+    return Helper(value)
+
+
+print(helper(1), HELPER)
+"""
+
+
+@pytest.mark.parametrize(
+    "finder,replace_text,check",
+    (
+        (
+            SimpleTextSearch("helper", case_sensitive=False),
+            "tool",
+            "def tool(value):\n    return tool(value)\n\n\nprint(tool(1), tool)\n",
+        ),
+        (
+            SimpleTextSearch("helper", case_sensitive=True),
+            "tool",
+            "def tool(value):\n    return Helper(value)\n\n\nprint(tool(1), HELPER)\n",
+        ),
+        (
+            RegexTextSearch(r"helper\((\w+)\)", case_sensitive=True),
+            r"tool(\1, 2)",
+            TEXT.replace("helper(1)", "tool(1, 2)").replace(
+                "helper(value)", "tool(value, 2)"
+            ),
+        ),
+        (
+            RegexTextSearch(r"(?P<name>help)er", case_sensitive=False),
+            r"\g<name>ing",
+            # Groups keep the case of the matched text
+            "def helping(value):\n    return Helping(value)\n\n\n"
+            "print(helping(1), HELPing)\n",
+        ),
+        # Anchored patterns are matched at the start of each line
+        (
+            RegexTextSearch(r"^(\s+)return", case_sensitive=True),
+            r"\1yield",
+            TEXT.replace("return", "yield"),
+        ),
+    ),
+)
+def test_replacements(finder, replace_text, check):
+    replacements = finder.replacements(TEXT, replace_text)
+    assert finder.apply_replacements(TEXT, replacements) == check
+    for replacement in replacements:
+        assert TEXT[replacement.start : replacement.end] == replacement.old
+        line = TEXT.splitlines()[replacement.line_num - 1]
+        column = replacement.column
+        assert line[column : column + len(replacement.old)] == replacement.old
+
+
+def test_replacements_subset():
+    finder = SimpleTextSearch("helper")
+    replacements = finder.replacements(TEXT, "tool")
+    assert [(r.line_num, r.column, r.old) for r in replacements] == [
+        (1, 4, "helper"),
+        (2, 11, "Helper"),
+        (5, 6, "helper"),
+        (5, 17, "HELPER"),
+    ]
+    # Any subset of the replacements can be applied
+    check = TEXT.replace("Helper", "tool").replace("HELPER", "tool")
+    assert finder.apply_replacements(TEXT, replacements[1::2]) == check
+
+
+def test_replacements_invalid_group():
+    import re
+
+    finder = RegexTextSearch("helper")
+    with pytest.raises(re.error):
+        finder.replacements(TEXT, r"\1")
+
+
+@pytest.fixture()
+def workboxes(workbox_manager):
+    from preditor.gui.workbox_text_edit import WorkboxTextEdit
+    from preditor.prefs import create_stamped_path
+
+    manager = workbox_manager
+    core_name = manager.core_name
+    group, _ = manager.default_tab("Group")
+    manager.addTab(group, "Group")
+
+    editors = {}
+    for name in ("Loaded", "Unloaded", "Unchecked", "Other"):
+        editor = WorkboxTextEdit(parent=group, core_name=core_name)
+        group.addTab(editor, name)
+        text = "other text\n" if name == "Other" else TEXT
+        if name == "Loaded":
+            editor.__set_text__(text)
+        else:
+            path = create_stamped_path(core_name, editor.__workbox_id__())
+            Path(path).write_text(text)
+        editors[name] = editor
+    return manager, editors
+
+
+def test_replace_files(workboxes):
+    from Qt.QtCore import Qt
+
+    from preditor.gui.replace_files import ReplaceFiles
+
+    manager, editors = workboxes
+    finder = RegexTextSearch(r"helper\((\w+)\)", case_sensitive=False)
+    dialog = ReplaceFiles(finder, r"tool(\1)", [manager])
+
+    # A preview of each match is shown, all of them are checked
+    tree = dialog.uiMatchesTREE
+    assert tree.topLevelItemCount() == 3
+    assert [tree.topLevelItem(i).text(0) for i in range(3)] == [
+        "Group/Loaded",
+        "Group/Unloaded",
+        "Group/Unchecked",
+    ]
+    item = tree.topLevelItem(0)
+    assert item.childCount() == 3
+    child = item.child(1)
+    assert [child.text(i) for i in range(3)] == [
+        "2",
+        "return Helper(value)",
+        "return tool(value)",
+    ]
+    assert child.checkState(0) == Qt.CheckState.Checked
+
+    # Un-check some of the matches
+    item.child(0).setCheckState(0, Qt.CheckState.Unchecked)
+    assert item.checkState(0) == Qt.CheckState.PartiallyChecked
+    tree.topLevelItem(2).setCheckState(0, Qt.CheckState.Unchecked)
+    assert tree.topLevelItem(2).child(0).checkState(0) == Qt.CheckState.Unchecked
+
+    # Finding the matches didn't load any of the workboxes
+    assert not editors["Unloaded"]._is_loaded
+    assert not editors["Unchecked"]._is_loaded
+
+    dialog.accept()
+    assert dialog.summary == "\n5 matches replaced in 2 workboxes\n"
+
+    loaded = editors["Loaded"]
+    check = "def helper(value):\n    return tool(value)\n\n\nprint(tool(1), HELPER)\n"
+    assert loaded.__text__() == check
+    # Workboxes are only loaded if replacements are applied to them
+    unloaded = editors["Unloaded"]
+    assert unloaded._is_loaded
+    assert unloaded.__text__() == TEXT.replace("helper(", "tool(").replace(
+        "Helper(", "tool("
+    )
+    assert not editors["Unchecked"]._is_loaded
+    assert not editors["Other"]._is_loaded
+
+    # The replacements in each workbox are undone in a single step
+    loaded.undo()
+    assert loaded.__text__() == TEXT
+    unloaded.undo()
+    assert unloaded.__text__() == TEXT
+
+
+def test_replace_files_changed(workboxes):
+    from preditor.gui.replace_files import ReplaceFiles
+
+    manager, editors = workboxes
+    finder = SimpleTextSearch("helper", case_sensitive=True)
+    dialog = ReplaceFiles(finder, "tool", [manager])
+
+    # Matches that changed since the preview was shown are skipped
+    loaded = editors["Loaded"]
+    loaded.__set_text__(TEXT.replace("def helper", "def other"))
+    summary = dialog.apply()
+    assert summary == (
+        "\n5 matches replaced in 3 workboxes\n"
+        "1 matches were skipped as the workbox changed since the preview\n"
+    )
+    assert loaded.__text__() == TEXT.replace("def helper", "def other").replace(
+        "helper", "tool"
+    )
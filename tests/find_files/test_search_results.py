@@ -0,0 +1,149 @@
+import json
+
+from preditor.utils.search_results import SearchMatch, to_grep, to_json
+from preditor.utils.text_search import RegexTextSearch, SimpleTextSearch
+
+TEXT = """import os
+
+def helper(path):
+    # Call helper
+    return os.path.exists(path)
+
+
+print(helper("a"))
+"""
+
+
+def test_search_results():
+    finder = SimpleTextSearch("helper", context=1)
+    result = finder.search_results(
+        TEXT, "Group/Tab", "1,2", workbox_id="group-tab", backup_file="a/b.py"
+    )
+    assert result.path == "Group/Tab"
+    assert result.workbox_id == "group-tab"
+    assert result.backup_file == "a/b.py"
+    assert result.match_count == 3
+
+    # Only the matching lines and their context are included
+    assert [(line.line_num, line.spans) for line in result.lines] == [
+        (2, ()),
+        (3, ((4, 10),)),
+        (4, ((11, 17),)),
+        (5, ()),
+        (7, ()),
+        (8, ((6, 12),)),
+    ]
+
+    matches = list(result.matches())
+    assert matches[0] == SearchMatch(
+        workbox_id="group-tab",
+        workbox_name="1,2",
+        path="Group/Tab",
+        backup_file="a/b.py",
+        line_num=3,
+        column=4,
+        end=10,
+        text="helper",
+        line="def helper(path):",
+        before=("",),
+        after=("    # Call helper",),
+    )
+    assert matches[1].before == ("def helper(path):",)
+    assert matches[1].after == ("    return os.path.exists(path)",)
+    assert matches[2].line == 'print(helper("a"))'
+
+
+def test_search_results_no_match():
+    finder = SimpleTextSearch("missing")
+    assert finder.search_results(TEXT) is None
+    # Rendering without results doesn't write anything
+    assert finder.search_text(TEXT, "Group/Tab", "1,2") is False
+
+
+def test_search_results_regex_spans():
+    finder = RegexTextSearch(r"(os|path)\b", case_sensitive=True, context=0)
+    result = finder.search_results(TEXT, "Group/Tab", "1,2")
+    assert [(m.line_num, m.column, m.text) for m in result.matches()] == [
+        (1, 7, "os"),
+        (3, 11, "path"),
+        (5, 11, "os"),
+        (5, 14, "path"),
+        (5, 26, "path"),
+    ]
+
+
+def test_line_compatibility(capsys):
+    cleared = []
+
+    class Finder(SimpleTextSearch):
+        def clear_cache(self):
+            cleared.append(True)
+
+    # Finders can still clear their cache for lines without matches
+    finder = Finder("helper", context=1)
+    finder.search_results(TEXT)
+    assert len(cleared) == 4
+
+    # Lines can be written without creating a SearchLine
+    finder._padding = 1
+    info = dict(path="Group/Tab", workbox_name="1,2")
+    assert finder.insert_lines(2, "def helper(path):\n", "pass\n", info=info) == 3
+    finder.indicate_results("helper()\n", 9, **info)
+    assert capsys.readouterr().out.splitlines() == [
+        '  3: def [helper](, 1,2, 3 "Open Group/Tab at line number 3")(path):',
+        "  4  pass",
+        '  9: [helper](, 1,2, 9 "Open Group/Tab at line number 9")()',
+    ]
+    assert finder.match_count == 2
+
+
+def test_exporters():
+    finder = SimpleTextSearch("helper", context=0)
+    results = [
+        finder.search_results(TEXT, "Group/First", "1,0", workbox_id="first"),
+        finder.search_results("other helper\n", "Group/Second", "1,1"),
+    ]
+
+    assert to_grep(results) == (
+        "Group/First:3:5:def helper(path):\n"
+        "Group/First:4:12:    # Call helper\n"
+        'Group/First:8:7:print(helper("a"))\n'
+        "Group/Second:1:7:other helper\n"
+    )
+
+    data = json.loads(to_json(results))
+    assert len(data) == 4
+    assert data[0] == {
+        "workbox_id": "first",
+        "workbox_name": "1,0",
+        "path": "Group/First",
+        "backup_file": None,
+        "line_num": 3,
+        "column": 4,
+        "end": 10,
+        "text": "helper",
+        "line": "def helper(path):",
+        "before": [],
+        "after": [],
+    }
+    assert data[3]["workbox_id"] is None
+
+
+def test_search_workboxes(workbox_manager):
+    from preditor.gui.find_files import search_workboxes
+    from preditor.gui.workbox_text_edit import WorkboxTextEdit
+
+    manager = workbox_manager
+    group, _ = manager.default_tab("Group")
+    manager.addTab(group, "Group")
+    for name, text in (("Other", "no matches\n"), ("Tab", TEXT)):
+        editor = WorkboxTextEdit(parent=group, core_name=manager.core_name)
+        group.addTab(editor, name)
+        editor.__set_text__(text)
+
+    results = search_workboxes([manager], SimpleTextSearch("helper"))
+    assert len(results) == 1
+    assert results[0].path == "Group/Tab"
+    assert results[0].workbox_id == editor.__workbox_id__()
+    assert results[0].workbox_name == editor.__workbox_name__()
+    assert results[0].match_count == 3
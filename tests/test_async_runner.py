@@ -0,0 +1,105 @@
+import asyncio
+
+import pytest
+
+from preditor.utils.async_runner import AsyncRunner
+
+
+def test_result():
+    async def coro():
+        await asyncio.sleep(0)
+        return 42
+
+    runner = AsyncRunner()
+    assert runner.run(coro()) == 42
+    # The loop is re-used between runs
+    loop = runner.loop
+    assert runner.run(coro()) == 42
+    assert runner.loop is loop
+    runner.close()
+
+
+def test_process_events():
+    calls = []
+    runner = AsyncRunner(process_events=lambda: calls.append(1), interval=0.001)
+    runner.run(asyncio.sleep(0.05))
+    assert len(calls) > 1
+    # The pump is not called once the coroutine has finished
+    count = len(calls)
+    runner.run(asyncio.sleep(0))
+    assert len(calls) - count <= 1
+    runner.close()
+
+
+def test_nested_run():
+    runner = AsyncRunner()
+
+    async def nested():
+        inner = asyncio.sleep(0)
+        runner.run(inner)
+
+    with pytest.raises(RuntimeError):
+        runner.run(nested())
+    runner.close()
+
+
+def test_top_level_await(qapp):
+    from preditor.gui.console import ConsolePrEdit
+
+    console = ConsolePrEdit(None)
+    cmdresult, wasEval = console.executeString("import asyncio")
+    assert wasEval is False
+
+    cmdresult, wasEval = console.executeString("await asyncio.sleep(0)")
+    assert cmdresult is None
+    assert wasEval is True
+
+    code = "async def _preditor_test():\n    return 'done'\n"
+    console.executeString(code)
+    cmdresult, wasEval = console.executeString("await _preditor_test()")
+    assert cmdresult == 'done'
+    assert wasEval is True
+
+    # Multiple statements are executed and values assigned to `__main__`
+    cmdresult, wasEval = console.executeString(
+        "_preditor_value = await _preditor_test()\n" "_preditor_value += '!'"
+    )
+    assert wasEval is False
+    import __main__
+
+    assert __main__._preditor_value == 'done!'
+    console.async_runner.close()
+
+
+def test_reentrant_execute(qapp):
+    import __main__
+
+    from preditor.gui.console import ConsolePrEdit
+
+    console = ConsolePrEdit(None)
+    results = []
+
+    def process_events():
+        # Simulate the user executing code while the previous await is running
+        if not results:
+            results.append(console.executeString("await asyncio.sleep(0)"))
+            results.append(console.executeString("_preditor_reentrant = True"))
+
+    console.async_runner.process_events = process_events
+    console.executeString("import asyncio")
+    cmdresult, wasEval = console.executeString("await asyncio.sleep(0.05) or 'done'")
+    assert cmdresult == 'done'
+    assert wasEval is True
+
+    # Execution is blocked until the running await finishes
+    assert results == [(None, False), (None, False)]
+    assert not hasattr(__main__, "_preditor_reentrant")
+    assert "previous top-level await is still running" in console.toPlainText()
+
+    # Once finished code can be executed again
+    console.async_runner.process_events = None
+    assert console.executeString("await asyncio.sleep(0) or 'again'") == (
+        'again',
+        True,
+    )
+    console.async_runner.close()
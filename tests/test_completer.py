@@ -0,0 +1,228 @@
+import types
+
+import pytest
+
+from preditor.gui.completer import AttributeCache, DocumentationCache
+
+
+class Slotted(object):
+    __slots__ = ("a", "_b")
+
+
+def test_attribute_cache_keys():
+    cache = AttributeCache()
+    module = types.ModuleType("sample")
+    module.public = 1
+    module._private = 2
+
+    keys = cache.keys(module)
+    assert "public" in keys
+    assert "_private" not in keys
+    hidden = cache.keys(module, hidden=True)
+    assert "_private" in hidden
+    assert "public" not in hidden
+    assert keys == sorted(keys)
+
+    # A cached list is returned until the object changes
+    assert cache.keys(module) is keys
+    module.added = 3
+    changed = cache.keys(module)
+    assert changed is not keys
+    assert "added" in changed
+
+    # Objects without a __dict__ are supported
+    assert cache.keys(Slotted()) == ["a"]
+    assert cache.keys(None, hidden=True)
+
+
+def test_attribute_cache_lru():
+    cache = AttributeCache(maxsize=2)
+    first = types.ModuleType("first")
+    second = types.ModuleType("second")
+    third = types.ModuleType("third")
+
+    keys = cache.keys(first)
+    cache.keys(second)
+    # Using first makes second the least recently used
+    assert cache.keys(first) is keys
+    cache.keys(third)
+    assert len(cache) == 2
+    assert cache.keys(first) is keys
+
+
+def test_attribute_cache_reused_id():
+    cache = AttributeCache()
+    obj = types.SimpleNamespace(first=1)
+    assert cache.keys(obj) == ["first"]
+    key = (id(obj), type(obj))
+    del obj
+    # Simulate a new object re-using the id of the deleted object
+    new = types.SimpleNamespace(second=1)
+    cache._cache[(id(new), type(new))] = cache._cache.pop(key)
+    assert cache.keys(new) == ["second"]
+
+
+@pytest.fixture()
+def console(qapp):
+    from preditor.gui.console import ConsolePrEdit
+
+    console = ConsolePrEdit(None)
+    yield console
+    console.deleteLater()
+
+
+def test_refresh_list_model(console):
+    import __main__
+
+    __main__._preditor_completer_obj = types.SimpleNamespace(alpha=1, beta=2)
+    completer = console.completer()
+    try:
+        console.setPlainText("_preditor_completer_obj.al")
+        console.moveCursor(console.textCursor().MoveOperation.End)
+        assert completer.currentPrefix() == "al"
+        assert completer.currentObject(scope=__main__.__dict__)[1] == "al"
+
+        completer.refreshList(scope=__main__.__dict__)
+        model = completer.model().sourceModel()
+        assert model.stringList() == ["alpha", "beta"]
+        assert completer.completionCount() == 1
+
+        # Typing more of the prefix doesn't rebuild the model
+        modelKeys = completer._modelKeys
+        console.insertPlainText("p")
+        completer.refreshList(scope=__main__.__dict__)
+        assert completer._modelKeys is modelKeys
+        assert completer.completionCount() == 1
+    finally:
+        del __main__._preditor_completer_obj
+
+
+def test_ranked_fuzzy(console):
+    import __main__
+
+    from preditor.gui.completer import CompleterMode
+
+    __main__._preditor_completer_obj = types.SimpleNamespace(
+        getallobjs=1, anylonglist=2, getAllObjects=3, other=4
+    )
+    completer = console.completer()
+    completer.setCompleterMode(CompleterMode.RANKED_FUZZY)
+    completer.setCaseSensitive(False)
+    try:
+        console.setPlainText("_preditor_completer_obj.gao")
+        console.moveCursor(console.textCursor().MoveOperation.End)
+        completer.refreshList(scope=__main__.__dict__)
+        model = completer.completionModel()
+        names = [model.index(i, 0).data() for i in range(model.rowCount())]
+        assert names == ["getAllObjects", "getallobjs"]
+    finally:
+        completer.setCompleterMode()
+        completer.setCaseSensitive()
+        del __main__._preditor_completer_obj
+
+
+def no_docs(value):
+    pass
+
+
+class NoSignature(object):
+    """A callable whose signature can't be found."""
+
+    @property
+    def __signature__(self):
+        raise ValueError("no signature")
+
+    def __call__(self, *args):
+        pass
+
+
+@pytest.mark.parametrize(
+    "obj,signature,docs",
+    (
+        (no_docs, "(value)", None),
+        (types.SimpleNamespace.__init__, "(self, /, *args, **kwargs)", True),
+        # Objects that are not callable don't have a signature
+        (types, None, True),
+        (5, None, True),
+        # Callable objects that don't provide a signature
+        (getattr, None, True),
+        (NoSignature(), None, "A callable whose signature can't be found."),
+    ),
+)
+def test_documentation_cache(obj, signature, docs):
+    cache = DocumentationCache()
+    sig, doc = cache.get(obj)
+    assert sig == signature
+    if docs is True:
+        assert doc
+    else:
+        assert doc == docs
+    # The result is cached
+    assert cache.get(obj) == (sig, doc)
+    assert len(cache) == 1
+
+
+def test_documentation_cache_size():
+    cache = DocumentationCache(maxsize=3)
+    for obj in (no_docs, getattr, types, str):
+        cache.get(obj)
+    assert len(cache) == 3
+    cache.setMaxsize(1)
+    assert cache.maxsize() == 1
+    assert len(cache) == 1
+
+
+def test_show_documentation(console):
+    import __main__
+    from Qt.QtCore import QPoint
+    from Qt.QtWidgets import QApplication
+
+    completer = console.completer()
+    assert completer.documentationDelay() == 300
+    completer.setDocumentationDelay(0)
+    completer.setDocumentationCacheSize(10)
+    assert completer.documentationCacheSize() == 10
+
+    __main__._preditor_no_docs = no_docs
+    __main__._preditor_no_signature = getattr
+    try:
+        console.setPlainText("_preditor_no_docs(")
+        console.moveCursor(console.textCursor().MoveOperation.End)
+        completer.showDocumentation(pos=QPoint(0, 0), scope=__main__.__dict__)
+        # The documentation is not computed until the timer times out
+        assert len(completer._documentationCache) == 0
+        assert completer._documentationTimer.isActive()
+        QApplication.processEvents()
+        assert not completer._documentationTimer.isActive()
+        assert len(completer._documentationCache) == 1
+
+        # Showing it again uses the cached documentation
+        cache = completer._documentationCache
+        computed = []
+        cache.compute = computed.append
+        try:
+            completer.showDocumentation(pos=QPoint(0, 0), scope=__main__.__dict__)
+            QApplication.processEvents()
+        finally:
+            del cache.compute
+        assert computed == []
+
+        docs = completer.documentationHtml(no_docs, "_preditor_no_docs")
+        assert "<b>_preditor_no_docs</b>(value)" in docs
+
+        # Objects without a signature only show their docstring
+        docs = completer.documentationHtml(getattr, "getattr")
+        assert "<b>getattr</b>" not in docs
+        assert "getattr(object, name[, default])" in docs
+
+        # Hiding the documentation cancels showing it
+        console.setPlainText("_preditor_no_signature(")
+        console.moveCursor(console.textCursor().MoveOperation.End)
+        completer.setDocumentationDelay(1000)
+        completer.showDocumentation(pos=QPoint(0, 0), scope=__main__.__dict__)
+        completer.hideDocumentation()
+        assert not completer._documentationTimer.isActive()
+        assert completer._documentationRequest is None
+    finally:
+        del __main__._preditor_no_docs
+        del __main__._preditor_no_signature
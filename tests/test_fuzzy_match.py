@@ -0,0 +1,98 @@
+import pytest
+
+from preditor.utils.fuzzy_match import FuzzyMatcher, rank
+
+
+@pytest.mark.parametrize(
+    "pattern,candidate,expected",
+    (
+        ("", "anything", True),
+        ("all", "allowtabs", True),
+        ("all", "getallobjs", True),
+        ("all", "anylonglist", True),
+        ("all", "alpha", False),
+        ("ALL", "allowtabs", True),
+        ("sba", "allowtabs", False),
+    ),
+)
+def test_matches(pattern, candidate, expected):
+    matcher = FuzzyMatcher(pattern)
+    assert matcher.matches(candidate) == expected
+    assert (matcher.score(candidate) is not None) == expected
+
+
+def test_case_sensitive():
+    matcher = FuzzyMatcher("All", case_sensitive=True)
+    assert matcher.score("allowtabs") is None
+    assert matcher.score("getAllObjects") is not None
+
+
+@pytest.mark.parametrize(
+    "pattern,better,worse",
+    (
+        # Prefix
+        ("set", "setText", "resetText"),
+        # Word boundary
+        ("gt", "get_text", "gather"),
+        # camelCase hump
+        ("gt", "getText", "gather"),
+        # snake_case humps are better than a letter inside a word
+        ("gao", "get_all_objs", "getallobjs"),
+        # Contiguity
+        ("text", "setText", "setTabExtent"),
+        # Leading characters
+        ("ab", "xab", "xxxxxxxxab"),
+    ),
+)
+def test_score_order(pattern, better, worse):
+    matcher = FuzzyMatcher(pattern)
+    assert matcher.score(better) > matcher.score(worse)
+
+
+def test_rank():
+    candidates = ["anylonglist", "findallnames", "getallobjs", "allowtabs", "alpha"]
+    assert rank("all", candidates) == [
+        "allowtabs",
+        "getallobjs",
+        "findallnames",
+        "anylonglist",
+    ]
+    assert rank("all", candidates, limit=2) == ["allowtabs", "getallobjs"]
+    # Ties are sorted by length then alphabetically
+    assert rank("a", ["abc", "ab", "aa"]) == ["aa", "ab", "abc"]
+    # An empty pattern returns everything in that order.
+    assert rank("", ["b", "a"]) == ["a", "b"]
+
+
+def test_rank_key():
+    matcher = FuzzyMatcher("wb")
+    items = [{"name": "group/other"}, {"name": "group/workbox"}]
+    ranked = matcher.rank(items, key=lambda item: item["name"])
+    assert [item for _, item in ranked] == [items[1]]
+    assert ranked[0][0] == matcher.score("group/workbox")
+
+
+def test_proxy_model(qapp):
+    from Qt.QtGui import QStandardItem, QStandardItemModel
+
+    from preditor.gui.group_tab_widget.grouped_tab_models import (
+        GroupTabFuzzyFilterProxyModel,
+    )
+
+    names = ["Group01/workbox", "Group01/tab", "Tools/whiteboard"]
+    source = QStandardItemModel()
+    for name in names:
+        source.appendRow(QStandardItem(name))
+    proxy = GroupTabFuzzyFilterProxyModel()
+    proxy.setSourceModel(source)
+
+    def rows():
+        return [proxy.index(i, 0).data() for i in range(proxy.rowCount())]
+
+    proxy.setFuzzySearch("wb")
+    assert rows() == ["Group01/workbox", "Tools/whiteboard"]
+    proxy.setFuzzySearch("whb")
+    assert rows() == ["Tools/whiteboard"]
+    # Clearing the search restores the original order
+    proxy.setFuzzySearch("")
+    assert rows() == names
@@ -36,3 +36,30 @@ def test_pref_root(pref_root, tmp_path):
     # Verify that preditor actually uses the env var.
     prefs_path = preditor.prefs.prefs_path()
     assert prefs_path == path
+
+
+def test_get_latest_backup_infos(pref_root):
+    core_name = "test_backups"
+    workbox_dir = Path(preditor.prefs.get_prefs_dir(core_name=core_name, create=True))
+    for workbox_id, count in (("workbox_a", 3), ("workbox_b", 1), ("workbox_c", 0)):
+        (workbox_dir / workbox_id).mkdir()
+        for i in range(count):
+            time_str = "2024-01-0{}-00-00-00-000000".format(3 - i)
+            filepath = (
+                workbox_dir / workbox_id / "{}-{}.py".format(workbox_id, time_str)
+            )
+            filepath.write_text(str(i))
+    # Files in the workboxes directory are not workboxes
+    (workbox_dir / "index.json").write_text("{}")
+
+    infos = preditor.prefs.get_latest_backup_infos(core_name)
+    assert sorted(infos) == ["workbox_a", "workbox_b"]
+    # Matches the per-workbox lookup
+    for workbox_id, info in infos.items():
+        assert info == preditor.prefs.get_backup_version_info(
+            core_name, workbox_id, preditor.prefs.VersionTypes.Last
+        )
+    assert infos["workbox_a"][0].endswith("workbox_a-2024-01-03-00-00-00-000000.py")
+    assert infos["workbox_a"][1:] == (3, 3)
+
+    assert preditor.prefs.get_latest_backup_infos("missing_core") == {}
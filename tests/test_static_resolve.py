@@ -0,0 +1,192 @@
+import os
+import types
+
+import pytest
+
+from preditor.utils.static_resolve import StaticResolver, resolve_static, static_dir
+
+
+class Sample(object):
+    class_value = 5
+
+    def __init__(self):
+        self.calls = []
+        self.child = types.SimpleNamespace(name="child")
+
+    def __getattr__(self, name):
+        self.calls.append(name)
+        return self
+
+    @property
+    def prop(self):
+        self.calls.append("prop")
+        return self
+
+    def method(self):
+        return self
+
+    @classmethod
+    def cls_method(cls):
+        return cls
+
+
+@pytest.fixture()
+def sample():
+    return Sample()
+
+
+def test_scope(sample):
+    scope = {"sample": sample}
+    assert resolve_static("sample", scope) is sample
+    assert resolve_static("sample.child", scope) is sample.child
+    assert resolve_static("sample.class_value", scope) == 5
+    assert resolve_static("sample.method", scope) is Sample.method
+    assert resolve_static("sample.cls_method", scope) is Sample.cls_method.__func__
+    assert resolve_static("missing", scope) is None
+    # Only dotted names are supported
+    assert resolve_static("sample.method()", scope) is None
+    assert resolve_static("sample[0]", scope) is None
+
+
+def test_side_effects_not_triggered(sample):
+    scope = {"sample": sample}
+    # Properties are not run
+    assert resolve_static("sample.prop", scope) is None
+    assert resolve_static("sample.prop.child", scope) is None
+    # __getattr__ is not called for missing attributes
+    assert resolve_static("sample.missing", scope) is None
+    assert sample.calls == []
+
+
+class CustomDir(Sample):
+    __slots__ = ("slot",)
+
+    def __dir__(self):
+        self.calls.append("__dir__")
+        return ["custom"]
+
+
+def test_static_dir(sample):
+    names = static_dir(sample)
+    assert names == sorted(set(dir(sample)))
+    assert {"calls", "child", "prop", "method", "class_value"} <= set(names)
+    assert static_dir(Sample) == sorted(set(dir(Sample)))
+    assert static_dir(os) == sorted(dir(os))
+
+    # __dir__ is not called
+    custom = CustomDir()
+    names = static_dir(custom)
+    assert "slot" in names and "custom" not in names
+    assert custom.calls == []
+
+
+def test_builtins_and_modules():
+    assert resolve_static("str", {}) is str
+    assert resolve_static("os", {}) is os
+    assert resolve_static("os.path", {}) is os.path
+    assert resolve_static("os.path.join", {}) is os.path.join
+    assert resolve_static("str.join", {}) is str.join
+
+
+def test_source_inference(sample):
+    source = "\n".join(
+        (
+            "import os.path",
+            "import os.path as osp",
+            "from os import path as p2",
+            "from types import SimpleNamespace",
+            "value = 'text'",
+            "items = [call_something()]",
+            "inst = Sample()",
+            "ns = SimpleNamespace(a=1)",
+            "value2 = value",
+            "loop_a = loop_b",
+            "loop_b = loop_a",
+            "def func():",
+            "    local = 1",
+            "invalid = undefined()",
+        )
+    )
+    resolver = StaticResolver({"Sample": Sample}, source=source)
+    assert resolver.resolve("os") is os
+    assert resolver.resolve("osp") is os.path
+    assert resolver.resolve("p2") is os.path
+    assert resolver.resolve("value") == "text"
+    assert resolver.resolve("value2") == "text"
+    assert resolver.resolve("items") == []
+    assert resolver.resolve("inst") is Sample
+    assert resolver.resolve("ns") is types.SimpleNamespace
+    assert resolver.resolve("loop_a") is None
+    assert resolver.resolve("local") is None
+    assert resolver.resolve("invalid") is None
+
+    # Names in scope take priority over source
+    assert resolve_static("value", {"value": 1}, source=source) == 1
+    # Invalid source is ignored
+    assert resolve_static("value", {}, source="value = 'text'\n)") is None
+
+
+def test_completer_static(qapp, sample):
+    import __main__
+
+    from preditor.gui.console import ConsolePrEdit
+
+    console = ConsolePrEdit(None)
+    completer = console.completer()
+    __main__._preditor_static_sample = sample
+    try:
+        console.setPlainText("_preditor_static_sample.prop.")
+        console.moveCursor(console.textCursor().MoveOperation.End)
+
+        completer.setStaticResolve(True)
+        assert completer.staticResolve() is True
+        obj, _ = completer.currentObject(scope=__main__.__dict__)
+        assert obj is None
+        completer.refreshList(scope=__main__.__dict__)
+        completer.showDocumentation(scope=__main__.__dict__)
+        assert completer._documentationRequest is None
+        assert sample.calls == []
+
+        # Attribute names are listed without calling __dir__
+        __main__._preditor_static_sample = CustomDir()
+        console.setPlainText("_preditor_static_sample.")
+        console.moveCursor(console.textCursor().MoveOperation.End)
+        completer.refreshList(scope=__main__.__dict__)
+        assert "slot" in completer.model().sourceModel().stringList()
+        assert __main__._preditor_static_sample.calls == []
+        __main__._preditor_static_sample = sample
+        console.setPlainText("_preditor_static_sample.prop.")
+        console.moveCursor(console.textCursor().MoveOperation.End)
+
+        # Eval mode runs the property
+        completer.setStaticResolve(False)
+        obj, _ = completer.currentObject(scope=__main__.__dict__)
+        assert obj is sample
+        assert sample.calls == ["prop"]
+    finally:
+        del __main__._preditor_static_sample
+
+
+def test_completer_static_resolver_cache(workbox_manager):
+    from preditor.gui.console import ConsolePrEdit
+    from preditor.gui.workbox_text_edit import WorkboxTextEdit
+
+    manager = workbox_manager
+    group, _ = manager.default_tab("Group")
+    manager.addTab(group, "Group")
+    workbox = WorkboxTextEdit(parent=group, core_name=manager.core_name)
+    group.addTab(workbox, "Workbox")
+    workbox.__set_text__("import os\nvalue = 'text'\n")
+
+    console = ConsolePrEdit(None)
+    console._controller = types.SimpleNamespace(current_workbox=lambda: workbox)
+    completer = console.completer()
+    resolver = completer.staticResolver({})
+    assert resolver.resolve("value") == "text"
+    # The resolver and the source it parsed are re-used until the text changes
+    assert completer.staticResolver({"value": 1}) is resolver
+    assert resolver.resolve("value") == 1
+    workbox.__set_text__("value = []\n")
+    changed = completer.staticResolver({})
+    assert changed is not resolver
+    assert changed.resolve("value") == []
@@ -0,0 +1,83 @@
+from __future__ import absolute_import
+
+import pytest
+
+from preditor.utils.symbol_index import Symbol, parse_symbols, scan_symbols
+
+CODE = '''\
+"""Docstring
+def not_a_function():
+"""
+import os
+
+VALUE = 1
+first, second = 1, 2
+annotated: int = 3
+VALUE += 1
+
+
+class Outer(object):
+    attr = 1
+
+    @property
+    def method(self):
+        x = 1
+
+        def inner():
+            pass
+
+    class Nested:
+        async def coro(self):
+            pass
+
+
+if os.name:
+    def conditional():
+        pass
+'''
+
+SYMBOLS = [
+    Symbol("VALUE", "variable", 6, ()),
+    Symbol("first", "variable", 7, ()),
+    Symbol("second", "variable", 7, ()),
+    Symbol("annotated", "variable", 8, ()),
+    Symbol("Outer", "class", 12, ()),
+    Symbol("method", "method", 16, ("Outer",)),
+    Symbol("inner", "function", 19, ("Outer", "method")),
+    Symbol("Nested", "class", 22, ("Outer",)),
+    Symbol("coro", "method", 23, ("Outer", "Nested")),
+    Symbol("conditional", "function", 28, ()),
+]
+
+
+def test_parse_symbols():
+    assert parse_symbols(CODE) == SYMBOLS
+    assert parse_symbols("") == []
+    assert SYMBOLS[8].qualname == "Outer.Nested.coro"
+
+
+def test_scan_symbols():
+    # The line scan finds the same symbols for code that parses
+    assert scan_symbols(CODE) == SYMBOLS
+
+
+@pytest.mark.parametrize(
+    "text,check",
+    (
+        # Unfinished code after the symbols
+        (
+            "class A:\n    def b(self):\n        return (\n\nc = 1\n",
+            [
+                Symbol("A", "class", 1, ()),
+                Symbol("b", "method", 2, ("A",)),
+                Symbol("c", "variable", 5, ()),
+            ],
+        ),
+        # Comparisons and keyword arguments are not assignments
+        ("a == 1\nb(c=1)\nd = \n", [Symbol("d", "variable", 3, ())]),
+        # Null bytes raise a ValueError in ast.parse
+        ("def a():\x00\n", [Symbol("a", "function", 1, ())]),
+    ),
+)
+def test_parse_symbols_invalid(text, check):
+    assert parse_symbols(text) == check
@@ -0,0 +1,80 @@
+from __future__ import absolute_import
+
+import pytest
+
+from preditor.utils.text_diff import (
+    Hunk,
+    Row,
+    compute_diff,
+    revert_edit,
+    side_by_side_rows,
+    unified_rows,
+)
+
+OLD = "a\nb\nc\nd\ne\nf\ng\nh\ni\nj\n"
+NEW = "a\nB\nc\nd\ne\nf\ng\nh\ni\nj\nk\nl\n"
+
+
+def test_compute_diff():
+    result = compute_diff(OLD, NEW)
+    assert result.hunks == [Hunk("replace", 1, 2, 1, 2), Hunk("insert", 10, 10, 10, 12)]
+    assert not result.too_large
+    assert compute_diff(OLD, OLD).hunks == []
+
+    # Texts larger than max_lines are not compared
+    result = compute_diff(OLD, NEW, max_lines=21)
+    assert result.too_large
+    assert result.hunks is None
+    assert not compute_diff(OLD, NEW, max_lines=0).too_large
+
+
+@pytest.mark.parametrize(
+    "old,new",
+    (
+        (OLD, NEW),
+        (NEW, OLD),
+        ("a\nb", "a\nb\n"),
+        ("", "a\n"),
+        ("a\r\nb\r\n", "a\r\nc\r\nb\r\n"),
+    ),
+)
+def test_revert_edit(old, new):
+    # Reverting every hunk, last first, restores the old text
+    result = compute_diff(old, new)
+    assert result.hunks
+    text = new
+    for index in reversed(range(len(result.hunks))):
+        start, end, txt = revert_edit(result, index)
+        text = text[:start] + txt + text[end:]
+    assert text == old
+
+    # Each hunk can be reverted on its own
+    for index in range(len(result.hunks)):
+        start, end, txt = revert_edit(result, index)
+        text = new[:start] + txt + new[end:]
+        assert len(compute_diff(old, text).hunks) == len(result.hunks) - 1
+
+
+def test_side_by_side_rows():
+    result = compute_diff("a\nb\nc\n", "a\nB\nC\nD\nc\n")
+    assert side_by_side_rows(result) == [
+        Row("equal", 0, 0, None),
+        Row("replace", 1, 1, 0),
+        Row("replace", None, 2, 0),
+        Row("replace", None, 3, 0),
+        Row("equal", 2, 4, None),
+    ]
+
+
+def test_unified_rows():
+    result = compute_diff(OLD, NEW)
+    assert unified_rows(result, context=1) == [
+        Row("equal", 0, 0, None),
+        Row("delete", 1, None, 0),
+        Row("insert", None, 1, 0),
+        Row("equal", 2, 2, None),
+        Row("gap", None, None, None),
+        Row("equal", 9, 9, None),
+        Row("insert", None, 10, 1),
+        Row("insert", None, 11, 1),
+    ]
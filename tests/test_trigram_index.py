@@ -0,0 +1,173 @@
+from __future__ import absolute_import
+
+import re
+from pathlib import Path
+
+import pytest
+
+from preditor.prefs import create_stamped_path, get_full_path, get_prefs_dir
+from preditor.utils.text_search import RegexTextSearch, SimpleTextSearch
+from preditor.utils.trigram_index import (
+    TrigramIndex,
+    get_trigram_index,
+    regex_literals,
+    trigrams,
+)
+
+CORE_NAME = "test_trigram_index"
+
+
+@pytest.fixture()
+def index(pref_root):
+    get_prefs_dir(core_name=CORE_NAME, create=True)
+    return TrigramIndex(CORE_NAME)
+
+
+def write_backup(workbox_id, text, time_str="1"):
+    path = create_stamped_path(CORE_NAME, workbox_id, time_str=time_str)
+    Path(path).write_text(text)
+    return str(path)
+
+
+def test_trigrams():
+    assert trigrams("") == set()
+    assert trigrams("ab") == set()
+    assert trigrams("aBcd") == {"abc", "bcd"}
+    assert trigrams("aaaa") == {"aaa"}
+
+
+@pytest.mark.parametrize(
+    "pattern,flags,check",
+    (
+        ("search term", 0, ["search term"]),
+        ("search.+term", 0, ["search", "term"]),
+        ("Search.+term", re.I, ["Search", "term"]),
+        ("ab?cd", 0, ["a", "cd"]),
+        (r"def\s+name\(", 0, ["def", "name("]),
+        ("one|two", 0, []),
+        ("(one|two)three", 0, ["three"]),
+        ("cafés", 0, ["caf", "s"]),
+        # Invalid regex
+        ("(unclosed", 0, []),
+    ),
+)
+def test_regex_literals(pattern, flags, check):
+    assert regex_literals(pattern, flags) == check
+
+
+def test_index_trigrams():
+    assert SimpleTextSearch("Se").index_trigrams() is None
+    assert SimpleTextSearch("Search").index_trigrams() == trigrams("search")
+    assert RegexTextSearch("se.+te").index_trigrams() is None
+    assert RegexTextSearch("one|two").index_trigrams() is None
+    assert RegexTextSearch(r"sea\w+term").index_trigrams() == {"sea", "ter", "erm"}
+
+
+def test_candidates(index):
+    index.update("one", "the search term", write_backup("one", "the search term"))
+    index.update("two", "SEARCH TERMS", write_backup("two", "SEARCH TERMS"))
+    index.update("three", "other text", write_backup("three", "other text"))
+
+    assert SimpleTextSearch("search term").candidates(index) == {"one", "two"}
+    # The index is case insensitive, matches are verified by searching the text
+    search = SimpleTextSearch("search term", case_sensitive=True)
+    assert search.candidates(index) == {"one", "two"}
+    assert SimpleTextSearch("text").candidates(index) == {"three"}
+    assert SimpleTextSearch("missing").candidates(index) == set()
+    assert RegexTextSearch(r"search\s+term").candidates(index) == {"one", "two"}
+    # The index can't be used for these searches
+    assert SimpleTextSearch("te").candidates(index) is None
+    assert RegexTextSearch("search|other").candidates(index) is None
+
+    index.remove("one")
+    assert SimpleTextSearch("search term").candidates(index) == {"two"}
+    assert "one" not in index
+
+
+def test_save_and_load(index):
+    backup_file = write_backup("one", "the search term")
+    index.update("one", "the search term", backup_file)
+    assert index.is_dirty()
+    index.save()
+    assert not index.is_dirty()
+
+    loaded = TrigramIndex(CORE_NAME)
+    assert len(loaded) == 1
+    assert loaded.is_current("one", backup_file)
+    assert SimpleTextSearch("search").candidates(loaded) == {"one"}
+    assert loaded.verify() == []
+
+    # Changing the backup file makes the entry out of date
+    Path(backup_file).write_text("the search term has changed")
+    assert not loaded.is_current("one", backup_file)
+    assert loaded.verify() == ["one"]
+
+    # A newer backup file makes the entry out of date
+    newer = write_backup("one", "newer text", time_str="2")
+    assert not loaded.is_current("one", newer)
+
+
+@pytest.mark.parametrize(
+    "contents",
+    (
+        "",
+        "not json",
+        "[]",
+        '{"version": 1}',
+        '{"version": 1000, "entries": {}}',
+        '{"version": 1, "entries": {"one": {"trigrams": "abc"}}}',
+    ),
+)
+def test_corrupt(index, contents):
+    Path(index.filename).write_text(contents)
+    index = TrigramIndex(CORE_NAME)
+    assert len(index) == 0
+    # Saving replaces the corrupt index
+    assert index.is_dirty()
+    index.update("one", "the search term", write_backup("one", "the search term"))
+    index.save()
+    assert len(TrigramIndex(CORE_NAME)) == 1
+
+
+def test_rebuild(index):
+    write_backup("one", "old text", time_str="1")
+    write_backup("one", "the search term", time_str="2")
+    write_backup("two", "other text")
+    # Missing entries are not found by verify, but rebuild adds them
+    assert len(index) == 0
+    index.rebuild()
+    assert len(index) == 2
+    assert index.verify() == []
+    assert SimpleTextSearch("search").candidates(index) == {"one"}
+    assert SimpleTextSearch("old").candidates(index) == set()
+    assert SimpleTextSearch("text").candidates(index) == {"two"}
+
+
+def test_get_trigram_index(index):
+    cached = get_trigram_index(CORE_NAME)
+    assert get_trigram_index(CORE_NAME) is cached
+    assert cached.filename == index.filename
+
+
+def test_save_prefs(workbox_manager):
+    from preditor.gui.workbox_text_edit import WorkboxTextEdit
+
+    manager = workbox_manager
+    group, _ = manager.default_tab("Group")
+    manager.addTab(group, "Group")
+    editor = WorkboxTextEdit(parent=group, core_name=manager.core_name)
+    group.addTab(editor, "Workbox")
+    editor.__set_text__("the search term\r\n")
+
+    # Saving the prefs writes a backup file, adding it to the index
+    manager.save_prefs()
+    index = get_trigram_index(manager.core_name)
+    workbox_id = editor.__workbox_id__()
+    backup_file = get_full_path(
+        manager.core_name, workbox_id, backup_file=editor.__backup_file__()
+    )
+    assert index.is_current(workbox_id, backup_file)
+    assert SimpleTextSearch("search").candidates(index) == {workbox_id}
+    assert index.verify() == []
+    assert not index.is_dirty()
+    assert TrigramIndex(manager.core_name).candidates(trigrams("term")) == {workbox_id}
@@ -0,0 +1,109 @@
+import pytest
+from Qt.QtWidgets import QApplication
+
+OLD = "a = 1\nb = 2\nc = 3\n"
+NEW = "a = 1\nb = 20\nc = 3\nd = 4\n"
+
+
+def wait(view):
+    """Wait for the texts to be compared and the result delivered."""
+    view.pool.waitForDone()
+    QApplication.processEvents()
+    assert view.result is not None
+
+
+@pytest.fixture()
+def workboxes(workbox_manager, tmp_path):
+    from preditor.gui.workbox_text_edit import WorkboxTextEdit
+
+    manager = workbox_manager
+    group, _ = manager.default_tab("Group")
+    manager.addTab(group, "Group")
+    editors = []
+    for i, text in enumerate((NEW, OLD)):
+        editor = WorkboxTextEdit(parent=group, core_name=manager.core_name)
+        group.addTab(editor, "Workbox {}".format(i))
+        editor.__set_text__(text)
+        editors.append(editor)
+    return editors
+
+
+def test_diff_view(workboxes, tmp_path):
+    from preditor.gui.diff_view import DiffView
+
+    workbox, other = workboxes
+    linked = tmp_path / "linked.py"
+    linked.write_text(OLD)
+    workbox.__set_filename__(str(linked))
+
+    view = DiffView(workbox, workbox.__tab_widget__().__tab_widget__())
+    assert [label for label, _, _ in view.sources] == [
+        "Linked file: linked.py",
+        "Workbox: Group/Workbox 1",
+    ]
+    wait(view)
+    assert len(view.result.hunks) == 2
+    assert view.uiStatusLBL.text() == "2 changes"
+    assert view.uiUnifiedTXT.toPlainText().splitlines() == [
+        "    1     1  a = 1",
+        "    2       -b = 2",
+        "          2 +b = 20",
+        "    3     3  c = 3",
+        "          4 +d = 4",
+    ]
+
+    # Jump between the changes
+    view.next_change()
+    view.next_change()
+    assert view.current_hunk == 1
+    assert view.uiUnifiedTXT.textCursor().blockNumber() == 4
+    view.previous_change()
+    assert view.current_hunk == 0
+    assert view.uiStatusLBL.text() == "Change 1 of 2"
+
+    # The side by side view shows the same rows for both texts
+    view.uiSideBySideCHK.setChecked(True)
+    assert view.uiOldTXT.toPlainText().splitlines()[3].strip() == ""
+    assert view.uiNewTXT.toPlainText().splitlines()[3] == "    4 d = 4"
+    assert view.uiNewTXT.textCursor().blockNumber() == 1
+
+    # Revert the selected change, the texts are compared again
+    view.revert_change()
+    assert workbox.__text__() == "a = 1\nb = 2\nc = 3\nd = 4\n"
+    wait(view)
+    assert len(view.result.hunks) == 1
+    assert view.current_hunk == 0
+
+    # Compare with another workbox
+    other.__set_text__("a = 1\nb = 2\nc = 3\nd = 4\n")
+    view.uiSourceDDL.setCurrentIndex(1)
+    wait(view)
+    assert view.result.hunks == []
+    assert view.uiStatusLBL.text() == "No differences"
+    assert not view.uiRevertBTN.isEnabled()
+
+
+def test_diff_view_stale(workboxes):
+    from preditor.gui.diff_view import DiffView
+
+    workbox, _ = workboxes
+    view = DiffView(workbox, workbox.__tab_widget__().__tab_widget__())
+    wait(view)
+    assert view.current_hunk is None
+    view.next_change()
+
+    # Changes made since the texts were compared are not reverted
+    workbox.__set_text__(NEW + "e = 5\n")
+    view.revert_change()
+    assert workbox.__text__() == NEW + "e = 5\n"
+    assert view.result is None
+
+    # Texts that are too large are not compared
+    view.max_lines = 7
+    view.refresh()
+    wait(view)
+    assert view.result.too_large
+    assert view.rows == []
+    assert view.uiUnifiedTXT.toPlainText() == ""
+    assert "limit is 7" in view.uiStatusLBL.text()
+    assert not view.uiNextBTN.isEnabled()
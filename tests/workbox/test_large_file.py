@@ -0,0 +1,117 @@
+import codecs
+
+import pytest
+
+from preditor.gui.workbox_mixin import WorkboxMixin, encoding_sample
+
+
+def test_encoding_sample():
+    data = b"".join(b"line %d\n" % i for i in range(1000))
+    assert encoding_sample(data, len(data)) is data
+
+    sample = encoding_sample(data, 300)
+    assert len(sample) <= 300
+    # The sample contains whole lines from the start, middle and end
+    lines = sample.splitlines(keepends=True)
+    assert all(line in data.splitlines(keepends=True) for line in lines)
+    assert lines[0] == b"line 0\n"
+    assert any(b"line %d\n" % i in lines for i in range(490, 510))
+    assert lines[-1] == b"line 999\n"
+
+
+def test_open_file_sampled(tmp_path, monkeypatch):
+    import charset_normalizer
+
+    detect = charset_normalizer.detect
+    sizes = []
+
+    def check_detect(data):
+        sizes.append(len(data))
+        return detect(data)
+
+    monkeypatch.setattr(charset_normalizer, "detect", check_detect)
+
+    text = "Съешь же ещё этих мягких французских булок, да выпей чаю.\n" * 3000
+    filename = tmp_path / "large.txt"
+    filename.write_bytes(text.encode("cp1251"))
+
+    encoding, txt = WorkboxMixin.__open_file__(str(filename), sample_size=4096)
+    assert len(sizes) == 1 and 3000 < sizes[0] <= 4096
+    assert txt == text
+    assert codecs.lookup(encoding).name == "cp1251"
+
+    # Without a sample size the whole file is used
+    WorkboxMixin.__open_file__(str(filename))
+    assert sizes[-1] == len(text.encode("cp1251"))
+
+    # utf-8 files are decoded without detecting their encoding
+    filename.write_bytes(text.encode("utf-8"))
+    assert WorkboxMixin.__open_file__(str(filename), sample_size=4096) == (
+        "utf-8",
+        text,
+    )
+    assert len(sizes) == 2
+
+
+@pytest.mark.parametrize("editor_cls_name", ("WorkboxWidget", "WorkboxTextEdit"))
+def test_large_file_threshold(workbox_manager, tmp_path, monkeypatch, editor_cls_name):
+    import preditor.gui.workbox_text_edit
+    import preditor.gui.workboxwidget
+
+    if editor_cls_name == "WorkboxWidget":
+        editor_cls = preditor.gui.workboxwidget.WorkboxWidget
+    else:
+        editor_cls = preditor.gui.workbox_text_edit.WorkboxTextEdit
+    monkeypatch.setattr(WorkboxMixin, "_large_file_size", 1000)
+
+    manager = workbox_manager
+    group, _ = manager.default_tab("Group")
+    manager.addTab(group, "Group")
+    editor = editor_cls(parent=group, core_name=manager.core_name)
+    group.addTab(editor, "Workbox")
+
+    def highlighted():
+        if editor_cls_name == "WorkboxWidget":
+            return (
+                editor.lexer() is not None
+                and editor in editor.delayable_engine.documents
+            )
+        return editor.uiCodeHighlighter.document() is not None
+
+    small = tmp_path / "small.py"
+    small.write_text("a = 1\n" * 166)
+    large = tmp_path / "large.py"
+    large.write_text("a = 1\n" * 167)
+
+    # Files smaller than the threshold are loaded normally
+    editor.__load__(str(small))
+    assert not editor.__large_file__()
+    assert not editor.isReadOnly()
+    assert highlighted()
+
+    # Files at the threshold are read-only without highlighting
+    editor.__load__(str(large))
+    assert editor.__large_file__()
+    assert editor.__text__() == "a = 1\n" * 167
+    assert editor.isReadOnly()
+    assert not highlighted()
+    banner = editor._large_file_banner
+    assert not banner.isHidden()
+    assert banner.uiEnableEditingBTN.isVisibleTo(banner)
+
+    banner.enable_editing()
+    assert not editor.isReadOnly()
+    assert not banner.uiEnableEditingBTN.isVisibleTo(banner)
+    assert editor.__large_file__()
+
+    # Loading a smaller file restores everything
+    editor.__load__(str(small))
+    assert not editor.__large_file__()
+    assert not editor.isReadOnly()
+    assert highlighted()
+    assert banner.isHidden()
+
+    # Zero disables large-file mode
+    monkeypatch.setattr(WorkboxMixin, "_large_file_size", 0)
+    editor.__load__(str(large))
+    assert not editor.__large_file__()
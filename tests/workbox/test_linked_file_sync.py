@@ -0,0 +1,143 @@
+import os
+
+import pytest
+
+
+@pytest.fixture()
+def sync(qapp):
+    from preditor.gui.linked_file_sync import LinkedFileSync
+
+    sync = LinkedFileSync()
+    yield sync
+    sync.deleteLater()
+
+
+def replace(path, text):
+    """Save text to path the way many editors do, writing a temp file and
+    renaming it over path."""
+    temp = path.with_name(path.name + ".tmp")
+    temp.write_text(text)
+    os.replace(str(temp), str(path))
+
+
+def test_rename_and_replace(sync, tmp_path):
+    path = tmp_path / "linked.py"
+    path.write_text("a = 1\n")
+    sync.watch(str(path))
+    changed = []
+    sync.fileChanged.connect(changed.append)
+    assert str(path) in sync.watcher.files()
+
+    # A save emits several watcher signals, they are handled once
+    replace(path, "a = 2\n")
+    for _ in range(3):
+        sync.schedule(str(path))
+    assert sync.timer.isActive()
+    assert changed == []
+    sync.flush()
+    assert changed == [str(path)]
+    # The replaced file is watched again
+    assert str(path) in sync.watcher.files()
+
+    # Saving without changing the contents doesn't emit fileChanged
+    replace(path, "a = 2\n")
+    sync.schedule(str(path))
+    sync.flush()
+    assert changed == [str(path)]
+    assert str(path) in sync.watcher.files()
+
+    # Removing the file is a change
+    path.unlink()
+    sync.schedule(str(path))
+    sync.flush()
+    assert changed == [str(path), str(path)]
+    assert sync.is_watched(str(path))
+
+    # As is creating it again
+    replace(path, "a = 2\n")
+    sync.schedule(str(path))
+    sync.flush()
+    assert changed == [str(path), str(path), str(path)]
+
+
+def test_delete_and_recreate(sync, tmp_path):
+    import time
+
+    from Qt.QtWidgets import QApplication
+
+    path = tmp_path / "linked.py"
+    path.write_text("a = 1\n")
+    sync.watch(str(path))
+    changed = []
+    sync.fileChanged.connect(changed.append)
+    assert sync.watcher.directories() == []
+
+    # While the file doesn't exist its directory is watched
+    path.unlink()
+    sync.schedule(str(path))
+    sync.flush()
+    assert changed == [str(path)]
+    assert str(path) not in sync.watcher.files()
+    assert sync.watcher.directories() == [str(tmp_path)]
+
+    # Re-creating the file is reported by the directory, and the file is
+    # watched again instead of its directory
+    path.write_text("a = 2\n")
+    end = time.time() + 5
+    while len(changed) < 2 and time.time() < end:
+        QApplication.processEvents()
+        time.sleep(0.01)
+    assert changed == [str(path), str(path)]
+    assert str(path) in sync.watcher.files()
+    assert sync.watcher.directories() == []
+
+    # Other changes to the directory are ignored
+    (tmp_path / "other.py").write_text("b = 1\n")
+    sync.schedule_directory(str(tmp_path))
+    assert not sync.timer.isActive()
+
+
+def test_watch_stores_signature(sync, tmp_path):
+    path = tmp_path / "linked.py"
+    path.write_text("a = 1\n")
+    sync.watch(str(path))
+    changed = []
+    sync.fileChanged.connect(changed.append)
+
+    # Watching the file again after saving it ignores that save
+    path.write_text("a = 22\n")
+    sync.watch(str(path))
+    sync.schedule(str(path))
+    sync.flush()
+    assert changed == []
+
+    # Unwatched paths are not checked
+    other = tmp_path / "other.py"
+    other.write_text("b = 1\n")
+    sync.schedule(str(other))
+    sync.flush()
+    assert changed == []
+
+
+def test_owners(sync, tmp_path, workbox_manager):
+    from preditor.gui.workbox_text_edit import WorkboxTextEdit
+
+    path = tmp_path / "linked.py"
+    path.write_text("a = 1\n")
+    first = WorkboxTextEdit(core_name=workbox_manager.core_name)
+    second = WorkboxTextEdit(core_name=workbox_manager.core_name)
+
+    sync.watch(str(path), first)
+    sync.watch(str(tmp_path / "." / "linked.py"), second)
+    sync.watch(str(path), first)
+    assert sync.workboxes(str(path)) == [first, second]
+
+    # The path is watched until every workbox stops watching it
+    sync.unwatch(str(path), first)
+    assert sync.is_watched(str(path))
+    assert sync.workboxes(str(path)) == [second]
+    sync.unwatch(str(path), first)
+    sync.unwatch(str(path), second)
+    assert not sync.is_watched(str(path))
+    assert sync.workboxes(str(path)) == []
+    assert sync.watcher.files() == []
@@ -0,0 +1,101 @@
+from pathlib import Path
+
+import pytest
+
+
+def write_backup(core_name, workbox_id, text, time_str="2024-01-01-00-00-00-000000"):
+    from preditor.prefs import get_prefs_dir
+
+    workbox_dir = Path(get_prefs_dir(core_name=core_name, create=True)) / workbox_id
+    workbox_dir.mkdir(exist_ok=True)
+    filepath = workbox_dir / "{}-{}.py".format(workbox_id, time_str)
+    filepath.write_text(text)
+    return filepath
+
+
+@pytest.fixture()
+def workbox_prefs(workbox_manager):
+    core_name = workbox_manager.core_name
+    groups = []
+    for group_idx in range(2):
+        tabs = []
+        for tab_idx in range(3):
+            workbox_id = "workbox_{}_{}".format(group_idx, tab_idx)
+            write_backup(core_name, workbox_id, "print({})\n".format(tab_idx))
+            tabs.append(dict(name="Workbox {}".format(tab_idx), workbox_id=workbox_id))
+        tabs[1]["current"] = True
+        groups.append(dict(name="Group {}".format(group_idx), tabs=tabs))
+    groups[1]["current"] = True
+    # Workboxes without a backup or linked file are not restored
+    groups[0]["tabs"].append(dict(name="Missing", workbox_id="workbox_missing"))
+    return dict(groups=groups)
+
+
+@pytest.fixture(params=[True, False], ids=["deferred", "editors"])
+def manager(request, workbox_manager):
+    workbox_manager.defer_editors = request.param
+    return workbox_manager
+
+
+def names(manager):
+    return [(info[1], info[2]) for info in manager.all_widgets()]
+
+
+def test_restore_prefs(manager, workbox_prefs):
+    manager.restore_prefs(workbox_prefs)
+    assert names(manager) == [
+        ("Group 0", "Workbox 0"),
+        ("Group 0", "Workbox 1"),
+        ("Group 0", "Workbox 2"),
+        ("Group 1", "Workbox 0"),
+        ("Group 1", "Workbox 1"),
+        ("Group 1", "Workbox 2"),
+    ]
+    assert manager.currentIndex() == 1
+    workbox = manager.current_groups_widget()
+    assert workbox.__workbox_id__() == "workbox_1_1"
+    assert workbox.__backup_file__().endswith(
+        "workbox_1_1-2024-01-01-00-00-00-000000.py"
+    )
+    workbox.__show__()
+    assert workbox.__text__() == "print(1)\n"
+
+
+def test_restore_prefs_reuses_widgets(manager, workbox_prefs):
+    manager.restore_prefs(workbox_prefs)
+    # Restoring uses the current workbox
+    manager.current_groups_widget()
+    groups = [manager.widget(i) for i in range(manager.count())]
+    workboxes = {info[0].__workbox_id__(): info[0] for info in manager.all_widgets()}
+
+    # Another instance saved its prefs, re-ordering and changing workboxes
+    tabs = workbox_prefs["groups"][0]["tabs"]
+    tabs.insert(0, tabs.pop(2))
+    workbox_prefs["groups"][1]["tabs"].pop(0)
+    write_backup(
+        manager.core_name, "workbox_0_2", "changed\n", "2024-01-02-00-00-00-000000"
+    )
+    manager.restore_prefs(workbox_prefs)
+
+    # The group and workbox widgets with matching names and ids are reused
+    assert [manager.widget(i) for i in range(manager.count())] == groups
+    assert names(manager) == [
+        ("Group 0", "Workbox 2"),
+        ("Group 0", "Workbox 0"),
+        ("Group 0", "Workbox 1"),
+        ("Group 1", "Workbox 1"),
+        ("Group 1", "Workbox 2"),
+        ("Group 1", "Workbox 0"),
+    ]
+    for workbox, _, _, _, _ in manager.all_widgets():
+        assert workboxes[workbox.__workbox_id__()] is workbox
+    # The workbox that isn't in the other instance's prefs is kept as an orphan
+    assert manager.widget(1).widget(2).__workbox_id__() == "workbox_1_0"
+    assert manager.widget(1).widget(2).__orphaned_by_instance__()
+    # The workbox is updated to the latest backup
+    workbox = manager.widget(0).widget(0)
+    workbox.__show__()
+    assert workbox.__text__() == "changed\n"
+
+    # The selected workbox stays selected
+    assert manager.current_groups_widget().__workbox_id__() == "workbox_1_1"
@@ -0,0 +1,138 @@
+import pytest
+
+TEXT = "class A:\n    def b(self):\n        pass\n\n\nc = 1\n"
+
+
+@pytest.fixture()
+def symbol_index(qapp):
+    from preditor.delayable_engine import DelayableEngine
+    from preditor.gui.symbol_outline import SymbolIndexDelayable
+
+    engine = DelayableEngine.instance("test_symbol_outline")
+    symbol_index = SymbolIndexDelayable(engine)
+    engine.add_delayable(symbol_index)
+    yield symbol_index
+    engine.remove_delayable(symbol_index)
+
+
+@pytest.fixture()
+def group(workbox_manager):
+    from preditor.gui.workbox_text_edit import WorkboxTextEdit
+
+    manager = workbox_manager
+    group, _ = manager.default_tab("Group")
+    manager.addTab(group, "Group")
+    for i in range(3):
+        editor = WorkboxTextEdit(parent=group, core_name=manager.core_name)
+        group.addTab(editor, "Workbox {}".format(i))
+        editor.__set_text__("def func_{}():\n    pass\n".format(i))
+    return group
+
+
+def test_symbols_revision(group, symbol_index, monkeypatch):
+    import preditor.gui.symbol_outline
+    from preditor.utils.symbol_index import parse_symbols
+
+    calls = []
+    monkeypatch.setattr(
+        preditor.gui.symbol_outline,
+        "parse_symbols",
+        lambda text: calls.append(text) or parse_symbols(text),
+    )
+    changed = []
+    symbol_index.symbolsChanged.connect(changed.append)
+
+    editor = group.widget(0)
+    assert [s.name for s in symbol_index.symbols(editor)] == ["func_0"]
+    assert not symbol_index.schedule(editor)
+    assert symbol_index.symbols(editor) is symbol_index.symbols(editor)
+    assert len(calls) == 1
+    assert changed == [editor]
+
+    # Only changing the text re-builds the symbols. This editor isn't processed
+    # by the engine, so it's indexed by schedule.
+    editor.__set_text__(TEXT)
+    assert not symbol_index.is_current(editor)
+    assert symbol_index.schedule(editor)
+    assert symbol_index.is_current(editor)
+    assert [s.qualname for s in symbol_index.symbols(editor)] == ["A", "A.b", "c"]
+    assert len(calls) == 2
+    assert changed == [editor, editor]
+
+
+def test_symbols_engine(workbox_manager, request):
+    from preditor.delayable_engine import DelayableEngine
+    from preditor.gui.symbol_outline import SymbolIndexDelayable
+    from preditor.gui.workboxwidget import WorkboxWidget
+
+    manager = workbox_manager
+    group, _ = manager.default_tab("Group")
+    manager.addTab(group, "Group")
+    editor = WorkboxWidget(parent=group, core_name=manager.core_name)
+    group.addTab(editor, "Workbox")
+    # The LoggerWindow indexes the engine WorkboxWidgets are processed by
+    engine = DelayableEngine.instance("default")
+    assert editor.delayable_engine is engine
+    symbol_index = SymbolIndexDelayable(engine)
+    engine.add_delayable(symbol_index)
+    request.addfinalizer(lambda: engine.remove_delayable(symbol_index))
+    editor.__set_text__(TEXT)
+    changed = []
+    symbol_index.symbolsChanged.connect(changed.append)
+
+    # Workboxes processed by the engine are indexed in the background
+    assert symbol_index.schedule(editor)
+    assert changed == []
+    assert symbol_index.engine.timer.isActive()
+    symbol_index.engine.loop()
+    assert changed == [editor]
+    assert symbol_index.is_current(editor)
+    assert not symbol_index.schedule(editor)
+
+
+def test_outline(group, symbol_index):
+    from preditor.gui.symbol_outline import SymbolOutline
+
+    manager = group.__tab_widget__()
+    outline = SymbolOutline(manager, symbol_index)
+    editor = group.widget(1)
+    group.setCurrentIndex(1)
+    editor.__set_text__(TEXT)
+    outline.refresh()
+
+    item = outline.topLevelItem(0)
+    assert outline.topLevelItemCount() == 2
+    assert (item.text(0), item.text(1)) == ("A", "1")
+    assert item.child(0).text(0) == "b"
+    assert outline.topLevelItem(1).text(0) == "c"
+
+    outline.goto_item(item.child(0))
+    assert editor.__cursor_position__() == (1, 0)
+
+    # The outline follows edits and the current workbox
+    editor.__set_text__("d = 1\n")
+    outline.refresh()
+    assert outline.topLevelItem(0).text(0) == "d"
+    group.setCurrentIndex(2)
+    outline.refresh()
+    assert outline.topLevelItem(0).text(0) == "func_2"
+
+
+def test_symbol_list_model(group, symbol_index):
+    from preditor.gui.symbol_outline import SymbolListItemModel
+
+    manager = group.__tab_widget__()
+    group.widget(1).__set_text__(TEXT)
+    model = SymbolListItemModel(manager, symbol_index)
+    model.process()
+
+    rows = [model.index(row, 0) for row in range(model.rowCount())]
+    assert [index.data() for index in rows] == [
+        "func_0  Group/Workbox 0:1",
+        "A  Group/Workbox 1:1",
+        "A.b  Group/Workbox 1:2",
+        "c  Group/Workbox 1:6",
+        "func_2  Group/Workbox 2:1",
+    ]
+    assert model.workbox_indexes_from_model_index(rows[3]) == (0, 1)
+    assert model.line_from_model_index(rows[3]) == 6
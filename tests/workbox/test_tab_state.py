@@ -0,0 +1,111 @@
+import pytest
+
+
+@pytest.fixture()
+def group(workbox_manager):
+    from preditor.gui.workbox_text_edit import WorkboxTextEdit
+
+    manager = workbox_manager
+    group, _ = manager.default_tab("Group")
+    manager.addTab(group, "Group")
+    for i in range(5):
+        editor = WorkboxTextEdit(parent=group, core_name=manager.core_name)
+        group.addTab(editor, "Workbox {}".format(i))
+        editor.__set_last_workbox_name__()
+    group.tabBar().updateColorsAndToolTips()
+    return group
+
+
+def test_tab_updates_debounced(group, monkeypatch):
+    from Qt.QtWidgets import QApplication
+
+    from preditor.gui.drag_tab_bar import TabStates
+
+    tab_bar = group.tabBar()
+    editor = group.widget(2)
+    updated = []
+    update = type(tab_bar).updateColorAndToolTip
+    monkeypatch.setattr(
+        type(tab_bar),
+        "updateColorAndToolTip",
+        lambda self, index: updated.append(index) or update(self, index),
+    )
+
+    # Changing the text only schedules an update
+    for char in "abc":
+        editor.insertPlainText(char)
+    assert updated == []
+    assert tab_bar._update_timer.isActive()
+
+    # Only the changed tab is updated, once
+    tab_bar.flushTabUpdates()
+    assert updated == [2]
+    assert tab_bar.tabTextColor(2) == tab_bar.bg_color_map[TabStates.Dirty]
+    assert tab_bar.tabToolTip(2).startswith("Workbox has unsaved changes")
+    assert tab_bar.tabToolTip(1) == ""
+
+    # The timer also flushes the updates
+    del updated[:]
+    group.widget(4).insertPlainText("a")
+    editor.insertPlainText("d")
+    tab_bar._update_timer.setInterval(0)
+    while tab_bar._update_timer.isActive():
+        QApplication.processEvents()
+    assert updated == [4, 2]
+
+
+def test_tab_updates_closed(group):
+    from Qt.QtWidgets import QTabWidget
+
+    tab_bar = group.tabBar()
+    editor = group.widget(1)
+    editor.insertPlainText("a")
+    QTabWidget.removeTab(group, 1)
+    # Scheduled updates for tabs that no longer exist are skipped
+    tab_bar.flushTabUpdates()
+    assert tab_bar._pending_updates == []
+
+
+def test_missing_linked_file_cached(group, tmp_path, monkeypatch):
+    from pathlib import Path
+
+    filename = tmp_path / "linked.py"
+    filename.write_text("")
+    editor = group.widget(0)
+    editor.__set_filename__(str(filename))
+
+    calls = []
+    is_file = Path.is_file
+    monkeypatch.setattr(
+        Path, "is_file", lambda self: calls.append(self) or is_file(self)
+    )
+    assert not editor.__is_missing_linked_file__()
+    assert not editor.__is_missing_linked_file__()
+    assert len(calls) == 1
+
+    # The file watcher refreshes the cached state
+    filename.unlink()
+    assert not editor.__is_missing_linked_file__()
+    assert editor.__refresh_missing_linked_file__()
+    assert editor.__is_missing_linked_file__()
+    assert len(calls) == 2
+
+    # Changing the linked file clears the cache
+    editor.__set_filename__("")
+    assert not editor.__is_missing_linked_file__()
+
+
+def test_missing_linked_file_workbox_widget(workbox_manager, tmp_path):
+    from preditor.gui.workboxwidget import WorkboxWidget
+
+    manager = workbox_manager
+    group, _ = manager.default_tab("Group")
+    manager.addTab(group, "Group")
+    editor = WorkboxWidget(parent=group, core_name=manager.core_name)
+    group.addTab(editor, "Workbox")
+
+    filename = tmp_path / "linked.py"
+    editor.__set_filename__(str(filename))
+    assert editor.__is_missing_linked_file__()
+    filename.write_text("")
+    assert not editor.__refresh_missing_linked_file__()
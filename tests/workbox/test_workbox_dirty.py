@@ -0,0 +1,104 @@
+import pytest
+
+
+@pytest.fixture(params=["WorkboxTextEdit", "WorkboxWidget"])
+def editor(request, workbox_manager):
+    from preditor.gui.workbox_text_edit import WorkboxTextEdit
+    from preditor.gui.workboxwidget import WorkboxWidget
+
+    editor_cls = {
+        "WorkboxTextEdit": WorkboxTextEdit,
+        "WorkboxWidget": WorkboxWidget,
+    }[request.param]
+
+    manager = workbox_manager
+    group, _ = manager.default_tab("Group")
+    manager.addTab(group, "Group")
+    editor = editor_cls(parent=group, core_name=manager.core_name)
+    group.addTab(editor, "Workbox")
+    editor.__set_last_workbox_name__()
+
+    editor.__set_text__("print('hello')\n")
+    editor.__set_last_saved_text__(editor.__text__())
+    return editor
+
+
+def type_text(editor, text):
+    """Append text to editor as an undoable edit."""
+    end = len(editor.__text__())
+    editor.__replace_text__([(end, end, text)])
+
+
+def test_dirty_undo(editor, monkeypatch):
+    assert not editor.__is_dirty__()
+
+    type_text(editor, "a")
+    type_text(editor, "b")
+    assert editor.__is_dirty__()
+
+    # Undoing back to the saved text is clean without comparing the text
+    editor.undo()
+    assert editor.__is_dirty__()
+    editor.undo()
+    assert editor.__text__() == editor.__last_saved_text__()
+    monkeypatch.setattr(type(editor), "__text__", lambda self: pytest.fail())
+    assert not editor.__is_dirty__()
+    monkeypatch.undo()
+
+    # Redo makes it dirty again
+    editor.redo()
+    assert editor.__is_dirty__()
+
+
+def test_dirty_same_text(editor):
+    # Editing back to the saved text without undo is also clean
+    type_text(editor, "a")
+    assert editor.__is_dirty__()
+    end = len(editor.__text__())
+    editor.__replace_text__([(end - 1, end, "")])
+    assert not editor.__is_dirty__()
+
+
+def test_dirty_cached(editor, monkeypatch):
+    type_text(editor, "a")
+    assert editor.__is_dirty__()
+
+    # The text is only compared once per change
+    calls = []
+    text = type(editor).__text__
+    monkeypatch.setattr(
+        type(editor), "__text__", lambda self: calls.append(1) or text(self)
+    )
+    for _ in range(5):
+        assert editor.__is_dirty__()
+    assert calls == []
+
+    # Any change to the text invalidates the cached result
+    editor.__increment_revision__()
+    assert editor.__is_dirty__()
+    assert editor.__is_dirty__()
+    assert len(calls) == 1
+
+
+def test_dirty_set_text(editor):
+    # Setting the text may reset the editor's undo stack, it's still dirty
+    editor.__set_text__("other text\n")
+    assert editor.__is_dirty__()
+    editor.__set_text__(editor.__last_saved_text__())
+    assert not editor.__is_dirty__()
+
+    # Saving makes the new text the savepoint
+    type_text(editor, "a")
+    editor.__set_last_saved_text__(editor.__text__())
+    assert not editor.__is_dirty__()
+    editor.undo()
+    assert editor.__is_dirty__()
+    editor.redo()
+    assert not editor.__is_dirty__()
+
+
+def test_dirty_workbox_name(editor):
+    assert not editor.__is_dirty__()
+    group = editor.__tab_widget__()
+    group.setTabText(group.indexOf(editor), "Renamed")
+    assert editor.__is_dirty__()
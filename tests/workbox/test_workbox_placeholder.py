@@ -0,0 +1,177 @@
+from pathlib import Path
+
+import pytest
+
+
+@pytest.fixture()
+def group(workbox_manager, tmp_path):
+    from preditor.prefs import get_prefs_dir
+
+    manager = workbox_manager
+    workbox_dir = Path(get_prefs_dir(core_name=manager.core_name, create=True))
+    tabs = []
+    for i in range(3):
+        workbox_id = "workbox_{}".format(i)
+        (workbox_dir / workbox_id).mkdir()
+        backup = (
+            workbox_dir
+            / workbox_id
+            / "{}-2024-01-01-00-00-00-000000.py".format(workbox_id)
+        )
+        backup.write_text("print({})\n".format(i))
+        tabs.append(dict(name="Workbox {}".format(i), workbox_id=workbox_id))
+    linked = tmp_path / "linked.py"
+    linked.write_text("linked\n")
+    tabs[2]["filename"] = str(linked)
+
+    manager.restore_prefs(dict(groups=[dict(name="Group", tabs=tabs)]))
+    return manager.widget(0)
+
+
+def test_placeholders_restored(group, monkeypatch):
+    from preditor.gui.workbox_placeholder import WorkboxPlaceholder
+
+    manager = group.__tab_widget__()
+    workboxes = [info[0] for info in manager.all_widgets()]
+    assert all(isinstance(w, WorkboxPlaceholder) for w in workboxes)
+
+    # Information about the workboxes doesn't create their editors
+    monkeypatch.setattr(
+        WorkboxPlaceholder, "__editor__", lambda self: pytest.fail("Editor created")
+    )
+    workbox = group.widget(1)
+    assert workbox.__workbox_id__() == "workbox_1"
+    assert workbox.__workbox_name__() == "Group/Workbox 1"
+    assert workbox.__group_tab_index__() == (0, 1)
+    assert workbox.__backup_file__().endswith(".py")
+    assert not workbox.__is_dirty__()
+    assert not workbox.__is_missing_linked_file__()
+    assert group.widget(2).__filename__().endswith("linked.py")
+    assert hasattr(workbox, "__text__")
+    assert manager.workbox_registry.workbox_for_id("workbox_1") is workbox
+
+    group.tabBar().updateColorsAndToolTips()
+    assert "linked.py" in group.tabBar().tabToolTip(2)
+
+    # Text can be searched without creating the editors
+    assert [w.__text_snapshot__() for w in workboxes] == [
+        "print(0)\n",
+        "print(1)\n",
+        "linked\n",
+    ]
+    assert manager.save_prefs()["groups"][0]["tabs"] == [
+        dict(
+            filename="",
+            name="Workbox 0",
+            workbox_id="workbox_0",
+            backup_file="workbox_0/workbox_0-2024-01-01-00-00-00-000000.py",
+            current=True,
+        ),
+        dict(
+            filename="",
+            name="Workbox 1",
+            workbox_id="workbox_1",
+            backup_file="workbox_1/workbox_1-2024-01-01-00-00-00-000000.py",
+        ),
+        dict(
+            filename=str(group.widget(2).__filename__()),
+            name="Workbox 2",
+            workbox_id="workbox_2",
+            backup_file="workbox_2/workbox_2-2024-01-01-00-00-00-000000.py",
+        ),
+    ]
+    assert all(isinstance(w, WorkboxPlaceholder) for w in workboxes)
+    assert [group.widget(i) for i in range(group.count())] == workboxes
+
+
+def test_placeholder_history_search(group, monkeypatch):
+    from Qt.QtWidgets import QApplication, QTextEdit
+
+    from preditor.gui.find_files import FindFiles
+    from preditor.gui.workbox_placeholder import WorkboxPlaceholder
+
+    monkeypatch.setattr(
+        WorkboxPlaceholder, "__editor__", lambda self: pytest.fail("Editor created")
+    )
+    manager = group.__tab_widget__()
+    placeholder = group.widget(1)
+    assert [v[1] for v in placeholder.__history_versions__()] == [
+        "workbox_1/workbox_1-2024-01-01-00-00-00-000000.py"
+    ]
+
+    # Searching the history of every workbox doesn't create their editors
+    find_files = FindFiles(console=QTextEdit())
+    find_files.managers = [manager]
+    find_files.uiHistoryBTN.setChecked(True)
+    find_files.uiFindTXT.setText("print")
+    find_files.find()
+    find_files.pool.waitForDone()
+    QApplication.processEvents()
+    find_files.renderer.flush()
+    assert find_files.match_files_count == 3
+    assert all(
+        isinstance(group.widget(i), WorkboxPlaceholder) for i in range(group.count())
+    )
+
+
+def test_placeholder_show(group, monkeypatch):
+    placeholder = group.widget(1)
+    group.tabBar().setTabToolTip(1, "tool tip")
+
+    # Settings are applied once the editor is created
+    calls = []
+    monkeypatch.setattr(
+        group.editor_cls,
+        "__set_auto_complete_enabled__",
+        lambda self, state: calls.append(state),
+    )
+    placeholder.__set_auto_complete_enabled__(True)
+    placeholder.__set_auto_complete_enabled__(False)
+    assert calls == []
+
+    # Creating the editor replaces the placeholder in its tab
+    editor = placeholder.__editor__()
+    assert group.widget(1) is editor
+    assert placeholder.__is_created__()
+    assert group.count() == 3
+    assert group.tabText(1) == "Workbox 1"
+    assert group.tabToolTip(1) == "tool tip"
+    assert group.currentIndex() == 0
+    assert calls == [False]
+
+    placeholder.__show__()
+    assert editor.__workbox_id__() == "workbox_1"
+    assert editor.__text__() == "print(1)\n"
+    assert not editor.__is_dirty__()
+    assert editor.__workbox_name__() == "Group/Workbox 1"
+
+    # The placeholder passes everything on to its editor
+    assert placeholder.__text__() == "print(1)\n"
+    placeholder.__set_text__("changed\n")
+    assert editor.__text__() == "changed\n"
+    assert placeholder.__is_dirty__()
+    assert placeholder.__workbox_name__() == "Group/Workbox 1"
+    assert group.__tab_widget__().workbox_registry.workbox_for_id("workbox_1") is editor
+
+
+def test_placeholder_current(group):
+    from preditor.gui.workbox_placeholder import WorkboxPlaceholder
+
+    manager = group.__tab_widget__()
+    group.setCurrentIndex(2)
+    assert isinstance(group.widget(2), WorkboxPlaceholder)
+
+    placeholder = manager.current_groups_widget(create=False)
+    assert isinstance(placeholder, WorkboxPlaceholder)
+
+    # The current workbox is always an editor
+    editor = manager.current_groups_widget()
+    assert not isinstance(editor, WorkboxPlaceholder)
+    assert group.widget(2) is editor
+    assert group.currentIndex() == 2
+    assert isinstance(group.widget(1), WorkboxPlaceholder)
+
+    # Calling any other workbox method creates the editor
+    assert group.widget(1).__cursor_position__() == (0, 0)
+    assert not isinstance(group.widget(1), WorkboxPlaceholder)
+    assert group.currentIndex() == 2
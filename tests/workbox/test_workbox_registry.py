@@ -0,0 +1,219 @@
+import pytest
+
+
+@pytest.fixture()
+def manager(workbox_manager):
+    from preditor.gui.workbox_text_edit import WorkboxTextEdit
+
+    manager = workbox_manager
+    for group_name in ("Group A", "Group B"):
+        group, _ = manager.default_tab(group_name)
+        manager.addTab(group, group_name)
+        for i in range(3):
+            editor = WorkboxTextEdit(parent=group, core_name=manager.core_name)
+            group.addTab(editor, "Workbox {}".format(i))
+    return manager
+
+
+def assert_consistent(manager):
+    """Check the registry matches a scan of all of the tabs."""
+    registry = manager.workbox_registry
+    infos = list(manager.all_widgets())
+    for workbox, group_name, tab_name, group_idx, tab_idx in infos:
+        name = "{}/{}".format(group_name, tab_name)
+        assert registry.name_for_workbox(workbox) == name
+        assert registry.name_for_workbox(workbox).group == group_name
+        # Names may not be unique, the first matching tab is found
+        group = manager.widget(manager.index_for_text(group_name))
+        index = group.index_for_text(tab_name)
+        expected = group.widget(index) if index != -1 else None
+        assert registry.workbox_for_name(name) is expected
+        assert registry.workbox_for_id(workbox.__workbox_id__()) is workbox
+        assert workbox.__workbox_name__() == name
+        assert workbox.__group_tab_index__() == (group_idx, tab_idx)
+    return [(info[1], info[2]) for info in infos]
+
+
+def test_registry_lookups(manager):
+    registry = manager.workbox_registry
+    workbox = manager.widget(1).widget(2)
+    assert registry.workbox_for_name("Group B/Workbox 2") is workbox
+    assert registry.workbox_for_id(workbox.__workbox_id__()) is workbox
+    assert registry.name_for_workbox(workbox) == "Group B/Workbox 2"
+
+    assert registry.workbox_for_name("Group B/Missing") is None
+    assert registry.workbox_for_name("Group B") is None
+    assert registry.workbox_for_id("missing") is None
+    assert registry.name_for_workbox(manager.widget(1)) is None
+
+    assert manager.set_current_groups_from_workbox(workbox)
+    assert manager.current_groups_widget() is workbox
+    assert not manager.set_current_groups_from_workbox(manager.widget(0))
+    assert manager.current_groups_widget() is workbox
+
+
+def test_registry_cached(manager, monkeypatch):
+    registry = manager.workbox_registry
+    assert_consistent(manager)
+    assert registry.is_valid()
+
+    # Lookups don't scan the tabs again until they change
+    monkeypatch.setattr(type(manager), "all_widgets", lambda self: pytest.fail())
+    for i in range(3):
+        name = "Group A/Workbox {}".format(i)
+        assert registry.workbox_for_name(name) is manager.widget(0).widget(i)
+    monkeypatch.undo()
+
+    manager.widget(0).setTabText(0, "Renamed")
+    assert not registry.is_valid()
+    assert registry.workbox_for_name("Group A/Renamed") is manager.widget(0).widget(0)
+    assert registry.workbox_for_name("Group A/Workbox 0") is None
+
+
+def test_registry_rename(manager):
+    group = manager.widget(1)
+    workbox = group.widget(1)
+    # Renaming using the tab bar like the tab's context menu
+    group.tabBar().setTabText(1, "Renamed")
+    assert workbox.__workbox_name__() == "Group B/Renamed"
+
+    # Renaming a group renames all of its workboxes
+    manager.setTabText(1, "Group C")
+    assert workbox.__workbox_name__() == "Group C/Renamed"
+    assert manager.workbox_registry.workbox_for_name("Group B/Workbox 0") is None
+    assert assert_consistent(manager)[3:] == [
+        ("Group C", "Workbox 0"),
+        ("Group C", "Renamed"),
+        ("Group C", "Workbox 2"),
+    ]
+
+
+def test_registry_workbox_id(manager):
+    registry = manager.workbox_registry
+    workbox = manager.widget(0).widget(1)
+    old_id = workbox.__workbox_id__()
+    assert registry.workbox_for_id(old_id) is workbox
+
+    workbox.__set_workbox_id__("new_id")
+    assert registry.workbox_for_id("new_id") is workbox
+    assert registry.workbox_for_id(old_id) is None
+
+
+def test_registry_duplicate_names(manager):
+    # Like `OneTabWidget.index_for_text` the first tab with a name is used
+    group = manager.widget(0)
+    group.setTabText(2, "Workbox 0")
+    registry = manager.workbox_registry
+    assert registry.workbox_for_name("Group A/Workbox 0") is group.widget(0)
+
+    group.tabBar().moveTab(2, 0)
+    assert registry.workbox_for_name("Group A/Workbox 0") is group.widget(0)
+    assert_consistent(manager)
+
+    # Only the first group with a name is searched
+    manager.setTabText(1, "Group A")
+    assert registry.workbox_for_name("Group A/Workbox 1") is group.widget(2)
+    manager.widget(1).setTabText(0, "Only In Second")
+    assert registry.workbox_for_name("Group A/Only In Second") is None
+
+
+def test_registry_move_within_group(manager):
+    group = manager.widget(0)
+    workbox = group.widget(0)
+    group.tabBar().moveTab(0, 2)
+    assert group.widget(2) is workbox
+    assert assert_consistent(manager)[:3] == [
+        ("Group A", "Workbox 1"),
+        ("Group A", "Workbox 2"),
+        ("Group A", "Workbox 0"),
+    ]
+
+    # Moving group tabs
+    manager.tabBar().moveTab(0, 1)
+    assert manager.widget(1) is group
+    assert workbox.__workbox_name__() == "Group A/Workbox 0"
+    assert workbox.__group_tab_index__() == (1, 2)
+    assert manager.set_current_groups_from_workbox(workbox)
+    assert manager.currentIndex() == 1
+    assert group.currentIndex() == 2
+    assert_consistent(manager)
+
+
+def drag_tab(source, index, target=None):
+    """Move a tab the same way `DragTabBar` does when dragging a tab from
+    source and dropping it on target. If target is None the drop is cancelled.
+    """
+    widget = source.widget(index)
+    text = source.tabText(index)
+    # Dragging a tab outside of the tab bar removes it
+    source.removeTab(index)
+    if target is None:
+        # Cancelling the drop restores the tab
+        source.insertTab(index, widget, text)
+    elif target.count() == 0:
+        target.addTab(widget, text)
+    else:
+        target.insertTab(target.count() + 1, widget, text)
+    return widget
+
+
+def test_registry_drag_between_groups(manager):
+    registry = manager.workbox_registry
+    group_a = manager.widget(0)
+    group_b = manager.widget(1)
+    assert_consistent(manager)
+
+    workbox = drag_tab(group_a, 1, group_b)
+    assert workbox.__tab_widget__() is group_b
+    assert registry.workbox_for_name("Group A/Workbox 1") is None
+    assert registry.workbox_for_name("Group B/Workbox 1") is group_b.widget(1)
+    assert registry.name_for_workbox(workbox) == "Group B/Workbox 1"
+    assert registry.workbox_for_id(workbox.__workbox_id__()) is workbox
+    assert assert_consistent(manager) == [
+        ("Group A", "Workbox 0"),
+        ("Group A", "Workbox 2"),
+        ("Group B", "Workbox 0"),
+        ("Group B", "Workbox 1"),
+        ("Group B", "Workbox 2"),
+        ("Group B", "Workbox 1"),
+    ]
+
+    # The dropped workbox can be made current
+    assert manager.set_current_groups_from_workbox(workbox)
+    assert manager.current_groups_widget() is workbox
+
+    # A cancelled drag restores the tab
+    workbox = drag_tab(group_b, 0)
+    assert group_b.widget(0) is workbox
+    assert registry.name_for_workbox(workbox) == "Group B/Workbox 0"
+    assert_consistent(manager)
+
+    # Dragging every tab out of a group leaves its default tab
+    for _ in range(2):
+        drag_tab(group_a, 0, group_b)
+    assert group_a.count() == 1
+    assert group_b.count() == 6
+    names = assert_consistent(manager)
+    assert names[0] == ("Group A", "Workbox01")
+    assert names[-2:] == [("Group B", "Workbox 0"), ("Group B", "Workbox 2")]
+
+
+def test_registry_close(manager):
+    from Qt.QtWidgets import QTabWidget
+
+    registry = manager.workbox_registry
+    workbox = manager.widget(0).widget(1)
+    workbox_id = workbox.__workbox_id__()
+    assert registry.workbox_for_id(workbox_id) is workbox
+
+    QTabWidget.removeTab(manager.widget(0), 1)
+    assert registry.workbox_for_id(workbox_id) is None
+    assert registry.name_for_workbox(workbox) is None
+
+    # Closing a group removes all of its workboxes
+    group = manager.widget(1)
+    workbox = group.widget(0)
+    QTabWidget.removeTab(manager, 1)
+    assert registry.workbox_for_name("Group B/Workbox 0") is None
+    assert not manager.set_current_groups_from_workbox(workbox)
+    assert_consistent(manager)
@@ -0,0 +1,143 @@
+import pytest
+
+TEXT = "".join("line {}: print('hello world')\n".format(i) for i in range(200))
+
+
+@pytest.fixture(params=["WorkboxTextEdit", "WorkboxWidget"])
+def group(request, workbox_manager):
+    from preditor.gui.workbox_text_edit import WorkboxTextEdit
+    from preditor.gui.workboxwidget import WorkboxWidget
+
+    editor_cls = {
+        "WorkboxTextEdit": WorkboxTextEdit,
+        "WorkboxWidget": WorkboxWidget,
+    }[request.param]
+
+    manager = workbox_manager
+    group, _ = manager.default_tab("Group")
+    manager.addTab(group, "Group")
+    for i in range(4):
+        editor = editor_cls(parent=group, core_name=manager.core_name)
+        group.addTab(editor, "Workbox {}".format(i))
+        editor.__set_text__(TEXT)
+        editor.__set_last_saved_text__("")
+        editor.__set_last_workbox_name__()
+    return group
+
+
+def test_unload_unsaved_changes(group):
+    editor = group.widget(1)
+    editor.__set_text__(TEXT + "unsaved changes\n")
+    assert editor.__is_dirty__()
+
+    # Unsaved changes are backed up before unloading
+    assert editor.__unload__()
+    assert not editor._is_loaded
+    assert editor.__text__() == ""
+    assert editor.__text_snapshot__() == TEXT + "unsaved changes\n"
+
+    editor.__show__()
+    assert editor._is_loaded
+    assert editor.__text__() == TEXT + "unsaved changes\n"
+    assert not editor.__is_dirty__()
+
+
+def test_unload_view_state(group):
+    editor = group.widget(1)
+    editor.resize(300, 200)
+    state = {"anchor": (40, 2), "cursor": (42, 10), "scroll": (0, 30)}
+    editor.__set_view_state__(state)
+    state = editor.__view_state__()
+    assert state["anchor"] == (40, 2)
+    assert state["cursor"] == (42, 10)
+
+    assert editor.__unload__()
+    assert editor.__view_state__()["cursor"] == (0, 0)
+    editor.__show__()
+    assert editor.__view_state__() == state
+    # The selection is restored in the same direction
+    text, _ = editor.__selected_text__()
+    assert text.startswith("ne 40: ")
+
+
+def test_unload_linked(group, tmp_path):
+    editor = group.widget(2)
+    filename = tmp_path / "linked.py"
+    filename.write_text(TEXT)
+    editor.__set_filename__(str(filename))
+    editor.__set_last_saved_text__(TEXT)
+    assert not editor.__is_dirty__()
+
+    # Linked workboxes with unsaved changes are never unloaded
+    editor.__set_text__(TEXT + "unsaved changes\n")
+    assert not editor.__unload__()
+    assert editor.__text__() == TEXT + "unsaved changes\n"
+
+    # Clean linked workboxes reload from the linked file
+    editor.__set_text__(TEXT)
+    assert editor.__unload__()
+    editor.__show__()
+    assert editor.__text__() == TEXT
+
+
+def test_unload_mismatch(group, monkeypatch):
+    editor = group.widget(1)
+    editor.__set_text__(TEXT + "unsaved changes\n")
+    # If the text that would be reloaded doesn't match, nothing is unloaded
+    monkeypatch.setattr(type(editor), "__text_snapshot__", lambda self: TEXT)
+    assert not editor.__unload__()
+    assert editor._is_loaded
+    assert editor.__text__() == TEXT + "unsaved changes\n"
+
+
+def test_unloader(group):
+    from preditor.gui.workbox_unloader import WorkboxUnloader
+
+    manager = group.__tab_widget__()
+    editors = [group.widget(i) for i in range(group.count())]
+    unloader = WorkboxUnloader(manager)
+    for i, editor in enumerate(editors):
+        editor.__set_text__("{}\n{}".format(i, TEXT))
+    assert unloader.check(now=0) == []
+
+    # The least recently used workboxes are unloaded, editing a workbox marks
+    # it as used
+    unloader.max_loaded = 2
+    editors[1].__set_text__("edited\n")
+    editors[3].__set_text__("edited\n")
+    assert unloader.check(now=10) == [editors[0], editors[2]]
+    assert [e._is_loaded for e in editors] == [False, True, False, True]
+
+    # Idle workboxes are unloaded
+    unloader.max_loaded = 0
+    unloader.idle_time = 60
+    editors[3].__set_text__("edited again\n")
+    assert unloader.check(now=50) == []
+    assert unloader.check(now=100) == [editors[1]]
+    assert unloader.check(now=200) == [editors[3]]
+
+    # No changes are lost
+    for editor in editors:
+        editor.__show__()
+    assert [e.__text__() for e in editors] == [
+        "0\n" + TEXT,
+        "edited\n",
+        "2\n" + TEXT,
+        "edited again\n",
+    ]
+
+
+def test_unloader_disabled_by_default(qapp, tmp_path, monkeypatch):
+    from preditor.gui.loggerwindow import LoggerWindow
+
+    # Unloading discards the undo history, so users have to opt into it
+    monkeypatch.setenv("PREDITOR_PREF_PATH", str(tmp_path / "prefs"))
+    window = LoggerWindow(None, name="test_unloader_default")
+    try:
+        assert window.uiMaxLoadedWorkboxesSPIN.value() == 0
+        assert window.uiUnloadIdleWorkboxesSPIN.value() == 0
+        assert window.workboxUnloader.max_loaded == 0
+        assert not window.workboxUnloader.timer.isActive()
+    finally:
+        window.close()
+        window.deleteLater()